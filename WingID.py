@@ -1,15 +1,32 @@
+import time
+
+# Reference point for the time-to-first-frame and time-to-interactive measurements
+STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import sqlite3
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import os
-from PIL import Image, ImageTk
 import logging
 import json
+import threading
+import queue
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from wingid_db import AircraftDatabase, DatabaseSnapshot, RARITY_LEVELS
+from wingid_metrics import metrics, timed, format_table, Profiler
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def photo_image(image):
+    """Convert a PIL image for Tk; Pillow's ImageTk is only imported on first use"""
+    from PIL import ImageTk
+    return ImageTk.PhotoImage(image)
+
+
 class LanguageManager:
     def __init__(self):
         self.current_language = 'en'
@@ -23,6 +40,14 @@ class LanguageManager:
                 'images_frame': 'Aircraft Silhouettes',
                 'side_view': 'Side view: No image available',
                 'top_view': 'Top view: No image available',
+                'loading_image': 'Loading image...',
+                'filters_frame': 'Filters',
+                'operator_filter': 'Operator:',
+                'rarity_filter': 'Rarity:',
+                'first_flight_filter': 'First flight:',
+                'max_units_filter': 'Max. units:',
+                'any_option': 'Any',
+                'rarity_names': ('extremely rare', 'very rare', 'rare', 'common', 'very common'),
                 'no_info': '❌ No information found for aircraft:',
                 'db_error': 'Database Error',
                 'db_init_failed': 'Failed to initialize database:',
@@ -33,6 +58,17 @@ class LanguageManager:
                 'theme_menu': 'Theme',
                 'light_theme': 'Light',
                 'dark_theme': 'Dark',
+                'tools_menu': 'Tools',
+                'perf_overlay': 'Performance overlay',
+                'save_metrics': 'Save metrics snapshot...',
+                'start_profiling': 'Start profiling',
+                'stop_profiling': 'Stop profiling and save...',
+                'perf_title': 'WingID performance',
+                'identify_image': 'Identify from image...',
+                'image_files': 'Images',
+                'identify_unavailable': 'Identifying images requires NumPy and Pillow.',
+                'identify_no_index': 'There is no silhouette index yet. Build it with: python wingid_identify.py index',
+                'identify_failed': 'Could not identify the image:',
                 'aircraft_info': {
                     'basic_info': '✈️  BASIC INFORMATION:',
                     'platform_base': '    • Platform Base:',
@@ -44,6 +80,10 @@ class LanguageManager:
                     'classification': '    • Classification:',
                     'quantity': '    • Quantity in Service:',
                     'detailed_desc': '📋  DETAILED DESCRIPTION:',
+                    'sightings': '🔭  SIGHTINGS:',
+                    'sightings_logged': '    • Logged:',
+                    'sightings_weeks': '    • Last 12 Weeks:',
+                    'sightings_recent': '    • Latest:',
                     'last_updated': 'Last updated: Military Aircraft OSINT Database'
                 }
             },
@@ -56,6 +96,14 @@ class LanguageManager:
                 'images_frame': 'Flugzeug Silhouetten',
                 'side_view': 'Seitenansicht: Kein Bild verfügbar',
                 'top_view': 'Draufsicht: Kein Bild verfügbar',
+                'loading_image': 'Bild wird geladen...',
+                'filters_frame': 'Filter',
+                'operator_filter': 'Betreiber:',
+                'rarity_filter': 'Seltenheit:',
+                'first_flight_filter': 'Erstflug:',
+                'max_units_filter': 'Max. Einheiten:',
+                'any_option': 'Alle',
+                'rarity_names': ('extrem selten', 'sehr selten', 'selten', 'häufig', 'sehr häufig'),
                 'no_info': '❌ Keine Informationen gefunden für Flugzeug:',
                 'db_error': 'Datenbank Fehler',
                 'db_init_failed': 'Datenbank Initialisierung fehlgeschlagen:',
@@ -66,6 +114,17 @@ class LanguageManager:
                 'theme_menu': 'Design',
                 'light_theme': 'Hell',
                 'dark_theme': 'Dunkel',
+                'tools_menu': 'Werkzeuge',
+                'perf_overlay': 'Leistungsanzeige',
+                'save_metrics': 'Messwerte speichern...',
+                'start_profiling': 'Profiling starten',
+                'stop_profiling': 'Profiling beenden und speichern...',
+                'perf_title': 'WingID Leistung',
+                'identify_image': 'Aus Bild identifizieren...',
+                'image_files': 'Bilder',
+                'identify_unavailable': 'Die Bilderkennung benötigt NumPy und Pillow.',
+                'identify_no_index': 'Es gibt noch keinen Silhouettenindex. Erstellen mit: python wingid_identify.py index',
+                'identify_failed': 'Bild konnte nicht identifiziert werden:',
                 'aircraft_info': {
                     'basic_info': '✈️  GRUNDINFORMATIONEN:',
                     'platform_base': '    • Plattform Basis:',
@@ -77,6 +136,10 @@ class LanguageManager:
                     'classification': '    • Klassifizierung:',
                     'quantity': '    • Anzahl im Dienst:',
                     'detailed_desc': '📋  DETAILLIERTE BESCHREIBUNG:',
+                    'sightings': '🔭  SICHTUNGEN:',
+                    'sightings_logged': '    • Erfasst:',
+                    'sightings_weeks': '    • Letzte 12 Wochen:',
+                    'sightings_recent': '    • Zuletzt:',
                     'last_updated': 'Zuletzt aktualisiert: Militärflugzeug OSINT Datenbank'
                 }
             }
@@ -140,228 +203,520 @@ class ThemeManager:
             self.current_theme = theme
 
 
-class AircraftDatabase:
-    def __init__(self, language='en'):
+class SearchScheduler:
+    """Debounce search input and run queries on a background worker thread.
+
+    Keystrokes restart a short timer on the Tk event loop. When it fires, the
+    query is handed to a worker thread that owns its own database connection.
+    Only the most recent query is kept, so bursts of typing collapse into one
+    search, and results for anything but the latest query are dropped.
+    """
+
+    def __init__(self, root, language, callback, delay_ms=150, poll_ms=15, snapshot=None):
+        self.root = root
         self.language = language
-        self.db_file = "airplane_de.db" if language == 'de' else "airplane.db"
-        self.conn = None
-        self.cursor = None
-        self.connect()
-        self.initialize_database()
-
-    def connect(self):
-        """Establish database connection with error handling"""
-        try:
-            self.conn = sqlite3.connect(self.db_file)
-            self.cursor = self.conn.cursor()
-            logger.info(f"Connected to database: {self.db_file}")
-        except sqlite3.Error as e:
-            logger.error(f"Database connection failed: {e}")
-            raise
+        self.snapshot = snapshot
+        self.filters = None
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
 
-    def __enter__(self):
-        return self
+        self._after_id = None
+        self._poll_id = None
+        self._dispatched_at = 0.0
+        self._generation = 0
+        self._pending = None
+        self._result = None
+        self._in_flight = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="search-worker", daemon=True)
+        self._worker.start()
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+    def schedule(self, query, delay_ms=None):
+        """Schedule a search, replacing any search that has not started yet"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        delay = self.delay_ms if delay_ms is None else delay_ms
+        self._after_id = self.root.after(delay, self._dispatch, query)
 
-    def close(self):
-        """Safely close database connection"""
-        if self.conn:
-            try:
-                self.conn.close()
-                logger.info("Database connection closed")
-            except sqlite3.Error as e:
-                logger.error(f"Error closing database: {e}")
+    def cancel(self):
+        """Cancel any pending search and drop results that are still in flight"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        with self._cond:
+            self._generation += 1
+            self._pending = None
 
-    def initialize_database(self):
-        """Initialize database and add missing fields"""
-        try:
-            # Create table if it doesn't exist
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS aircraft (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE,
-                    base TEXT,
-                    role TEXT,
-                    rarity TEXT,
-                    quantity TEXT,
-                    operator TEXT,
-                    details TEXT,
-                    first_flight TEXT,
-                    status TEXT
-                )
-            """)
-            self.conn.commit()
-
-            # Add image path columns if they don't exist
-            self._add_column_if_not_exists("side_view_path", "TEXT")
-            self._add_column_if_not_exists("top_view_path", "TEXT")
-
-            # Check if database is empty and populate with sample data
-            self.cursor.execute("SELECT COUNT(*) FROM aircraft")
-            if self.cursor.fetchone()[0] == 0:
-                logger.info("Empty database detected. Creating sample data...")
-                self.create_example_database()
-
-        except sqlite3.Error as e:
-            logger.error(f"Database initialization failed: {e}")
-            raise
-
-    def _add_column_if_not_exists(self, column_name, column_type):
-        """Helper method to safely add columns"""
+    def set_language(self, language):
+        """Switch the worker to another language and drop in-flight results"""
+        with self._cond:
+            self.language = language
+            self._generation += 1
+            self._pending = None
+
+    def set_filters(self, filters):
+        """Apply facet filters to later searches and drop in-flight results"""
+        with self._cond:
+            self.filters = dict(filters) if filters else None
+            self._generation += 1
+            self._pending = None
+
+    def set_snapshot(self, snapshot):
+        """Serve later searches from another in-memory snapshot of the database"""
+        with self._cond:
+            self.snapshot = snapshot
+
+    def stop(self):
+        """Stop the worker thread and cancel pending callbacks"""
+        for after_id in (self._after_id, self._poll_id):
+            if after_id is not None:
+                try:
+                    self.root.after_cancel(after_id)
+                except tk.TclError:
+                    pass
+        self._after_id = self._poll_id = None
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._worker.join(timeout=1.0)
+
+    def _dispatch(self, query):
+        """Hand the debounced query to the worker (runs on the Tk thread)"""
+        self._after_id = None
+        self._dispatched_at = time.perf_counter()
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, self.language, self.filters, query)
+            self._in_flight = True
+            self._cond.notify()
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Deliver the latest finished result to the UI (runs on the Tk thread)"""
+        self._poll_id = None
+        with self._cond:
+            result, self._result = self._result, None
+            generation = self._generation
+            busy = self._in_flight
+        if result is not None and result[0] == generation:
+            # From the end of the debounce to the results reaching the UI
+            metrics.record("gui.search_roundtrip", time.perf_counter() - self._dispatched_at)
+            self.callback(result[1])
+        if busy:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _run(self):
+        """Worker loop: always run the newest pending query, never a stale one"""
+        db = None
         try:
-            self.cursor.execute(f"ALTER TABLE aircraft ADD COLUMN {column_name} {column_type}")
-            self.conn.commit()
-            logger.info(f"Added column: {column_name}")
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
+            # Build the typo-tolerant name index while the user is still looking at the window
+            db = AircraftDatabase(self.language, read_only=True, snapshot=self.snapshot)
+            db.prepare_fuzzy_index()
+        except Exception as e:
+            logger.warning(f"Could not prepare the fuzzy name index: {e}")
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._in_flight = False
+                    self._cond.wait()
+                if self._stopped:
+                    break
+                generation, language, filters, query = self._pending
+                self._pending = None
+                snapshot = self.snapshot
+
+            try:
+                if db is not None and db.snapshot is not snapshot:
+                    db.close()
+                    db = None
+                if db is None:
+                    db = AircraftDatabase(language, read_only=True, snapshot=snapshot)
+                db.set_language(language)
+                matches = db.search_aircraft(query, filters=filters, fuzzy=True)
+            except Exception as e:
+                logger.error(f"Background search failed: {e}")
+                db = None
+                continue
+
+            with self._cond:
+                if generation == self._generation:
+                    self._result = (generation, matches)
+
+        if db is not None:
+            db.close()
+
+
+class ListSource:
+    """Row source backed by an in-memory list (e.g. search results)"""
+
+    def __init__(self, items):
+        self.items = items
+
+    def __len__(self):
+        return len(self.items)
 
-    def create_example_database(self):
-        """Create sample database with military aircraft data"""
-        if self.language == 'de':
-            example_data = [
-                ("E-6 Mercury", "Boeing 707-320B", "Strategische Kommunikation und Nuklearkommando (TACAMO)", 
-                 "sehr selten", "16 Einheiten", "US Navy", 
-                 "Ersetzt die EC-130Q. Dient als fliegendes Kommandozentrum für Nuklearstreitkräfte. Kann 15+ Stunden in der Luft bleiben.", 
-                 "1987", "Aktiv", None, None),
-                
-                ("E-2 Hawkeye", "Grumman Eigenentwicklung", "Trägergestützte Luftraumüberwachung (AEW&C)", 
-                 "häufig", "~75 Einheiten (Aktiv)", "US Navy, verschiedene Verbündete", 
-                 "Markante rotierende Radarkuppel. Hauptaufgabe ist Luftraumüberwachung von Flugzeugträgern.", 
-                 "1960", "Aktiv", None, None),
-                 
-                ("E-3 Sentry", "Boeing 707-320B", "Luftgestützte Frühwarnung und Kontrolle (AWACS)", 
-                 "selten", "~30 Einheiten (USAF)", "USAF, NATO, Saudi-Arabien, andere", 
-                 "Große rotierende Radarkuppel oben. Koordiniert Luftoperationen über weite Gebiete.", 
-                 "1972", "Aktiv", None, None),
-                 
-                ("E-4B Nightwatch", "Boeing 747-200B", "Luftgestütztes Kommandozentrum (NAOC)", 
-                 "extrem selten", "4 Einheiten", "USAF", 
-                 "Doomsday Plane - Fliegendes Pentagon für Krisensituationen. Kann wochenlang in der Luft bleiben.", 
-                 "1973", "Aktiv", None, None),
-                 
-                ("KC-135 Stratotanker", "Boeing 707-80 (Prototyp)", "Luft-zu-Luft Betankung", 
-                 "häufig", "~400 Einheiten", "USAF, verschiedene Luftstreitkräfte weltweit", 
-                 "Rückgrat strategischer Luftbetankungsoperationen. Ermöglicht globale Reichweite für Kampfflugzeuge.", 
-                 "1956", "Aktiv", None, None),
-                 
-                ("P-8 Poseidon", "Boeing 737-800ERX", "Maritime Aufklärung und U-Boot-Jagd", 
-                 "häufig", "140+ Einheiten (alle Betreiber)", "US Navy, Royal Navy, verschiedene Verbündete", 
-                 "Ersetzt P-3 Orion. Moderne Avionik für maritime Überwachung und U-Boot-Abwehr.", 
-                 "2009", "Aktiv", None, None),
-                 
-                ("C-130 Hercules", "Lockheed Originaldesign", "Taktischer Transport", 
-                 "sehr häufig", "2000+ Einheiten", "USAF und 70+ Länder", 
-                 "Arbeitspferd des taktischen Transports. Extrem vielseitig mit zahlreichen Varianten für verschiedene Missionen.", 
-                 "1954", "Aktiv", None, None),
-                 
-                ("B-52 Stratofortress", "Boeing Originaldesign", "Strategischer Bomber", 
-                 "selten", "76 Einheiten", "USAF", 
-                 "Strategischer Langstreckenbomber. Im Dienst seit 1955, geplant bis in die 2050er Jahre.", 
-                 "1952", "Aktiv", None, None)
-            ]
+    def get_range(self, start, stop):
+        return self.items[start:stop]
+
+
+class AircraftPager:
+    """Row source that pages the full aircraft list lazily out of the database"""
+
+    def __init__(self, db, page_size=100, max_pages=32):
+        self.db = db
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.total = db.count_aircraft()
+        self._pages = OrderedDict()
+
+    def __len__(self):
+        return self.total
+
+    def get_range(self, start, stop):
+        rows = []
+        for page_no in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+            page_start = page_no * self.page_size
+            page = self._get_page(page_no)
+            rows.extend(page[max(start - page_start, 0):stop - page_start])
+        return rows
+
+    def _get_page(self, page_no):
+        """Return one page, fetched by keyset from its predecessor when that is cached"""
+        page = self._pages.get(page_no)
+        if page is not None:
+            self._pages.move_to_end(page_no)
+            return page
+        previous = self._pages.get(page_no - 1)
+        if previous:
+            page = self.db.get_aircraft_page(self.page_size, after_name=previous[-1])
         else:
-            example_data = [
-                ("E-6 Mercury", "Boeing 707-320B", "Strategic Communications and Nuclear Command (TACAMO)", 
-                 "very rare", "16 units", "US Navy", 
-                 "Replaces the EC-130Q. Serves as a flying command center for nuclear forces. Can remain airborne for 15+ hours.", 
-                 "1987", "Active", None, None),
-                
-                ("E-2 Hawkeye", "Grumman in-house development", "Carrier-based airspace surveillance (AEW&C)", 
-                 "common", "~75 units (Active)", "US Navy, various allies", 
-                 "Distinctive rotating radar dome. Primary mission is airspace surveillance from aircraft carriers.", 
-                 "1960", "Active", None, None),
-                 
-                ("E-3 Sentry", "Boeing 707-320B", "Airborne early warning and control (AWACS)", 
-                 "rare", "~30 units (USAF)", "USAF, NATO, Saudi Arabia, others", 
-                 "Large rotating radar dome on top. Coordinates air operations over vast areas.", 
-                 "1972", "Active", None, None),
-                 
-                ("E-4B Nightwatch", "Boeing 747-200B", "Airborne command center (NAOC)", 
-                 "extremely rare", "4 units", "USAF", 
-                 "Doomsday Plane - Flying Pentagon for crisis situations. Can remain airborne for weeks.", 
-                 "1973", "Active", None, None),
-                 
-                ("KC-135 Stratotanker", "Boeing 707-80 (Prototype)", "Air-to-air refueling", 
-                 "common", "~400 units", "USAF, various air forces worldwide", 
-                 "Backbone of strategic air refueling operations. Enables global reach for combat aircraft.", 
-                 "1956", "Active", None, None),
-                 
-                ("P-8 Poseidon", "Boeing 737-800ERX", "Maritime reconnaissance and submarine hunting", 
-                 "common", "140+ units (all operators)", "US Navy, Royal Navy, various allies", 
-                 "Replaces P-3 Orion. Modern avionics for maritime surveillance and anti-submarine warfare.", 
-                 "2009", "Active", None, None),
-                 
-                ("C-130 Hercules", "Lockheed original design", "Tactical transport", 
-                 "very common", "2000+ units", "USAF and 70+ countries", 
-                 "Workhorse tactical transport. Extremely versatile with numerous variants for different missions.", 
-                 "1954", "Active", None, None),
-                 
-                ("B-52 Stratofortress", "Boeing original design", "Strategic bomber", 
-                 "rare", "76 units", "USAF", 
-                 "Long-range strategic bomber. In service since 1955, planned to serve until 2050s.", 
-                 "1952", "Active", None, None)
-            ]
+            page = self.db.get_aircraft_page(self.page_size, offset=page_no * self.page_size)
+        self._pages[page_no] = page
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
 
-        try:
-            self.cursor.executemany("""
-                INSERT INTO aircraft (name, base, role, rarity, quantity, operator, details, first_flight, status, side_view_path, top_view_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, example_data)
-            self.conn.commit()
-            logger.info(f"Created sample database with {len(example_data)} aircraft")
-        except sqlite3.Error as e:
-            logger.error(f"Failed to create sample data: {e}")
-            raise
-
-    def search_aircraft(self, query):
-        """Search for aircraft based on input query"""
-        try:
-            if not query.strip():
-                self.cursor.execute("SELECT name FROM aircraft ORDER BY name")
-            else:
-                query_pattern = f"%{query.lower()}%"
-                self.cursor.execute("""
-                    SELECT name FROM aircraft 
-                    WHERE LOWER(name) LIKE ? OR LOWER(role) LIKE ? OR LOWER(operator) LIKE ?
-                    ORDER BY name
-                """, (query_pattern, query_pattern, query_pattern))
-            
-            return [row[0] for row in self.cursor.fetchall()]
-        except sqlite3.Error as e:
-            logger.error(f"Search failed: {e}")
-            return []
 
-    def get_aircraft_info(self, name):
-        """Retrieve comprehensive information about an aircraft"""
-        try:
-            self.cursor.execute("SELECT * FROM aircraft WHERE name = ?", (name,))
-            result = self.cursor.fetchone()
-            
-            if result:
-                info = {
-                    "base": result[2] or "Unknown",
-                    "role": result[3] or "Unknown",
-                    "rarity": result[4] or "Unknown",
-                    "quantity": result[5] or "Unknown",
-                    "operator": result[6] or "Unknown",
-                    "details": result[7] or "No details available",
-                    "first_flight": result[8] or "Unknown",
-                    "status": result[9] or "Unknown",
-                    "side_view_path": result[10] if len(result) > 10 else None,
-                    "top_view_path": result[11] if len(result) > 11 else None
-                }
-                return info
-            return None
-        except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve aircraft info: {e}")
+class VirtualListbox:
+    """Scrollable list that only materializes the visible window of a row source.
+
+    The underlying Listbox never holds more than its visible rows. Scrolling,
+    the mouse wheel and keyboard navigation move a window over the source,
+    which only has to provide len() and get_range(start, stop), so a source
+    can page rows in from the database on demand.
+    """
+
+    def __init__(self, parent, on_select=None, height=8, margin=20, **listbox_options):
+        self.on_select = on_select
+        self.height = height
+        self.margin = margin
+        self.source = ListSource([])
+        self.top = 0
+        self.selected = None
+        self.window = []
+
+        self.listbox = tk.Listbox(parent, height=height, **listbox_options)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+
+        self.listbox.bind('<<ListboxSelect>>', self._on_click_select)
+        self.listbox.bind('<MouseWheel>', self._on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(3))
+        self.listbox.bind('<Up>', lambda e: self.move_selection(-1))
+        self.listbox.bind('<Down>', lambda e: self.move_selection(1))
+        self.listbox.bind('<Prior>', lambda e: self.move_selection(-self.height))
+        self.listbox.bind('<Next>', lambda e: self.move_selection(self.height))
+        self.listbox.bind('<Home>', lambda e: self.select(0))
+        self.listbox.bind('<End>', lambda e: self.select(len(self.source) - 1))
+
+    def set_source(self, source):
+        """Show a new row source, scrolled to the top with the first row highlighted"""
+        self.source = source
+        self.top = 0
+        self.selected = 0 if len(source) else None
+        self._render()
+
+    def get(self, index):
+        """Return the row at an absolute index"""
+        rows = self.source.get_range(index, index + 1)
+        return rows[0] if rows else None
+
+    def scroll(self, rows):
+        """Scroll the window by a number of rows"""
+        self.top += rows
+        self._render()
+        return "break"
+
+    def select(self, index, notify=True):
+        """Select the row at an absolute index, scrolling it into view"""
+        total = len(self.source)
+        if not total:
+            return "break"
+        index = max(0, min(index, total - 1))
+        self.selected = index
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.height:
+            self.top = index - self.height + 1
+        self._render()
+        if notify and self.on_select:
+            self.on_select(index, self.get(index))
+        return "break"
+
+    def move_selection(self, delta):
+        """Move the selection up or down by delta rows"""
+        return self.select(self.selected + delta if self.selected is not None else 0)
+
+    def _render(self):
+        """Fill the Listbox with the current window and sync the scrollbar"""
+        total = len(self.source)
+        self.top = max(0, min(self.top, max(total - self.height, 0)))
+        stop = min(self.top + self.height, total)
+
+        # Fetch a margin around the window so neighbouring scroll steps are already paged in
+        fetch_start = max(self.top - self.margin, 0)
+        rows = self.source.get_range(fetch_start, min(stop + self.margin, total)) if total else []
+        self.window = rows[self.top - fetch_start:stop - fetch_start]
+
+        self.listbox.delete(0, tk.END)
+        if self.window:
+            self.listbox.insert(tk.END, *self.window)
+        if self.selected is not None and self.top <= self.selected < stop:
+            self.listbox.selection_set(self.selected - self.top)
+            self.listbox.activate(self.selected - self.top)
+
+        if total > self.height:
+            self.scrollbar.set(self.top / total, stop / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        total = len(self.source)
+        if action == 'moveto':
+            self.top = int(float(amount) * total)
+            self._render()
+        elif action == 'scroll':
+            step = self.height if unit == 'pages' else 1
+            self.scroll(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS reports small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-notches * 3)
+
+    def _on_click_select(self, event):
+        selection = self.listbox.curselection()
+        if selection and selection[0] < len(self.window):
+            self.selected = self.top + selection[0]
+            if self.on_select:
+                self.on_select(self.selected, self.window[selection[0]])
+
+
+def image_cache_key(image_path, size=(250, 120), store=None):
+    """Return the image cache key for a file version and size, or None if the file is missing.
+
+    Images packed in the store's atlas are keyed by their packed version, without touching the file.
+    """
+    if not image_path:
+        return None
+    packed = store.lookup_packed(image_path, size) if store is not None else None
+    if packed:
+        return (os.path.abspath(image_path), packed[3], size)
+    try:
+        return (os.path.abspath(image_path), os.stat(image_path).st_mtime_ns, size)
+    except OSError:
+        return None
+
+
+class ImageCache:
+    """Memory-bounded LRU cache for decoded, resized images.
+
+    Keys should identify the source file version and output size, e.g.
+    (path, mtime, size), so edited images are picked up automatically.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return a cached image or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
             return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, image, nbytes):
+        """Store an image, evicting least recently used entries to stay within budget"""
+        if nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[1]
+        self._entries[key] = (image, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+
+    def clear(self):
+        """Drop all cached images"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+
+class NeighborPrefetcher:
+    """Warm detail records and thumbnails for rows around the current selection.
+
+    A worker thread with its own database connection looks up the records and
+    decodes the thumbnails that are not cached yet. Each new selection replaces
+    the queued work, and finished results are delivered on the Tk thread via
+    on_ready(name, language, info, images) so the caller can fill its caches.
+    """
 
-    def __del__(self):
-        """Cleanup method"""
-        self.close()
+    def __init__(self, root, language, get_thumbnail_store, image_cache, on_ready, image_size=(250, 120), poll_ms=25,
+                 snapshot=None):
+        self.root = root
+        self.language = language
+        self.snapshot = snapshot
+        self.get_thumbnail_store = get_thumbnail_store
+        self.image_cache = image_cache
+        self.on_ready = on_ready
+        self.image_size = image_size
+        self.poll_ms = poll_ms
+
+        self._queue = []
+        self._results = queue.Queue()
+        self._poll_id = None
+        self._busy = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="prefetch-worker", daemon=True)
+        self._worker.start()
+
+    def prefetch(self, entries):
+        """Replace the queued work with entries of (name, cached_info_or_None), nearest first"""
+        with self._cond:
+            self._queue = [(name, info, self.language) for name, info in entries]
+            self._busy = bool(self._queue) or self._busy
+            self._cond.notify()
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def set_language(self, language):
+        """Switch languages; queued and in-flight work for the old language is dropped"""
+        with self._cond:
+            self.language = language
+            self._queue = []
+
+    def set_snapshot(self, snapshot):
+        """Look up later records in another in-memory snapshot of the database"""
+        with self._cond:
+            self.snapshot = snapshot
+
+    def stop(self):
+        """Stop the worker thread"""
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except tk.TclError:
+                pass
+            self._poll_id = None
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._worker.join(timeout=1.0)
+
+    def _poll(self):
+        """Hand finished prefetches to on_ready (runs on the Tk thread)"""
+        self._poll_id = None
+        while True:
+            try:
+                name, language, info, images = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if language == self.language:
+                self.on_ready(name, language, info, images)
+        with self._cond:
+            busy = self._busy
+        if busy or not self._results.empty():
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _run(self):
+        """Worker loop: process queued names one by one, nearest neighbours first"""
+        db = None
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._busy = False
+                    self._cond.wait()
+                if self._stopped:
+                    break
+                name, info, language = self._queue.pop(0)
+                uncached = [n for n, i, lang in self._queue if i is None and lang == language]
+                snapshot = self.snapshot
+
+            try:
+                if info is None:
+                    if db is not None and db.snapshot is not snapshot:
+                        db.close()
+                        db = None
+                    if db is None:
+                        db = AircraftDatabase(language, read_only=True, snapshot=snapshot)
+                    db.set_language(language)
+                    # One query for the whole neighbourhood; later entries are served from db's detail cache
+                    info = db.get_many([name] + uncached).get(name)
+                images = []
+                for path in (info['side_view_path'], info['top_view_path']) if info else ():
+                    key = image_cache_key(path, self.image_size, self.get_thumbnail_store())
+                    if key and key not in self.image_cache:
+                        images.append((key, self.get_thumbnail_store().get_image(path, self.image_size)))
+                self._results.put((name, language, info, images))
+            except Exception as e:
+                logger.warning(f"Prefetch failed for {name}: {e}")
+                db = None
+
+        if db is not None:
+            db.close()
+
+
+class PerformanceOverlay:
+    """Small always-on-top window with live timing statistics from the metrics registry"""
+
+    def __init__(self, root, title, on_close, refresh_ms=1000):
+        self.refresh_ms = refresh_ms
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.transient(root)
+        self.window.attributes('-topmost', True)
+        self.window.protocol("WM_DELETE_WINDOW", on_close)
+        self.label = tk.Label(self.window, font=("Courier", 9), justify=tk.LEFT, anchor="nw", padx=8, pady=6)
+        self.label.pack(fill=tk.BOTH, expand=True)
+        self._after_id = None
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the statistics table and schedule the next refresh"""
+        self.label.config(text=format_table(metrics.snapshot()))
+        self._after_id = self.window.after(self.refresh_ms, self.refresh)
+
+    def close(self):
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+            self._after_id = None
+        self.window.destroy()
 
 
 class AircraftLookupGUI:
@@ -369,6 +724,10 @@ class AircraftLookupGUI:
         self.root = root
         self.lang_manager = LanguageManager()
         self.theme_manager = ThemeManager()
+        self.image_cache_mb = 32
+        # Serve reads from an in-memory copy of the database, reloaded when the file changes (0 = never)
+        self.db_snapshot = False
+        self.db_snapshot_reload_s = 30
         
         # Load settings
         self.load_settings()
@@ -377,19 +736,59 @@ class AircraftLookupGUI:
         self.root.geometry("1000x750")
         self.root.minsize(800, 600)
         
-        # Initialize database with error handling
-        try:
-            self.db = AircraftDatabase(self.lang_manager.current_language)
-        except Exception as e:
-            messagebox.showerror(self.lang_manager.get_text('db_error'), 
-                               f"{self.lang_manager.get_text('db_init_failed')} {e}")
-            self.root.destroy()
-            return
+        # The database, search worker and prefetcher are set up after the first frame (see start_loading)
+        self.db = None
+        self.search_scheduler = None
+        self.prefetcher = None
+        self.ready = False
+        self.first_frame_at = None
+        self.loader = None
+        self.db_results = queue.Queue()
+        self.snapshot_loader = None
+        self.snapshot_results = queue.Queue()
         
         # Initialize image references
+        self.image_cache = ImageCache(self.image_cache_mb * 1024 * 1024)
+        self._thumbnail_store = None
+        self._thumbnail_lock = threading.Lock()
         self.side_photo = None
         self.top_photo = None
         
+        # Background image decoding; results are handed back to the Tk thread via a queue
+        self.image_size = (250, 120)
+        self.image_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-loader")
+        self.image_results = queue.Queue()
+        self.image_token = 0
+        self.pending_images = 0
+        self.image_poll_id = None
+        self.placeholder_photo = tk.PhotoImage(width=self.image_size[0], height=self.image_size[1])
+        
+        # Rendered detail records by (name, language); neighbouring rows are warmed in the background
+        self.details_cache = OrderedDict()
+        self.details_token = None
+        self.prefetch_radius = 3
+        
+        # Sighting history is looked up when an entry is shown, on its own thread and read-only connection
+        self.sightings_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sightings")
+        self.sightings_db = None
+        self.sightings_log = None
+        self.sightings_results = queue.Queue()
+        self.sightings_token = 0
+        self.pending_sightings = 0
+        self.sightings_poll_id = None
+        
+        # Timing overlay and on-demand profiling (Tools menu)
+        self.perf_overlay = None
+        self.perf_overlay_var = tk.BooleanVar(value=False)
+        self.profiler = Profiler()
+        
+        # Silhouette matching (Tools menu) runs on its own thread and read-only connection
+        self.identify_db = None
+        self.matcher = None
+        self.matcher_token = None
+        self.identify_thread = None
+        self.identify_results = queue.Queue()
+        
         # Create menu
         self.create_menu()
         
@@ -404,6 +803,130 @@ class AircraftLookupGUI:
         
         # Bind cleanup on window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Load data once the window has painted; the fallback covers windows that start unmapped
+        self.expose_binding = self.root.bind('<Expose>', self.on_first_expose, add='+')
+        self.root.after(500, self.start_loading)
+
+    def on_first_expose(self, event=None):
+        """Record the time to first frame and start loading the data"""
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+            metrics.record("startup.first_frame", self.first_frame_at - STARTUP_T0)
+            self.root.unbind('<Expose>', self.expose_binding)
+            # Let Tk finish painting before the loader competes for the CPU
+            self.root.after(1, self.start_loading)
+
+    def start_loading(self):
+        """Open (and if needed migrate or seed) the database on a background thread"""
+        if self.loader is not None:
+            return
+        language = self.lang_manager.current_language
+
+        def load():
+            try:
+                self.db_results.put(AircraftDatabase.open_reader(language, snapshot=self.db_snapshot))
+            except Exception as e:
+                self.db_results.put(e)
+
+        self.loader = threading.Thread(target=load, name="db-loader", daemon=True)
+        self.loader.start()
+        self.root.after(15, self.poll_loader)
+
+    def poll_loader(self):
+        """Finish startup on the Tk thread once the database is open"""
+        try:
+            result = self.db_results.get_nowait()
+        except queue.Empty:
+            self.root.after(15, self.poll_loader)
+            return
+        if isinstance(result, Exception):
+            messagebox.showerror(self.lang_manager.get_text('db_error'),
+                                 f"{self.lang_manager.get_text('db_init_failed')} {result}")
+            self.root.destroy()
+            return
+        
+        self.db = result
+        if self.db.language != self.lang_manager.current_language:
+            self.db.set_language(self.lang_manager.current_language)
+        language = self.lang_manager.current_language
+        # Debounced background search
+        self.search_scheduler = SearchScheduler(self.root, language, self.update_suggestions,
+                                                snapshot=self.db.snapshot)
+        # Detail records and thumbnails of neighbouring rows are warmed in the background
+        self.prefetcher = NeighborPrefetcher(self.root, language, self.get_thumbnail_store, self.image_cache,
+                                             self.on_prefetched, self.image_size, snapshot=self.db.snapshot)
+        self.ready = True
+        if self.db.snapshot is not None:
+            metrics.record("startup.snapshot_load", self.db.snapshot.load_seconds)
+            logger.info(f"Serving reads from an in-memory snapshot of {self.db.db_file}: loaded in "
+                        f"{self.db.snapshot.load_seconds * 1000:.0f} ms, "
+                        f"{self.db.snapshot.memory_bytes / 1048576:.1f} MB")
+            if self.db_snapshot_reload_s > 0:
+                self.root.after(int(self.db_snapshot_reload_s * 1000), self.check_snapshot)
+        
+        # Pick up anything typed or chosen while the data was loading
+        self.refresh_facets()
+        if not self.apply_filters():
+            self.on_search_change()
+        
+        interactive = time.perf_counter() - STARTUP_T0
+        metrics.record("startup.interactive", interactive)
+        first_frame = (self.first_frame_at - STARTUP_T0) * 1000 if self.first_frame_at else float('nan')
+        logger.info(f"Startup: first frame after {first_frame:.0f} ms, interactive after {interactive * 1000:.0f} ms")
+
+    def check_snapshot(self):
+        """Start copying the database again if the file changed since the current snapshot was taken"""
+        if self.snapshot_loader is None and self.db.snapshot.is_stale():
+            db_file = self.db.db_file
+
+            def load():
+                try:
+                    self.snapshot_results.put(DatabaseSnapshot(db_file))
+                except Exception as e:
+                    self.snapshot_results.put(e)
+
+            self.snapshot_loader = threading.Thread(target=load, name="snapshot-loader", daemon=True)
+            self.snapshot_loader.start()
+            self.root.after(50, self.poll_snapshot)
+        self.root.after(int(self.db_snapshot_reload_s * 1000), self.check_snapshot)
+
+    def poll_snapshot(self):
+        """Switch every reader to the new snapshot once it is loaded (runs on the Tk thread)"""
+        try:
+            result = self.snapshot_results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self.poll_snapshot)
+            return
+        self.snapshot_loader = None
+        if isinstance(result, Exception):
+            # Keep serving the old snapshot; the next check tries again
+            logger.warning(f"Could not reload the database snapshot: {result}")
+            return
+        
+        old = self.db
+        self.db = AircraftDatabase(self.lang_manager.current_language, snapshot=result)
+        self.search_scheduler.set_snapshot(result)
+        self.prefetcher.set_snapshot(result)
+        # A new in-memory database starts with the same change token, so drop the rendered details explicitly
+        self.details_cache.clear()
+        self.details_token = None
+        # Worker connections still reading the old copy keep it alive until they switch over
+        old.close()
+        old.snapshot.close()
+        metrics.record("db.snapshot_reload", result.load_seconds)
+        
+        self.refresh_facets()
+        if isinstance(self.suggestions_list.source, AircraftPager):
+            self.show_all_aircraft()
+
+    def get_thumbnail_store(self):
+        """Open the thumbnail store (and import Pillow) on first use; safe to call from worker threads"""
+        with self._thumbnail_lock:
+            if self._thumbnail_store is None:
+                from wingid_thumbnails import ThumbnailStore
+                self._thumbnail_store = ThumbnailStore()
+            return self._thumbnail_store
 
     def load_settings(self):
         """Load application settings"""
@@ -413,6 +936,9 @@ class AircraftLookupGUI:
                     settings = json.load(f)
                     self.lang_manager.set_language(settings.get('language', 'en'))
                     self.theme_manager.set_theme(settings.get('theme', 'light'))
+                    self.image_cache_mb = settings.get('image_cache_mb', self.image_cache_mb)
+                    self.db_snapshot = settings.get('db_snapshot', self.db_snapshot)
+                    self.db_snapshot_reload_s = settings.get('db_snapshot_reload_s', self.db_snapshot_reload_s)
         except Exception as e:
             logger.warning(f"Could not load settings: {e}")
 
@@ -421,7 +947,10 @@ class AircraftLookupGUI:
         try:
             settings = {
                 'language': self.lang_manager.current_language,
-                'theme': self.theme_manager.current_theme
+                'theme': self.theme_manager.current_theme,
+                'image_cache_mb': self.image_cache_mb,
+                'db_snapshot': self.db_snapshot,
+                'db_snapshot_reload_s': self.db_snapshot_reload_s
             }
             with open('settings.json', 'w') as f:
                 json.dump(settings, f)
@@ -444,6 +973,139 @@ class AircraftLookupGUI:
         menubar.add_cascade(label=self.lang_manager.get_text('theme_menu'), menu=theme_menu)
         theme_menu.add_command(label=self.lang_manager.get_text('light_theme'), command=lambda: self.change_theme('light'))
         theme_menu.add_command(label=self.lang_manager.get_text('dark_theme'), command=lambda: self.change_theme('dark'))
+        
+        # Tools menu
+        self.tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label=self.lang_manager.get_text('tools_menu'), menu=self.tools_menu)
+        self.tools_menu.add_command(label=self.lang_manager.get_text('identify_image'), command=self.identify_from_image)
+        self.tools_menu.add_separator()
+        self.tools_menu.add_checkbutton(label=self.lang_manager.get_text('perf_overlay'),
+                                        variable=self.perf_overlay_var, command=self.toggle_perf_overlay)
+        self.tools_menu.add_command(label=self.lang_manager.get_text('save_metrics'), command=self.save_metrics)
+        self.tools_menu.add_command(label=self.lang_manager.get_text('start_profiling'), command=self.toggle_profiling)
+
+    def identify_from_image(self):
+        """List the aircraft whose silhouettes look most like a picture chosen by the user"""
+        if not self.ready or self.identify_thread is not None:
+            return
+        path = filedialog.askopenfilename(parent=self.root, title=self.lang_manager.get_text('identify_image'),
+                                          filetypes=[(self.lang_manager.get_text('image_files'),
+                                                      '*.png *.jpg *.jpeg *.gif *.bmp *.webp'), ('*', '*')])
+        if not path:
+            return
+
+        def identify():
+            try:
+                self.identify_results.put(self.match_silhouette(path))
+            except Exception as e:
+                self.identify_results.put(e)
+
+        self.identify_thread = threading.Thread(target=identify, name="identify", daemon=True)
+        self.identify_thread.start()
+        self.root.config(cursor='watch')
+        self.root.after(50, self.poll_identify)
+
+    def match_silhouette(self, path, k=50):
+        """Match an image against the silhouette index (worker thread); None if there is no index"""
+        from wingid_identify import SilhouetteMatcher
+        snapshot = self.db.snapshot
+        if self.identify_db is not None and self.identify_db.snapshot is not snapshot:
+            # The snapshot was reloaded; its new connection starts with the same change token
+            self.identify_db.close()
+            self.identify_db = self.matcher = None
+        if self.identify_db is None:
+            self.identify_db = AircraftDatabase(self.lang_manager.current_language, db_file=self.db.db_file,
+                                                read_only=True, snapshot=snapshot)
+        # The index is held in memory and only reloaded after the database changed
+        token = self.identify_db.change_token()
+        if self.matcher is None or token != self.matcher_token:
+            self.matcher = SilhouetteMatcher.load(self.identify_db.conn)
+            self.matcher_token = token
+        if not len(self.matcher):
+            return None
+        return self.matcher.match(path, k)
+
+    def poll_identify(self):
+        """Show the matches (or what went wrong) on the Tk thread"""
+        try:
+            result = self.identify_results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self.poll_identify)
+            return
+        self.identify_thread = None
+        self.root.config(cursor='')
+        if isinstance(result, ImportError):
+            messagebox.showerror(self.lang_manager.get_text('app_error'),
+                                 self.lang_manager.get_text('identify_unavailable'))
+        elif isinstance(result, Exception):
+            messagebox.showerror(self.lang_manager.get_text('app_error'),
+                                 f"{self.lang_manager.get_text('identify_failed')} {result}")
+        elif result is None:
+            messagebox.showinfo(self.lang_manager.get_text('identify_image'),
+                                self.lang_manager.get_text('identify_no_index'))
+        else:
+            logger.info(f"Closest silhouettes: {[(name, round(distance, 3)) for name, _, distance in result[:5]]}")
+            # A search still waiting for the debounce must not replace the matches
+            self.search_scheduler.cancel()
+            self.update_suggestions([name for name, _, _ in result])
+
+    def toggle_perf_overlay(self):
+        """Show or hide the live timing statistics window"""
+        if self.perf_overlay_var.get() and self.perf_overlay is None:
+            self.perf_overlay = PerformanceOverlay(self.root, self.lang_manager.get_text('perf_title'),
+                                                   on_close=self.hide_perf_overlay)
+        elif not self.perf_overlay_var.get() and self.perf_overlay is not None:
+            self.perf_overlay.close()
+            self.perf_overlay = None
+
+    def hide_perf_overlay(self):
+        """Close the timing statistics window and untick its menu entry"""
+        self.perf_overlay_var.set(False)
+        self.toggle_perf_overlay()
+
+    def metrics_context(self):
+        """Describe the running application for metrics snapshots"""
+        if self.db is None:
+            return {'language': self.lang_manager.current_language, 'loading': True}
+        context = {
+            'db_file': os.path.abspath(self.db.db_file),
+            'aircraft': self.db.count_aircraft(),
+            'language': self.lang_manager.current_language,
+            'fts_tokenizer': self.db.fts_tokenizer,
+            'image_cache_mb': self.image_cache_mb,
+            'details_cached': len(self.details_cache),
+        }
+        if self.db.snapshot is not None:
+            context['snapshot'] = {'load_ms': round(self.db.snapshot.load_seconds * 1000, 1),
+                                   'memory_mb': round(self.db.snapshot.memory_bytes / 1048576, 1)}
+        return context
+
+    def save_metrics(self):
+        """Write a metrics snapshot to a JSON file chosen by the user"""
+        path = filedialog.asksaveasfilename(parent=self.root, defaultextension='.json',
+                                            initialfile=time.strftime('wingid-metrics-%Y%m%d-%H%M%S.json'),
+                                            filetypes=[('JSON', '*.json')])
+        if path:
+            try:
+                metrics.dump(path, self.metrics_context())
+            except OSError as e:
+                messagebox.showerror(self.lang_manager.get_text('app_error'), str(e))
+
+    def toggle_profiling(self):
+        """Start a cProfile capture of the UI thread, or stop it and save it to a file"""
+        index = self.tools_menu.index(tk.END)
+        if not self.profiler.active:
+            self.profiler.start()
+            self.tools_menu.entryconfig(index, label=self.lang_manager.get_text('stop_profiling'))
+            return
+        path = filedialog.asksaveasfilename(parent=self.root, defaultextension='.prof',
+                                            initialfile=time.strftime('wingid-%Y%m%d-%H%M%S.prof'),
+                                            filetypes=[('cProfile', '*.prof')])
+        try:
+            self.profiler.stop(path or None)
+        except OSError as e:
+            messagebox.showerror(self.lang_manager.get_text('app_error'), str(e))
+        self.tools_menu.entryconfig(index, label=self.lang_manager.get_text('start_profiling'))
 
     def change_language(self, lang):
         """Change application language"""
@@ -451,15 +1113,24 @@ class AircraftLookupGUI:
             self.lang_manager.set_language(lang)
             self.save_settings()
             
-            # Reinitialize database with new language
-            self.db.close()
-            self.db = AircraftDatabase(lang)
-            
             # Update GUI text
             self.update_gui_text()
+            if not self.ready:
+                return
+            
+            # One database holds every language, so switching only changes the queries
+            self.db.set_language(lang)
+            self.search_scheduler.set_language(lang)
+            self.prefetcher.set_language(lang)
+            self.refresh_facets()
             
-            # Refresh search results
-            self.update_suggestions(self.db.search_aircraft(""))
+            # set_language dropped any search in flight; rerun it with its filters in the new language
+            query = self.search_var.get()
+            if query.strip() or self.filters:
+                self.search_scheduler.schedule(query, delay_ms=0)
+            selected = self.suggestions_list.selected
+            if selected is not None:
+                self.show_aircraft_details(self.suggestions_list.get(selected))
 
     def change_theme(self, theme):
         """Change application theme"""
@@ -516,6 +1187,13 @@ class AircraftLookupGUI:
         self.side_view_label.configure(text=self.lang_manager.get_text('side_view'))
         self.top_view_label.configure(text=self.lang_manager.get_text('top_view'))
         
+        # Filter labels and the localized drop-down entries
+        self.filters_frame.configure(text=self.lang_manager.get_text('filters_frame'))
+        self.operator_filter_label.configure(text=self.lang_manager.get_text('operator_filter'))
+        self.rarity_filter_label.configure(text=self.lang_manager.get_text('rarity_filter'))
+        self.first_flight_filter_label.configure(text=self.lang_manager.get_text('first_flight_filter'))
+        self.max_units_filter_label.configure(text=self.lang_manager.get_text('max_units_filter'))
+        
     def create_widgets(self):
         """Create the main GUI widgets"""
         # Main frame with padding
@@ -542,15 +1220,15 @@ class AircraftLookupGUI:
         self.suggestions_frame = ttk.Frame(self.search_frame)
         self.suggestions_frame.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
         
-        self.suggestions_listbox = tk.Listbox(self.suggestions_frame, height=8, font=('Consolas', 10))
+        # Only the visible rows are materialized, so huge result sets stay cheap
+        self.suggestions_list = VirtualListbox(self.suggestions_frame, on_select=self.on_suggestion_select,
+                                               height=8, font=('Consolas', 10))
+        self.suggestions_listbox = self.suggestions_list.listbox
         self.suggestions_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E))
-        self.suggestions_listbox.bind('<<ListboxSelect>>', self.on_suggestion_select)
+        self.suggestions_list.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
-        # Scrollbar for suggestions
-        suggestions_scrollbar = ttk.Scrollbar(self.suggestions_frame, orient="vertical")
-        suggestions_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.suggestions_listbox.config(yscrollcommand=suggestions_scrollbar.set)
-        suggestions_scrollbar.config(command=self.suggestions_listbox.yview)
+        # Facet filters, answered from indexed columns
+        self.create_filter_widgets()
         
         # Details section
         self.details_frame = ttk.LabelFrame(main_frame, text=self.lang_manager.get_text('details_frame'), padding="10")
@@ -592,8 +1270,98 @@ class AircraftLookupGUI:
         self.images_frame.columnconfigure(0, weight=1)
         self.images_frame.columnconfigure(1, weight=1)
         
-        # Load initial aircraft list
-        self.update_suggestions(self.db.search_aircraft(""))
+    def create_filter_widgets(self):
+        """Create the operator, rarity, first flight and unit count filters below the suggestions"""
+        self.filters = {}
+        self.filter_after_id = None
+        self.operator_choices = {}
+        self.rarity_choices = {}
+        
+        self.filters_frame = ttk.LabelFrame(self.search_frame, text=self.lang_manager.get_text('filters_frame'), padding="5")
+        self.filters_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        self.operator_filter_label = ttk.Label(self.filters_frame, text=self.lang_manager.get_text('operator_filter'))
+        self.operator_filter_label.grid(row=0, column=0, sticky=tk.W)
+        self.operator_var = tk.StringVar()
+        self.operator_combo = ttk.Combobox(self.filters_frame, textvariable=self.operator_var, state="readonly", width=24)
+        self.operator_combo.grid(row=0, column=1, padx=(5, 15))
+        
+        self.rarity_filter_label = ttk.Label(self.filters_frame, text=self.lang_manager.get_text('rarity_filter'))
+        self.rarity_filter_label.grid(row=0, column=2, sticky=tk.W)
+        self.rarity_var = tk.StringVar()
+        self.rarity_combo = ttk.Combobox(self.filters_frame, textvariable=self.rarity_var, state="readonly", width=18)
+        self.rarity_combo.grid(row=0, column=3, padx=(5, 15))
+        
+        self.first_flight_filter_label = ttk.Label(self.filters_frame, text=self.lang_manager.get_text('first_flight_filter'))
+        self.first_flight_filter_label.grid(row=0, column=4, sticky=tk.W)
+        self.first_flight_min_var = tk.StringVar()
+        ttk.Entry(self.filters_frame, textvariable=self.first_flight_min_var, width=6).grid(row=0, column=5, padx=(5, 0))
+        ttk.Label(self.filters_frame, text="–").grid(row=0, column=6, padx=2)
+        self.first_flight_max_var = tk.StringVar()
+        ttk.Entry(self.filters_frame, textvariable=self.first_flight_max_var, width=6).grid(row=0, column=7, padx=(0, 15))
+        
+        self.max_units_filter_label = ttk.Label(self.filters_frame, text=self.lang_manager.get_text('max_units_filter'))
+        self.max_units_filter_label.grid(row=0, column=8, sticky=tk.W)
+        self.max_units_var = tk.StringVar()
+        ttk.Entry(self.filters_frame, textvariable=self.max_units_var, width=7).grid(row=0, column=9, padx=(5, 0))
+        
+        for combo in (self.operator_combo, self.rarity_combo):
+            combo.bind('<<ComboboxSelected>>', self.on_filters_change)
+        for var in (self.first_flight_min_var, self.first_flight_max_var, self.max_units_var):
+            var.trace('w', self.on_filters_change)
+        
+    def refresh_facets(self):
+        """Fill the filter drop-downs with facet values and their counts under the current filters"""
+        counts = self.db.facet_counts(**self.filters)
+        any_option = self.lang_manager.get_text('any_option')
+        rarity_names = self.lang_manager.get_text('rarity_names')
+        
+        self.operator_choices = {any_option: None}
+        for name, count in sorted(counts['operator'].items(), key=lambda item: (-item[1], item[0].lower())):
+            self.operator_choices[f"{name} ({count})"] = name
+        self.rarity_choices = {any_option: None}
+        for level, rarity in enumerate(RARITY_LEVELS):
+            if rarity in counts['rarity']:
+                self.rarity_choices[f"{rarity_names[level]} ({counts['rarity'][rarity]})"] = rarity
+        
+        for combo, var, choices, key in ((self.operator_combo, self.operator_var, self.operator_choices, 'operators'),
+                                         (self.rarity_combo, self.rarity_var, self.rarity_choices, 'rarity')):
+            combo['values'] = list(choices)
+            selected = self.filters.get(key, [None])[0]
+            var.set(next((label for label, value in choices.items() if value == selected), any_option))
+        
+    def on_filters_change(self, *args):
+        """Debounce filter edits, so typing a year doesn't query on every keystroke"""
+        if self.filter_after_id is not None:
+            self.root.after_cancel(self.filter_after_id)
+        self.filter_after_id = self.root.after(300, self.apply_filters)
+        
+    def apply_filters(self):
+        """Read the filter widgets and re-run the search if the filters changed; returns whether it did"""
+        self.filter_after_id = None
+        if not self.ready:
+            return False
+        filters = {}
+        operator = self.operator_choices.get(self.operator_var.get())
+        if operator:
+            filters['operators'] = [operator]
+        rarity = self.rarity_choices.get(self.rarity_var.get())
+        if rarity:
+            filters['rarity'] = [rarity]
+        for key, var in (('first_flight_min', self.first_flight_min_var),
+                         ('first_flight_max', self.first_flight_max_var),
+                         ('max_units', self.max_units_var)):
+            value = var.get().strip()
+            if value.isdigit():
+                filters[key] = int(value)
+        if filters == self.filters:
+            return False
+        
+        self.filters = filters
+        self.search_scheduler.set_filters(filters)
+        self.refresh_facets()
+        self.on_search_change()
+        return True
         
     def clear_search(self):
         """Clear the search field and show all aircraft"""
@@ -602,49 +1370,91 @@ class AircraftLookupGUI:
         
     def on_search_change(self, *args):
         """Handle search text changes"""
+        if not self.ready:
+            return
         query = self.search_var.get()
-        matches = self.db.search_aircraft(query)
-        self.update_suggestions(matches)
+        if query.strip() or self.filters:
+            self.search_scheduler.schedule(query)
+        else:
+            # The full list is paged lazily from the database, no search needed
+            self.search_scheduler.cancel()
+            self.show_all_aircraft()
         
+    @timed("gui.update_suggestions")
     def update_suggestions(self, suggestions):
-        """Update the suggestions listbox"""
-        self.suggestions_listbox.delete(0, tk.END)
-        for suggestion in suggestions:
-            self.suggestions_listbox.insert(tk.END, suggestion)
-        
-        # Auto-select first item if there are suggestions
-        if suggestions:
-            self.suggestions_listbox.selection_set(0)
+        """Update the suggestions list (first item is highlighted)"""
+        self.suggestions_list.set_source(ListSource(suggestions))
+
+    def show_all_aircraft(self):
+        """Show the complete aircraft list, paged in from the database as it scrolls"""
+        self.suggestions_list.set_source(AircraftPager(self.db))
             
-    def on_suggestion_select(self, event):
+    def on_suggestion_select(self, index, aircraft_name):
         """Handle suggestion selection"""
-        selection = self.suggestions_listbox.curselection()
-        if selection:
-            aircraft_name = self.suggestions_listbox.get(selection[0])
+        if aircraft_name:
             self.show_aircraft_details(aircraft_name)
-            
-    def load_and_resize_image(self, image_path, size=(250, 120)):
-        """Load and resize image with error handling"""
-        try:
-            if image_path and os.path.exists(image_path):
-                image = Image.open(image_path)
-                image = image.resize(size, Image.Resampling.LANCZOS)
-                return ImageTk.PhotoImage(image)
-        except Exception as e:
-            logger.warning(f"Failed to load image {image_path}: {e}")
-        return None
-            
-    def show_aircraft_details(self, aircraft_name):
-        """Display comprehensive aircraft details and images"""
-        info = self.db.get_aircraft_info(aircraft_name)
+            self.prefetch_neighbors(index)
+
+    def prefetch_neighbors(self, index):
+        """Queue the rows around index for background prefetching, nearest first"""
+        source = self.suggestions_list.source
+        start = max(index - self.prefetch_radius, 0)
+        rows = source.get_range(start, min(index + self.prefetch_radius + 1, len(source)))
+        neighbors = sorted((i for i in range(start, start + len(rows)) if i != index),
+                           key=lambda i: (abs(i - index), i < index))
+        language = self.lang_manager.current_language
+        entries = []
+        for i in neighbors:
+            cached = self.details_cache.get((rows[i - start], language))
+            entries.append((rows[i - start], cached[0] if cached else None))
+        self.prefetcher.prefetch(entries)
+
+    def on_prefetched(self, name, language, info, images):
+        """Store prefetched records and thumbnails in the caches"""
         if info:
-            self.details_text.delete(1.0, tk.END)
-            
-            # Get translated text elements
-            t = self.lang_manager.get_text('aircraft_info')
-            
-            # Format detailed information
-            details = f"""
+            self.validate_details_cache()
+            self.cache_details(name, language, info)
+        for key, image in images:
+            if key not in self.image_cache:
+                self.image_cache.put(key, photo_image(image), key[2][0] * key[2][1] * 4)
+
+    def get_details(self, aircraft_name):
+        """Return (detail record, rendered text) for an aircraft, from the cache when possible"""
+        self.validate_details_cache()
+        key = (aircraft_name, self.lang_manager.current_language)
+        entry = self.details_cache.get(key)
+        if entry is None:
+            info = self.db.get_aircraft_info(aircraft_name)
+            if not info:
+                return None, None
+            entry = self.cache_details(aircraft_name, key[1], info)
+        else:
+            self.details_cache.move_to_end(key)
+        return entry
+
+    def validate_details_cache(self):
+        """Drop cached details if the database changed since they were rendered"""
+        token = self.db.change_token()
+        if token != self.details_token:
+            self.details_cache.clear()
+            self.details_token = token
+
+    def cache_details(self, aircraft_name, language, info, max_entries=256):
+        """Render a detail record and add it to the LRU details cache; returns (info, text)"""
+        entry = (info, self.render_details(aircraft_name, info))
+        self.details_cache[(aircraft_name, language)] = entry
+        self.details_cache.move_to_end((aircraft_name, language))
+        while len(self.details_cache) > max_entries:
+            self.details_cache.popitem(last=False)
+        return entry
+
+    def render_details(self, aircraft_name, info):
+        """Format a detail record for the details panel in the current language"""
+        # Get translated text elements
+        t = self.lang_manager.get_text('aircraft_info')
+        
+        # Format detailed information
+        return f"""
 ═══════════════════════════════════════════════════════════════════════════════
                                 {aircraft_name.upper()}
 ═══════════════════════════════════════════════════════════════════════════════
@@ -672,45 +1482,189 @@ class AircraftLookupGUI:
 ═══════════════════════════════════════════════════════════════════════════════
             """
             
+    def load_sightings(self, aircraft_name):
+        """Look up an aircraft's sighting history in the background; poll_sightings adds it to the details"""
+        self.sightings_token += 1
+        self.pending_sightings += 1
+        self.sightings_pool.submit(self.fetch_sightings, self.sightings_token, aircraft_name, self.db.db_file,
+                                   self.db.snapshot)
+        if self.sightings_poll_id is None:
+            self.sightings_poll_id = self.root.after(15, self.poll_sightings)
+
+    def fetch_sightings(self, token, aircraft_name, db_file, snapshot):
+        """Query a sighting history (sightings thread); the weekly window ends on the day it is shown"""
+        from wingid_sightings import SightingLog
+        history = None
+        try:
+            if self.sightings_db is not None and self.sightings_db.snapshot is not snapshot:
+                self.sightings_db.close()
+                self.sightings_db = None
+            if self.sightings_db is None:
+                self.sightings_db = AircraftDatabase(db_file=db_file, read_only=True, snapshot=snapshot)
+                self.sightings_log = SightingLog(self.sightings_db)
+            # Totals and weekly counts come from the daily rollups, the latest sightings from the (aircraft, time) index
+            history = self.sightings_log.history(aircraft_name)
+        except Exception as e:
+            logger.warning(f"Failed to load sightings of {aircraft_name}: {e}")
+            self.sightings_db = None
+        self.sightings_results.put((token, history))
+
+    def poll_sightings(self):
+        """Add a finished sighting history above the details footer; results for a previous selection are discarded"""
+        self.sightings_poll_id = None
+        while True:
+            try:
+                token, history = self.sightings_results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_sightings -= 1
+            if token != self.sightings_token or not history:
+                continue
+            footer = self.details_text.search(self.lang_manager.get_text('aircraft_info')['last_updated'], tk.END,
+                                              backwards=True)
+            if footer:
+                self.details_text.insert(f"{footer} -1 lines linestart", self.render_sightings(history))
+        if self.pending_sightings:
+            self.sightings_poll_id = self.root.after(15, self.poll_sightings)
+
+    def render_sightings(self, history):
+        """Format a sighting history for the details panel"""
+        t = self.lang_manager.get_text('aircraft_info')
+        lines = [t['sightings'],
+                 f"{t['sightings_logged']}          {history['sightings']}  "
+                 f"({history['first_seen'][:10]} – {history['last_seen'][:10]})",
+                 f"{t['sightings_weeks']}   {' '.join(str(count) for _, count in history['weeks'])}",
+                 t['sightings_recent']]
+        for seen_at, location, tail_number, notes in history['recent']:
+            parts = (seen_at[:16].replace('T', ' '), location, tail_number, notes)
+            lines.append("        " + "  ".join(part for part in parts if part))
+        return "\n".join(lines) + "\n\n"
+
+    @timed("gui.load_and_resize_image")
+    def load_and_resize_image(self, image_path, size=(250, 120)):
+        """Load and resize image with error handling (results are cached per file version and size)"""
+        try:
+            key = image_cache_key(image_path, size, self.get_thumbnail_store())
+            if key:
+                photo = self.image_cache.get(key)
+                if photo is None:
+                    # Slices the packed atlas or reads the pre-scaled thumbnail, creating it on first use
+                    photo = photo_image(self.get_thumbnail_store().get_image(image_path, size))
+                    self.image_cache.put(key, photo, size[0] * size[1] * 4)
+                return photo
+        except Exception as e:
+            logger.warning(f"Failed to load image {image_path}: {e}")
+        return None
+            
+    @timed("gui.show_aircraft_details")
+    def show_aircraft_details(self, aircraft_name):
+        """Display comprehensive aircraft details and images"""
+        info, details = self.get_details(aircraft_name)
+        if info:
+            self.details_text.delete(1.0, tk.END)
+            # Rendered once per (name, language) and reused until the database changes
             self.details_text.insert(1.0, details)
             
             # Load and display images
             self.load_aircraft_images(info)
+            # Not part of the cached text: the history changes with every logged sighting and every day
+            self.load_sightings(aircraft_name)
             
         else:
+            self.sightings_token += 1
             self.details_text.delete(1.0, tk.END)
             error_msg = f"{self.lang_manager.get_text('no_info')} {aircraft_name}"
             self.details_text.insert(1.0, error_msg)
             self.reset_image_displays()
     
     def load_aircraft_images(self, info):
-        """Load aircraft silhouette images"""
-        # Side view
-        self.side_photo = self.load_and_resize_image(info['side_view_path'])
-        if self.side_photo:
-            self.side_view_label.config(image=self.side_photo, text="")
-        else:
-            self.side_view_label.config(image="", text=self.lang_manager.get_text('side_view'))
+        """Load aircraft silhouette images, decoding cache misses on the image pool"""
+        self.image_token += 1
+        for view, path in (('side', info['side_view_path']), ('top', info['top_view_path'])):
+            key = image_cache_key(path, self.image_size, self.get_thumbnail_store() if path else None)
+            photo = self.image_cache.get(key) if key else None
+            if photo is not None or key is None:
+                self.set_view_image(view, photo)
+                continue
+            
+            # Show a placeholder of the final size so the layout doesn't jump
+            self.view_label(view).config(image=self.placeholder_photo, compound="center",
+                                         text=self.lang_manager.get_text('loading_image'))
+            future = self.image_pool.submit(self.get_thumbnail_store().get_image, path, self.image_size)
+            future.add_done_callback(functools.partial(self._queue_image_result, self.image_token, view, key))
+            self.pending_images += 1
         
-        # Top view
-        self.top_photo = self.load_and_resize_image(info['top_view_path'])
-        if self.top_photo:
-            self.top_view_label.config(image=self.top_photo, text="")
+        if self.pending_images and self.image_poll_id is None:
+            self.image_poll_id = self.root.after(15, self.poll_image_results)
+
+    def _queue_image_result(self, token, view, key, future):
+        """Hand a finished decode to the Tk thread (runs on a pool thread)"""
+        self.image_results.put((token, view, key, future))
+
+    def poll_image_results(self):
+        """Swap in decoded images; results for a previous selection are discarded"""
+        self.image_poll_id = None
+        while True:
+            try:
+                token, view, key, future = self.image_results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_images -= 1
+            if token != self.image_token:
+                continue
+            try:
+                photo = photo_image(future.result())
+                self.image_cache.put(key, photo, key[2][0] * key[2][1] * 4)
+            except Exception as e:
+                logger.warning(f"Failed to load image {key[0]}: {e}")
+                photo = None
+            self.set_view_image(view, photo)
+        
+        if self.pending_images:
+            self.image_poll_id = self.root.after(15, self.poll_image_results)
+
+    def view_label(self, view):
+        """Return the label widget for the 'side' or 'top' view"""
+        return self.side_view_label if view == 'side' else self.top_view_label
+
+    def set_view_image(self, view, photo):
+        """Show a photo in a view, or the view's 'no image' text if photo is None"""
+        label = self.view_label(view)
+        if photo:
+            label.config(image=photo, compound="none", text="")
         else:
-            self.top_view_label.config(image="", text=self.lang_manager.get_text('top_view'))
+            label.config(image="", compound="none", text=self.lang_manager.get_text(f'{view}_view'))
+        # Keep a reference so Tk doesn't lose the image
+        setattr(self, f'{view}_photo', photo)
     
     def reset_image_displays(self):
         """Reset image displays to default state"""
-        self.side_view_label.config(image="", text=self.lang_manager.get_text('side_view'))
-        self.top_view_label.config(image="", text=self.lang_manager.get_text('top_view'))
-        self.side_photo = None
-        self.top_photo = None
+        self.image_token += 1
+        self.set_view_image('side', None)
+        self.set_view_image('top', None)
     
     def on_closing(self):
         """Handle application closing"""
         try:
             self.save_settings()
-            self.db.close()
+            self.profiler.stop()
+            if self.perf_overlay is not None:
+                self.perf_overlay.close()
+            if self.ready:
+                self.search_scheduler.stop()
+                self.prefetcher.stop()
+            self.image_pool.shutdown(wait=True)
+            self.sightings_pool.shutdown(wait=True)
+            if self.sightings_db is not None:
+                self.sightings_db.close()
+            if self._thumbnail_store is not None:
+                self._thumbnail_store.close()
+            if self.db is not None:
+                self.db.close()
+                if self.db.snapshot is not None:
+                    self.db.snapshot.close()
+            if self.identify_db is not None:
+                self.identify_db.close()
         except:
             pass
         self.root.destroy()
@@ -0,0 +1,67 @@
+"""Tests for wingid_sync.py (run with: python -m unittest test_wingid_sync)"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from wingid_db import AircraftDatabase
+from wingid_sync import sync_file
+
+
+class SyncConflictTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.INFO)
+        self.directory = tempfile.mkdtemp()
+        self.source_file = os.path.join(self.directory, "source.db")
+        self.target_file = os.path.join(self.directory, "target.db")
+        with AircraftDatabase(db_file=self.source_file) as db:
+            self.name = db.conn.execute("SELECT name FROM aircraft ORDER BY id LIMIT 1").fetchone()[0]
+        shutil.copyfile(self.source_file, self.target_file)
+        self.target = AircraftDatabase(db_file=self.target_file, seed=False)
+        # Identical copies: the first sync only records the watermark
+        self.assertFalse(sync_file(self.target, self.source_file).conflicts)
+
+    def tearDown(self):
+        self.target.close()
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.directory)
+
+    def edit(self, db, details):
+        # updated_at has millisecond resolution; stay clear of the last watermark
+        time.sleep(0.01)
+        with db.conn:
+            db.conn.execute("UPDATE aircraft SET details = ? WHERE name = ?", (details, self.name))
+
+    def details(self, db):
+        return db.conn.execute("SELECT details FROM aircraft WHERE name = ?", (self.name,)).fetchone()[0]
+
+    def test_unresolved_conflict_is_reported_until_resolved(self):
+        with AircraftDatabase(db_file=self.source_file, seed=False) as source:
+            self.edit(source, "edited there")
+        self.edit(self.target, "edited here")
+
+        for _ in range(2):
+            report = sync_file(self.target, self.source_file)
+            self.assertEqual([conflict["name"] for conflict in report.unresolved], [self.name])
+            self.assertEqual(report.kept, 0)
+            self.assertEqual(self.details(self.target), "edited here")
+
+        report = sync_file(self.target, self.source_file, prefer="source")
+        self.assertEqual(report.updated, 1)
+        self.assertEqual(self.details(self.target), "edited there")
+        self.assertFalse(sync_file(self.target, self.source_file).conflicts)
+
+    def test_dry_run_keeps_conflicts_pending(self):
+        with AircraftDatabase(db_file=self.source_file, seed=False) as source:
+            self.edit(source, "edited there")
+        self.edit(self.target, "edited here")
+
+        sync_file(self.target, self.source_file)
+        sync_file(self.target, self.source_file, prefer="source", dry_run=True)
+        self.assertEqual(len(sync_file(self.target, self.source_file).unresolved), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,302 @@
+"""Search and lookup benchmarks for WingID, with JSON results for regression tracking.
+
+Runs the operations the GUI performs against a database (usually one made by
+wingid_synth.py) and reports p50/p95/p99 latency and throughput for each:
+
+    search_prefix   a partial name as typed, with an empty search cache
+    search_typing   every keystroke of a name in turn, as the scheduler sees them
+    search_word     a broad role or operator word, first 50 results
+    detail          get_aircraft_info for a random aircraft
+    image_cold      render a silhouette thumbnail that is not stored yet
+    image_warm      read an already stored thumbnail
+    identify        match an indexed silhouette image against the whole silhouette index
+    listbox_search  put a search result into the suggestion list
+    listbox_all     show the full, lazily paged aircraft list
+
+    python wingid_bench.py --db synth_100k.db --output bench.json
+    python wingid_bench.py --db synth_100k.db --baseline bench-previous.json
+
+Image benchmarks need Pillow, identify also NumPy and an index built with
+wingid_identify.py. Without a display, the listbox benchmarks time
+the row sources that feed the list instead of the Tk widget itself; the mode
+is recorded in the results. With --baseline, any operation whose p95 grew by
+more than --tolerance is reported and the exit status is 1.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from wingid_db import AircraftDatabase
+from wingid_metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FORMAT = 1
+SEARCH_WORDS = ("refueling", "patrol", "transport", "reconnaissance", "warning", "bomber",
+                "usaf", "navy", "nato", "luftwaffe", "radar", "hawk", "tanker", "sentry")
+
+
+def summarize(latencies, elapsed):
+    """Return latency percentiles (ms) and throughput for one operation"""
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "ops_per_second": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+    }
+
+
+def measure(operation, inputs, warmup=0):
+    """Call operation once per input and return its summary"""
+    for value in inputs[:warmup]:
+        operation(value)
+    latencies = []
+    started = time.perf_counter()
+    for value in inputs:
+        start = time.perf_counter()
+        operation(value)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def sample_names(db, count, seed):
+    """Pick count aircraft names reproducibly (the same ids for the same catalog and seed)"""
+    rng = random.Random(seed)
+    max_id = db.conn.execute("SELECT MAX(id) FROM aircraft").fetchone()[0] or 0
+    names = []
+    for _ in range(count * 4):
+        if len(names) >= count or not max_id:
+            break
+        row = db.conn.execute("SELECT name FROM aircraft WHERE id = ?", (rng.randint(1, max_id),)).fetchone()
+        if row:
+            names.append(row[0])
+    return names
+
+
+def bench_search(db, names, rng):
+    """Benchmark the three search workloads"""
+    def cold_search(query):
+        db.search_cache.clear()
+        db.search_aircraft(query)
+
+    def typing(names):
+        latencies = []
+        started = time.perf_counter()
+        for name in names:
+            # Each name is typed from an empty search box with a cold cache, like a new search in the GUI
+            db.search_cache.clear()
+            for i in range(1, len(name) + 1):
+                start = time.perf_counter()
+                db.search_aircraft(name[:i])
+                latencies.append(time.perf_counter() - start)
+        return summarize(latencies, time.perf_counter() - started)
+
+    prefixes = [name[:rng.randint(2, max(len(name) - 1, 2))] for name in names]
+    words = [rng.choice(SEARCH_WORDS) for _ in names]
+    return {
+        "search_prefix": measure(cold_search, prefixes, warmup=10),
+        "search_typing": typing(names[:max(len(names) // 10, 1)]),
+        "search_word": measure(lambda word: db.search_aircraft(word, 50), words, warmup=5),
+    }
+
+
+def bench_images(db, names, limit):
+    """Benchmark thumbnail rendering and reading, or record why it was skipped"""
+    try:
+        from wingid_thumbnails import ThumbnailStore
+    except ImportError:
+        return {"image_cold": {"skipped": "Pillow is not installed"}}
+
+    paths = []
+    for name in names:
+        info = db.get_aircraft_info(name)
+        path = info and info["side_view_path"]
+        if path and os.path.exists(path) and path not in paths:
+            paths.append(path)
+        if len(paths) >= limit:
+            break
+    if not paths:
+        return {"image_cold": {"skipped": "the sampled aircraft have no image files"}}
+
+    with tempfile.TemporaryDirectory(prefix="wingid-bench-") as thumbnail_dir:
+        store = ThumbnailStore(thumbnail_dir)
+        try:
+            results = {"image_cold": measure(store.get_image, paths),
+                       "image_warm": measure(store.get_image, paths)}
+        finally:
+            store.close()
+    return results
+
+
+def bench_identify(db, limit, rng):
+    """Benchmark silhouette matching, or record why it was skipped"""
+    try:
+        from wingid_identify import SilhouetteMatcher
+    except ImportError:
+        return {"identify": {"skipped": "NumPy or Pillow is not installed"}}
+    start = time.perf_counter()
+    matcher = SilhouetteMatcher.load(db.conn)
+    load_seconds = time.perf_counter() - start
+    paths = [path for path in rng.sample(matcher.paths, min(limit, len(matcher))) if os.path.exists(path)]
+    if not paths:
+        return {"identify": {"skipped": "the silhouette index is empty"}}
+    stats = measure(lambda path: matcher.match(path, 10), paths, warmup=2)
+    stats["silhouettes"] = len(matcher)
+    stats["load_ms"] = round(load_seconds * 1000, 3)
+    return {"identify": stats}
+
+
+def bench_listbox(db, names, rng):
+    """Benchmark filling the suggestion list, with Tk when a display is available"""
+    from WingID import AircraftPager, ListSource
+    results = [db.search_aircraft(name[:rng.randint(1, 3)]) for name in names[:200]]
+    listbox, root = None, None
+    try:
+        import tkinter as tk
+        from WingID import VirtualListbox
+        root = tk.Tk()
+        root.withdraw()
+        listbox = VirtualListbox(root)
+    except Exception as e:
+        logger.info(f"No Tk display ({e}); timing the list row sources only")
+
+    if listbox is not None:
+        def show(source):
+            listbox.set_source(source)
+            root.update_idletasks()
+        mode = "tk"
+    else:
+        def show(source):
+            # What VirtualListbox._render asks of a new source: its length and the first window
+            source.get_range(0, min(8 + 20, len(source)))
+        mode = "row-source"
+
+    try:
+        search_stats = measure(lambda rows: show(ListSource(rows)), results)
+        all_stats = measure(lambda _: show(AircraftPager(db)), list(range(50)), warmup=2)
+    finally:
+        if root is not None:
+            root.destroy()
+    search_stats["mode"] = all_stats["mode"] = mode
+    return {"listbox_search": search_stats, "listbox_all": all_stats}
+
+
+def catalog_info(db):
+    """Describe the benchmarked database for the results file"""
+    return {
+        "db_file": os.path.abspath(db.db_file),
+        "db_bytes": os.path.getsize(db.db_file),
+        "aircraft": db.count_aircraft(),
+        "schema_version": db.schema_version(),
+        "fts_tokenizer": db.fts_tokenizer,
+        "language": db.language,
+    }
+
+
+def run_benchmarks(db_file, iterations=1000, seed=1, language="en", images=100, listbox=True):
+    """Run every benchmark against db_file and return the results document"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    db = AircraftDatabase.open_reader(language, db_file=db_file, seed=False)
+    open_seconds = time.perf_counter() - start
+    try:
+        names = sample_names(db, iterations, seed)
+        if not names:
+            raise ValueError(f"{db_file} contains no aircraft")
+        results = bench_search(db, names, rng)
+        results["detail"] = measure(db.get_aircraft_info, names, warmup=10)
+        if images:
+            results.update(bench_images(db, names, images))
+            # Its own generator, so the listbox queries stay the same as in earlier results
+            results.update(bench_identify(db, images, random.Random(seed)))
+        if listbox:
+            try:
+                results.update(bench_listbox(db, names, rng))
+            except ImportError as e:
+                results["listbox_search"] = {"skipped": f"GUI dependencies missing: {e}"}
+        catalog = catalog_info(db)
+    finally:
+        db.close()
+
+    return {
+        "format": RESULTS_FORMAT,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "catalog": catalog,
+        "settings": {"iterations": iterations, "seed": seed, "images": images},
+        "open_ms": round(open_seconds * 1000, 3),
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Return (operation, baseline p95, current p95) for operations that got slower than tolerance allows"""
+    regressions = []
+    for operation, stats in current["results"].items():
+        previous = baseline.get("results", {}).get(operation)
+        if "latency_ms" not in stats or not previous or "latency_ms" not in previous:
+            continue
+        old, new = previous["latency_ms"]["p95"], stats["latency_ms"]["p95"]
+        if old and new > old * (1 + tolerance):
+            regressions.append((operation, old, new))
+    return regressions
+
+
+def main():
+    """Run the benchmark suite from the command line"""
+    parser = argparse.ArgumentParser(description="Benchmark WingID search, detail, image and list operations")
+    parser.add_argument("--db", help=f"database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    parser.add_argument("--language", default="en", choices=("en", "de"), help="language to search in")
+    parser.add_argument("--iterations", type=int, default=1000, help="aircraft sampled per operation")
+    parser.add_argument("--images", type=int, default=100, help="distinct images to load (0 to skip)")
+    parser.add_argument("--no-listbox", action="store_true", help="skip the suggestion list benchmarks")
+    parser.add_argument("--seed", type=int, default=1, help="seed for sampling aircraft and queries")
+    parser.add_argument("--output", help="write the JSON results to this file (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown vs. the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    db_file = args.db or AircraftDatabase.DEFAULT_DB_FILE
+    if not os.path.exists(db_file):
+        parser.error(f"database not found: {db_file}")
+
+    results = run_benchmarks(db_file, args.iterations, args.seed, args.language, args.images, not args.no_listbox)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for operation, old, new in regressions:
+            print(f"REGRESSION {operation}: p95 {old:.3f} ms -> {new:.3f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
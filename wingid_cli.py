@@ -0,0 +1,129 @@
+"""Headless command-line interface for WingID.
+
+Looks aircraft up directly through AircraftDatabase and never imports
+tkinter or Pillow, so it starts fast and runs on machines without a display.
+
+    python wingid_cli.py search "KC-1"
+    python wingid_cli.py info "E-3 Sentry"
+    python wingid_cli.py batch --op info < names.txt > results.jsonl
+
+In batch mode every stdin line is a name or query (handled according to
+--op), or a JSON object such as {"op": "search", "query": "navy"} or
+{"op": "info", "name": "E-3 Sentry"}. One JSON result is written per line.
+All lookups share one connection, and SQLite reuses its prepared statements
+across them.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from wingid_db import AircraftDatabase
+
+
+def open_database(args):
+    """Open the requested database read-only (migrated first if it is outdated, never seeded)"""
+    db_file = args.db or AircraftDatabase.DEFAULT_DB_FILE
+    if not os.path.exists(db_file):
+        raise SystemExit(f"wingid: database not found: {db_file}")
+    return AircraftDatabase.open_reader(args.language, db_file=db_file, seed=False)
+
+
+def cmd_search(db, args):
+    names = db.search_aircraft(args.query, args.limit, fuzzy=args.fuzzy)
+    if args.json:
+        print(json.dumps(names, ensure_ascii=False))
+    else:
+        for name in names:
+            print(name)
+    return 0
+
+
+def cmd_info(db, args):
+    info = db.get_aircraft_info(args.name)
+    if args.json:
+        print(json.dumps(info, ensure_ascii=False))
+    elif info:
+        width = max(len(key) for key in info)
+        for key, value in info.items():
+            print(f"{key:<{width}}  {value if value is not None else ''}")
+    else:
+        print(f"No information found for aircraft: {args.name}", file=sys.stderr)
+    return 0 if info else 1
+
+
+def run_batch_line(db, line, default_op, limit):
+    """Handle one batch input line and return the result object"""
+    if line.startswith("{"):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"input": line, "error": f"invalid JSON: {e}"}
+        op = request.get("op", default_op)
+        field = "query" if op == "search" else "name"
+        value = request.get(field)
+        # Numbers are accepted as text, like wingid_import does
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif value is not None and not isinstance(value, str):
+            return {"input": line, "error": f"'{field}' must be a string"}
+        value = value or ""
+    else:
+        op, value = default_op, line
+
+    if op == "search":
+        return {"op": op, "query": value, "results": db.search_aircraft(value, limit)}
+    if op == "info":
+        return {"op": op, "name": value, "info": db.get_aircraft_info(value)}
+    return {"input": line, "error": f"unknown op: {op}"}
+
+
+def cmd_batch(db, args):
+    out = sys.stdout
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            out.write(json.dumps(run_batch_line(db, line, args.op, args.limit), ensure_ascii=False) + "\n")
+    out.flush()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="wingid", description="Headless WingID aircraft lookups")
+    parser.add_argument("--language", default="en", choices=("en", "de"), help="language of the returned text")
+    parser.add_argument("--db", help=f"database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show informational log messages")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    search = subparsers.add_parser("search", help="search aircraft by name, role or operator")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, help="maximum number of results")
+    search.add_argument("--json", action="store_true", help="print results as a JSON array")
+    search.add_argument("--fuzzy", action="store_true", help="tolerate typos when nothing matches exactly")
+    search.set_defaults(func=cmd_search)
+
+    info = subparsers.add_parser("info", help="show the details of one aircraft")
+    info.add_argument("name")
+    info.add_argument("--json", action="store_true", help="print the record as JSON")
+    info.set_defaults(func=cmd_info)
+
+    batch = subparsers.add_parser("batch", help="run many lookups from stdin, writing JSONL to stdout")
+    batch.add_argument("--op", choices=("search", "info"), default="search",
+                       help="how plain input lines are handled (default: search)")
+    batch.add_argument("--limit", type=int, help="maximum number of results per search")
+    batch.set_defaults(func=cmd_batch)
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    with open_database(args) as db:
+        return args.func(db, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1313 @@
+"""Database layer for WingID.
+
+Everything needed to query and maintain the aircraft database lives here,
+without any GUI or imaging imports, so headless tools (CLI, importers,
+exporters) can use it without pulling in tkinter or Pillow.
+"""
+import sqlite3
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+
+if os.name == "nt":
+    from nturl2path import pathname2url
+else:
+    # urllib.request's pathname2url is this on POSIX; importing urllib.request costs ~30 ms at startup
+    from urllib.parse import quote as pathname2url
+
+from wingid_fuzzy import FuzzyIndex
+from wingid_metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Translation table matching SQLite's LOWER(), which only folds ASCII letters
+ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+# Language codes are embedded in SQL, so only plain tags like "de" or "pt-BR" are accepted
+LANGUAGE_CODE = re.compile(r"[A-Za-z]{2,3}([-_][A-Za-z0-9]{2,8})*$")
+
+# Rarity classes from most to least rare; the rarity_level column stores the index
+RARITY_LEVELS = ("extremely rare", "very rare", "rare", "common", "very common")
+RARITY_ALIASES = {"extrem selten": 0, "sehr selten": 1, "selten": 2, "häufig": 3, "sehr häufig": 4}
+
+NUMBER = r"(\d{1,3}(?:[,.']\d{3})+|\d+)"
+QUANTITY_PATTERN = re.compile(r"(<|>|over|under|more than|fewer than|less than|über|unter)?\s*[~≈]?\s*" + NUMBER +
+                              r"\s*(\+)?(?:\s*(?:-|–|to|bis)\s*" + NUMBER + ")?", re.IGNORECASE)
+YEAR_PATTERN = re.compile(r"\b(1[89]\d\d|2[01]\d\d)\b")
+OPERATOR_SEPARATOR = re.compile(r"[,;/]|\band\b|\bund\b")
+# Catch-all entries such as "others" or "70+ countries" don't name an operator
+OPERATOR_FILLER = re.compile(r"^(others?|andere|various\b|verschiedene\b|\d+\+?\s)", re.IGNORECASE)
+
+# Timestamp written to updated_at: UTC with milliseconds, so values sort as text
+CHANGE_TIME_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+
+def parse_quantity(text):
+    """Return (min, max) unit counts for text like '~400 units', '2000+ units' or '20-100' (None if unknown)"""
+    match = QUANTITY_PATTERN.search(text or "")
+    if not match:
+        return None, None
+    qualifier, low, plus, high = match.groups()
+    low = int(re.sub(r"\D", "", low))
+    qualifier = (qualifier or "").lower()
+    if high:
+        return low, int(re.sub(r"\D", "", high))
+    if plus or qualifier in (">", "over", "more than", "über"):
+        return low, None
+    if qualifier:
+        # "under 20" / "fewer than 20": strictly below
+        return None, max(low - 1, 0)
+    return low, low
+
+
+def parse_year(text):
+    """Return the first plausible year in text, or None"""
+    match = YEAR_PATTERN.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+def parse_rarity(text):
+    """Return the RARITY_LEVELS index for a rarity class (English or German), or None"""
+    text = (text or "").strip().lower()
+    if text in RARITY_LEVELS:
+        return RARITY_LEVELS.index(text)
+    return RARITY_ALIASES.get(text)
+
+
+def parse_operators(text):
+    """Split an operator list like 'USAF, NATO, Saudi Arabia, others' into operator names"""
+    names = []
+    for part in OPERATOR_SEPARATOR.split(text or ""):
+        part = part.strip()
+        if part and not OPERATOR_FILLER.match(part) and part not in names:
+            names.append(part)
+    return names
+
+
+def row_digest(values, translations=()):
+    """Return the 16-byte content hash of an aircraft row (values in COLUMNS order) and its (lang, field, value) translations"""
+    payload = json.dumps([list(values), sorted(translations)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+def digest_rows(cursor, rows, schema="main", translations=True, batch_size=500):
+    """Return (content_hash, id) for (id, *COLUMNS) rows, reading translations from schema"""
+    by_id = {}
+    if translations:
+        ids = [row[0] for row in rows]
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            cursor.execute(f"""
+                SELECT aircraft_id, lang, field, value FROM {schema}.aircraft_translations
+                WHERE aircraft_id IN ({', '.join('?' for _ in batch)})
+            """, batch)
+            for aircraft_id, lang, field, value in cursor.fetchall():
+                by_id.setdefault(aircraft_id, []).append((lang, field, value))
+    return [(row_digest(row[1:], by_id.get(row[0], ())), row[0]) for row in rows]
+
+
+class SearchCache:
+    """LRU cache of search results that supports prefix narrowing.
+
+    Each entry maps a lowercased query to the rows it matched, stored as
+    (name, haystack) tuples where the haystack is the searchable text already
+    folded the same way the database folds it. When a user types forward, the
+    rows of the longest cached prefix query are a superset of the new result,
+    so they can be filtered in memory instead of querying the table again.
+    """
+
+    def __init__(self, max_entries=64, max_rows=5000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return (mode, rows) for an exact query, or None"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def find_narrowing_base(self, key, mode):
+        """Return the rows of the longest cached prefix of key searched in the same mode"""
+        best = None
+        for cached_key, (cached_mode, _) in self._entries.items():
+            if cached_mode == mode and key.startswith(cached_key) and (best is None or len(cached_key) > len(best)):
+                best = cached_key
+        if best is None:
+            return None
+        self._entries.move_to_end(best)
+        return self._entries[best][1]
+
+    def put(self, key, mode, rows):
+        """Store a result; oversized results are not kept"""
+        if len(rows) > self.max_rows:
+            return
+        self._entries[key] = (mode, rows)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all cached results"""
+        self._entries.clear()
+
+
+class DetailCache:
+    """LRU cache of detail records keyed by (name, language)"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached record for key, or None"""
+        record = self._entries.get(key)
+        if record is not None:
+            self._entries.move_to_end(key)
+        return record
+
+    def put(self, key, record):
+        """Cache a record, evicting the least recently used ones beyond max_entries"""
+        self._entries[key] = record
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all cached records"""
+        self._entries.clear()
+
+
+def read_only_uri(db_file):
+    """Return a SQLite URI that opens a database file read-only"""
+    return f"file:{pathname2url(os.path.abspath(db_file))}?mode=ro"
+
+
+def file_version(db_file):
+    """Return (mtime_ns, size) pairs of a database file and its WAL; changes with every commit"""
+    version = []
+    for path in (db_file, db_file + "-wal"):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+class DatabaseSnapshot:
+    """Read-only copy of a database file held in memory.
+
+    The file is copied with SQLite's backup API into a named, shared-cache
+    in-memory database, so every connection of the process that is opened
+    with AircraftDatabase(snapshot=...) reads the same pages. The copy lives
+    until close() and every connection to it are closed.
+    """
+    _numbers = itertools.count(1)
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.uri = f"file:wingid-snapshot-{os.getpid()}-{next(self._numbers)}?mode=memory&cache=shared"
+        # Taken before copying, so a commit during the copy still counts as a change
+        self.source_version = file_version(db_file)
+        start = time.perf_counter()
+        self.conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(read_only_uri(db_file), uri=True)
+        try:
+            source.backup(self.conn)
+        except BaseException:
+            self.conn.close()
+            raise
+        finally:
+            source.close()
+        self.load_seconds = time.perf_counter() - start
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        self.memory_bytes = page_count * self.conn.execute("PRAGMA page_size").fetchone()[0]
+        logger.info(f"Loaded {db_file} into memory in {self.load_seconds * 1000:.0f} ms "
+                    f"({self.memory_bytes / 1048576:.1f} MB)")
+
+    def is_stale(self):
+        """Whether the source file changed since the snapshot was taken"""
+        return file_version(self.db_file) != self.source_version
+
+    def close(self):
+        """Release the snapshot's own connection; the memory is freed once no reader uses it"""
+        self.conn.close()
+
+
+class AircraftDatabase:
+    # Columns covered by the full-text index and their BM25 weights
+    # (a hit in the name ranks far above a hit in the free-text details)
+    SEARCH_COLUMNS = ("name", "role", "operator", "details", "base")
+    SEARCH_WEIGHTS = (10.0, 4.0, 4.0, 1.0, 2.0)
+
+    # Ordered schema migrations; PRAGMA user_version records how many have been applied
+    MIGRATIONS = ("_migrate_base_schema", "_migrate_search_index", "_migrate_translations", "_migrate_facets",
+                  "_migrate_silhouette_index", "_migrate_change_tracking", "_migrate_sightings",
+                  "_migrate_sync_conflicts")
+    SCHEMA_VERSION = len(MIGRATIONS)
+
+    # Data columns in schema order (everything except the id)
+    COLUMNS = ("name", "base", "role", "rarity", "quantity", "operator", "details",
+               "first_flight", "status", "side_view_path", "top_view_path")
+
+    # One database serves every language: the aircraft table holds the base-language
+    # text, and other languages override individual fields in aircraft_translations
+    DEFAULT_DB_FILE = "airplane.db"
+    BASE_LANGUAGE = 'en'
+    TRANSLATED_COLUMNS = ("base", "role", "rarity", "quantity", "operator", "details", "first_flight", "status")
+
+    # Fields of a detail record and what is shown when the database has no value
+    DETAIL_DEFAULTS = {"base": "Unknown", "role": "Unknown", "rarity": "Unknown", "quantity": "Unknown",
+                       "operator": "Unknown", "details": "No details available", "first_flight": "Unknown",
+                       "status": "Unknown", "side_view_path": None, "top_view_path": None}
+
+    # Facet columns derived from the free-text fields, and the keyword filters built on them
+    FACET_COLUMNS = ("quantity_min", "quantity_max", "first_flight_year", "rarity_level")
+    FILTERS = ("operators", "rarity", "first_flight_min", "first_flight_max", "min_units", "max_units")
+
+    def __init__(self, language='en', initialize=True, db_file=None, seed=True, read_only=False, snapshot=None):
+        self.set_language(language)
+        self.snapshot = snapshot
+        self.db_file = snapshot.db_file if snapshot else db_file or self.DEFAULT_DB_FILE
+        self.seed = seed
+        # Snapshots are copies; writes would never reach the file
+        self.read_only = read_only or snapshot is not None
+        self.conn = None
+        self.cursor = None
+        self.fts_tokenizer = None
+        self._search_caches = {}
+        self.detail_cache = DetailCache()
+        self._detail_selects = {}
+        self._cache_token = None
+        self.fuzzy_index = None
+        self._fuzzy_token = None
+        self.connect()
+        if initialize and not self.read_only:
+            self.initialize_database()
+        else:
+            # Secondary connections (e.g. search workers) only read the existing schema
+            self._detect_search_index()
+
+    @classmethod
+    def open_reader(cls, language='en', db_file=None, seed=True, snapshot=False):
+        """Open a database for lookups only.
+
+        A current, non-empty database is opened read-only straight away; anything
+        else is migrated (and seeded) once over a writable connection first.
+        With snapshot=True the file is then copied into memory and every read
+        is served from the copy (see DatabaseSnapshot).
+        """
+        db_file = db_file or cls.DEFAULT_DB_FILE
+        db = None
+        if os.path.exists(db_file):
+            db = cls(language, db_file=db_file, seed=seed, read_only=True)
+            if db.schema_version() < cls.SCHEMA_VERSION or (seed and db.count_aircraft() == 0):
+                db.close()
+                db = None
+        if db is None:
+            with cls(language, db_file=db_file, seed=seed):
+                pass
+            db = cls(language, db_file=db_file, seed=seed, read_only=True)
+        if not snapshot:
+            return db
+        db.close()
+        return cls(language, seed=seed, snapshot=DatabaseSnapshot(db_file))
+
+    def connect(self):
+        """Establish database connection with error handling"""
+        try:
+            if self.snapshot is not None:
+                self.conn = sqlite3.connect(self.snapshot.uri, uri=True, check_same_thread=False)
+                self.conn.execute("PRAGMA query_only = 1")
+            elif self.read_only:
+                # Read-only connections may be handed between threads by a connection pool
+                self.conn = sqlite3.connect(read_only_uri(self.db_file), uri=True, check_same_thread=False)
+            else:
+                self.conn = sqlite3.connect(self.db_file)
+            self.cursor = self.conn.cursor()
+            # Detail lookups map columns by name
+            self.detail_cursor = self.conn.cursor()
+            self.detail_cursor.row_factory = sqlite3.Row
+            logger.info(f"Connected to database: {self.db_file}")
+        except sqlite3.Error as e:
+            logger.error(f"Database connection failed: {e}")
+            raise
+
+    def set_language(self, language):
+        """Switch the language of returned text; no reconnect, search results stay cached per language"""
+        if not LANGUAGE_CODE.match(language or ""):
+            raise ValueError(f"invalid language code: {language!r}")
+        self.language = language
+
+    @property
+    def search_cache(self):
+        """The SearchCache of the current language"""
+        cache = self._search_caches.get(self.language)
+        if cache is None:
+            cache = self._search_caches[self.language] = SearchCache()
+        return cache
+
+    def enable_wal(self):
+        """Switch the database file to WAL journaling so readers never block writers (persistent)"""
+        try:
+            self.cursor.execute("PRAGMA journal_mode = WAL")
+            mode = self.cursor.fetchone()[0]
+            logger.info(f"Journal mode: {mode}")
+            return mode == 'wal'
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable WAL mode: {e}")
+            return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Safely close database connection"""
+        if self.conn:
+            try:
+                self.conn.close()
+                logger.info("Database connection closed")
+            except sqlite3.Error as e:
+                logger.error(f"Error closing database: {e}")
+
+    def initialize_database(self):
+        """Bring the schema up to date and populate an empty database with sample data.
+
+        The schema version is kept in PRAGMA user_version. A database that is
+        already current is only read here; no DDL is executed.
+        """
+        try:
+            version = self.schema_version()
+            if version < self.SCHEMA_VERSION:
+                self.migrate(version)
+            elif version > self.SCHEMA_VERSION:
+                logger.warning(f"Database schema version {version} is newer than this application "
+                               f"({self.SCHEMA_VERSION})")
+
+            self._detect_search_index()
+            if self.fts_tokenizer and not self._search_triggers_present():
+                # An interrupted bulk load can leave the index without its triggers
+                logger.info("Restoring full-text index triggers")
+                with self.conn:
+                    self.create_search_triggers()
+                    self.rebuild_search_index()
+
+            # Check if database is empty and populate with sample data
+            if self.seed and self.count_aircraft() == 0:
+                logger.info("Empty database detected. Creating sample data...")
+                self.create_example_database()
+
+            # Rows written by other tools since the last start still need their facets and hashes
+            with self.conn:
+                self.refresh_facets()
+                self.refresh_hashes()
+
+        except sqlite3.Error as e:
+            logger.error(f"Database initialization failed: {e}")
+            raise
+
+    def schema_version(self):
+        """Return the schema version recorded in the database file"""
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+
+    def migrate(self, from_version):
+        """Apply all pending migrations in a single transaction"""
+        self.cursor.execute("BEGIN IMMEDIATE")
+        try:
+            for version in range(from_version + 1, self.SCHEMA_VERSION + 1):
+                migration = getattr(self, self.MIGRATIONS[version - 1])
+                migration()
+                logger.info(f"Applied schema migration {version}: {migration.__doc__}")
+            self.cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def _table_columns(self, table):
+        """Return the column names of a table"""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in self.cursor.fetchall()}
+
+    def _migrate_base_schema(self):
+        """aircraft table with image path columns"""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS aircraft (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE,
+                base TEXT,
+                role TEXT,
+                rarity TEXT,
+                quantity TEXT,
+                operator TEXT,
+                details TEXT,
+                first_flight TEXT,
+                status TEXT,
+                side_view_path TEXT,
+                top_view_path TEXT
+            )
+        """)
+        # Databases created before the image columns existed
+        existing = self._table_columns("aircraft")
+        for column in ("side_view_path", "top_view_path"):
+            if column not in existing:
+                self.cursor.execute(f"ALTER TABLE aircraft ADD COLUMN {column} TEXT")
+
+    def _migrate_search_index(self):
+        """FTS5 search index"""
+        if self._detect_search_index():
+            self.create_search_triggers()
+            return
+
+        columns = ", ".join(self.SEARCH_COLUMNS)
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self.cursor.execute(f"""
+                    CREATE VIRTUAL TABLE aircraft_fts USING fts5(
+                        {columns}, content='aircraft', content_rowid='id', tokenize='{tokenizer}'
+                    )
+                """)
+                self.fts_tokenizer = tokenizer
+                break
+            except sqlite3.OperationalError as e:
+                logger.info(f"FTS5 tokenizer '{tokenizer}' not available: {e}")
+        else:
+            logger.warning("FTS5 not available, falling back to LIKE search")
+            return
+
+        self.create_search_triggers()
+        self.rebuild_search_index()
+        logger.info(f"Created full-text search index (tokenizer: {self.fts_tokenizer})")
+
+    def _migrate_translations(self):
+        """aircraft_translations table for per-language field values"""
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS aircraft_translations (
+                id INTEGER PRIMARY KEY,
+                aircraft_id INTEGER NOT NULL REFERENCES aircraft(id),
+                lang TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT,
+                UNIQUE (aircraft_id, lang, field)
+            )
+        """)
+        # Foreign key enforcement is off by default in SQLite, so cascade by trigger
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS aircraft_translations_cascade AFTER DELETE ON aircraft BEGIN
+                DELETE FROM aircraft_translations WHERE aircraft_id = old.id;
+            END
+        """)
+
+        if self.fts_tokenizer is None:
+            self._detect_search_index()
+        if self.fts_tokenizer and not self._table_exists("translations_fts"):
+            self.cursor.execute(f"""
+                CREATE VIRTUAL TABLE translations_fts USING fts5(
+                    value, content='aircraft_translations', content_rowid='id', tokenize='{self.fts_tokenizer}'
+                )
+            """)
+            # The table was just created, so the new index has nothing to rebuild
+            self.create_search_triggers()
+
+    def _migrate_facets(self):
+        """indexed facet columns and the aircraft_operators table"""
+        existing = self._table_columns("aircraft")
+        for column in self.FACET_COLUMNS:
+            if column not in existing:
+                self.cursor.execute(f"ALTER TABLE aircraft ADD COLUMN {column} INTEGER")
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_aircraft_{column} ON aircraft({column})")
+        # New and edited rows are flagged until refresh_facets() has parsed them
+        if "facets_dirty" not in existing:
+            self.cursor.execute("ALTER TABLE aircraft ADD COLUMN facets_dirty INTEGER NOT NULL DEFAULT 1")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_aircraft_facets_dirty ON aircraft(id) WHERE facets_dirty = 1")
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS aircraft_facets_stale
+            AFTER UPDATE OF quantity, first_flight, rarity, operator ON aircraft WHEN new.facets_dirty = 0 BEGIN
+                UPDATE aircraft SET facets_dirty = 1 WHERE id = new.id;
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS operators (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS aircraft_operators (
+                aircraft_id INTEGER NOT NULL,
+                operator_id INTEGER NOT NULL,
+                PRIMARY KEY (aircraft_id, operator_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_aircraft_operators_operator "
+                            "ON aircraft_operators(operator_id, aircraft_id)")
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS aircraft_operators_cascade AFTER DELETE ON aircraft BEGIN
+                DELETE FROM aircraft_operators WHERE aircraft_id = old.id;
+            END
+        """)
+
+        # Facet updates must not reindex the full text, so the update triggers now name their columns
+        for fts in ("aircraft_fts", "translations_fts"):
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_au")
+        if self.fts_tokenizer is None:
+            self._detect_search_index()
+        if self.fts_tokenizer:
+            self.create_search_triggers()
+
+    def _migrate_silhouette_index(self):
+        """silhouette_index table of image descriptors for identification"""
+        # Keyed by image path as stored in the aircraft table; maintained by wingid_identify.py
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS silhouette_index (
+                source_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                file_size INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                phash BLOB NOT NULL,
+                features BLOB NOT NULL
+            )
+        """)
+
+    def _migrate_change_tracking(self):
+        """updated_at and content_hash columns for syncing database copies"""
+        existing = self._table_columns("aircraft")
+        if "updated_at" not in existing:
+            self.cursor.execute("ALTER TABLE aircraft ADD COLUMN updated_at TEXT")
+        if "content_hash" not in existing:
+            self.cursor.execute("ALTER TABLE aircraft ADD COLUMN content_hash BLOB")
+        # New rows and rows whose text changed wait here until refresh_hashes() has hashed them
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_aircraft_hash_stale ON aircraft(id) WHERE content_hash IS NULL")
+
+        # Writers that set content_hash themselves (wingid_sync.py) also bring their own updated_at
+        changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in self.COLUMNS)
+        self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS aircraft_changed
+            AFTER UPDATE OF {', '.join(self.COLUMNS)} ON aircraft
+            WHEN new.content_hash IS old.content_hash AND ({changed}) BEGIN
+                UPDATE aircraft SET content_hash = NULL, updated_at = {CHANGE_TIME_SQL} WHERE id = new.id;
+            END
+        """)
+        for suffix, event, row in (("ai", "INSERT", "new"), ("ad", "DELETE", "old"),
+                                   ("au", "UPDATE OF value", "new")):
+            # Upserts rewrite unchanged values too
+            condition = "WHEN old.value IS NOT new.value " if suffix == "au" else ""
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS aircraft_translations_changed_{suffix}
+                AFTER {event} ON aircraft_translations {condition}BEGIN
+                    UPDATE aircraft SET content_hash = NULL, updated_at = {CHANGE_TIME_SQL} WHERE id = {row}.aircraft_id;
+                END
+            """)
+
+        # When each other database copy was last synced into this one
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                peer TEXT PRIMARY KEY,
+                synced_at TEXT NOT NULL
+            )
+        """)
+
+    def _migrate_sightings(self):
+        """sightings log with per-day rollups"""
+        # Append-only log; written and queried by wingid_sightings.py
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sightings (
+                id INTEGER PRIMARY KEY,
+                aircraft_id INTEGER NOT NULL REFERENCES aircraft(id),
+                seen_at TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                location TEXT,
+                tail_number TEXT,
+                notes TEXT
+            )
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_sightings_aircraft ON sightings(aircraft_id, seen_at)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_sightings_day ON sightings(day)")
+        # One row per day and aircraft, kept up to date by every ingested batch
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sighting_rollups (
+                day INTEGER NOT NULL,
+                aircraft_id INTEGER NOT NULL,
+                sightings INTEGER NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (day, aircraft_id)
+            ) WITHOUT ROWID
+        """)
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_sighting_rollups_aircraft ON sighting_rollups(aircraft_id, day)")
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS sightings_cascade AFTER DELETE ON aircraft BEGIN
+                DELETE FROM sightings WHERE aircraft_id = old.id;
+                DELETE FROM sighting_rollups WHERE aircraft_id = old.id;
+            END
+        """)
+
+    def _migrate_sync_conflicts(self):
+        """sync_conflicts table of conflicts left unresolved per database copy"""
+        # Reported again by every sync from that copy until they are resolved
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_conflicts (
+                peer TEXT NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (peer, name)
+            ) WITHOUT ROWID
+        """)
+
+    def _table_exists(self, name):
+        """Whether a table (or virtual table) of that name exists"""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+        return self.cursor.fetchone() is not None
+
+    def _detect_search_index(self):
+        """Check for an existing FTS5 index and remember its tokenizer; returns True if one exists"""
+        self.cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'aircraft_fts'")
+        row = self.cursor.fetchone()
+        if not row:
+            return False
+        try:
+            self.cursor.execute("SELECT rowid FROM aircraft_fts LIMIT 0")
+            self.fts_tokenizer = 'trigram' if 'trigram' in row[0] else 'unicode61'
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text index unusable, falling back to LIKE search: {e}")
+        return True
+
+    def _search_index_tables(self):
+        """Return (fts_table, content_table, indexed_columns) for every full-text index present"""
+        indexes = [("aircraft_fts", "aircraft", self.SEARCH_COLUMNS)]
+        if self._table_exists("translations_fts"):
+            indexes.append(("translations_fts", "aircraft_translations", ("value",)))
+        return indexes
+
+    def _search_triggers_present(self):
+        """Whether the sync triggers of every full-text index exist"""
+        expected = {f"{fts}_{suffix}" for fts, _, _ in self._search_index_tables() for suffix in ("ai", "ad", "au")}
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        return expected <= {row[0] for row in self.cursor.fetchall()}
+
+    def create_search_triggers(self):
+        """Create the triggers that keep the full-text indexes in sync with their tables"""
+        for fts, table, indexed in self._search_index_tables():
+            columns = ", ".join(indexed)
+            new_values = ", ".join(f"new.{c}" for c in indexed)
+            old_values = ", ".join(f"old.{c}" for c in indexed)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                END
+            """)
+            self.cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                    INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+                END
+            """)
+
+    def drop_search_triggers(self):
+        """Drop the FTS sync triggers (bulk loads rebuild the index once afterwards instead)"""
+        for fts in ("aircraft_fts", "translations_fts"):
+            for suffix in ("ai", "ad", "au"):
+                self.cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+
+    def rebuild_search_index(self):
+        """Rebuild the full-text indexes from their tables (the caller commits)"""
+        for fts, _, _ in self._search_index_tables():
+            self.cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def refresh_facets(self, batch_size=1000):
+        """Derive the facet columns and operator links of flagged rows (the caller commits); returns the row count"""
+        if self.read_only:
+            return 0
+        refreshed = 0
+        while True:
+            self.cursor.execute("""
+                SELECT id, quantity, first_flight, rarity, operator FROM aircraft
+                WHERE facets_dirty = 1 LIMIT ?
+            """, (batch_size,))
+            rows = self.cursor.fetchall()
+            if not rows:
+                return refreshed
+
+            facets, links = [], []
+            for aircraft_id, quantity, first_flight, rarity, operator in rows:
+                facets.append(parse_quantity(quantity) + (parse_year(first_flight), parse_rarity(rarity), aircraft_id))
+                links.extend((aircraft_id, name) for name in parse_operators(operator))
+
+            self.cursor.executemany("""
+                UPDATE aircraft SET quantity_min = ?, quantity_max = ?, first_flight_year = ?, rarity_level = ?,
+                                    facets_dirty = 0
+                WHERE id = ?
+            """, facets)
+            self.cursor.executemany("DELETE FROM aircraft_operators WHERE aircraft_id = ?", [(row[0],) for row in rows])
+            self.cursor.executemany("INSERT OR IGNORE INTO operators (name) VALUES (?)", [(name,) for _, name in links])
+            self.cursor.executemany("""
+                INSERT OR IGNORE INTO aircraft_operators (aircraft_id, operator_id)
+                SELECT ?, id FROM operators WHERE name = ?
+            """, links)
+            refreshed += len(rows)
+
+    def refresh_hashes(self, batch_size=1000):
+        """Hash new and edited rows and stamp rows that have no updated_at yet (the caller commits); returns the row count"""
+        if self.read_only:
+            return 0
+        columns = ", ".join(self.COLUMNS)
+        refreshed = 0
+        while True:
+            self.cursor.execute(f"SELECT id, {columns} FROM aircraft WHERE content_hash IS NULL ORDER BY id LIMIT ?",
+                                (batch_size,))
+            rows = self.cursor.fetchall()
+            if not rows:
+                return refreshed
+            self.cursor.executemany(f"""
+                UPDATE aircraft SET content_hash = ?, updated_at = COALESCE(updated_at, {CHANGE_TIME_SQL})
+                WHERE id = ?
+            """, digest_rows(self.cursor, rows))
+            refreshed += len(rows)
+
+    def save_translations(self, language, rows):
+        """Store (name, field, value) translations for a language (the caller commits).
+
+        Rows for unknown aircraft are ignored, and a value equal to the
+        base-language text removes the translation instead of duplicating it.
+        Returns the number of translations added, changed or removed.
+        """
+        if language == self.BASE_LANGUAGE or not LANGUAGE_CODE.match(language or ""):
+            raise ValueError(f"cannot store translations for language {language!r}")
+        by_field = {}
+        written = 0
+        for name, field, value in rows:
+            if field not in self.TRANSLATED_COLUMNS:
+                raise ValueError(f"field '{field}' is not translatable")
+            by_field.setdefault(field, []).append((name, value))
+
+        for field, values in by_field.items():
+            self.cursor.executemany(f"""
+                INSERT INTO aircraft_translations (aircraft_id, lang, field, value)
+                SELECT id, ?, ?, ? FROM aircraft WHERE name = ? AND {field} IS NOT ?
+                ON CONFLICT(aircraft_id, lang, field) DO UPDATE SET value = excluded.value
+                WHERE aircraft_translations.value IS NOT excluded.value
+            """, [(language, field, value, name, value) for name, value in values])
+            written += self.cursor.rowcount
+            self.cursor.executemany(f"""
+                DELETE FROM aircraft_translations
+                WHERE lang = ? AND field = ? AND aircraft_id = (SELECT id FROM aircraft WHERE name = ? AND {field} IS ?)
+            """, [(language, field, name, value) for name, value in values])
+            written += self.cursor.rowcount
+        return written
+
+    def _build_fts_query(self, query):
+        """Turn raw user input into an FTS5 MATCH expression, or None if FTS can't serve it"""
+        terms = self._fts_terms(query)
+        return " ".join(terms) if terms else None
+
+    def _fts_terms(self, query):
+        """Return one quoted FTS5 term per word of the query, or None if FTS can't serve it"""
+        terms = query.split()
+        if self.fts_tokenizer == 'trigram':
+            # The trigram tokenizer can't match terms shorter than three characters
+            if any(len(term) < 3 for term in terms):
+                return None
+            return ['"{}"'.format(term.replace('"', '""')) for term in terms]
+        return ['"{}"*'.format(term.replace('"', '""')) for term in terms]
+
+    def create_example_database(self):
+        """Create sample database with military aircraft data (English rows, German translations)"""
+        german_data = [
+            ("E-6 Mercury", "Boeing 707-320B", "Strategische Kommunikation und Nuklearkommando (TACAMO)", 
+             "sehr selten", "16 Einheiten", "US Navy", 
+             "Ersetzt die EC-130Q. Dient als fliegendes Kommandozentrum für Nuklearstreitkräfte. Kann 15+ Stunden in der Luft bleiben.", 
+             "1987", "Aktiv", None, None),
+            
+            ("E-2 Hawkeye", "Grumman Eigenentwicklung", "Trägergestützte Luftraumüberwachung (AEW&C)", 
+             "häufig", "~75 Einheiten (Aktiv)", "US Navy, verschiedene Verbündete", 
+             "Markante rotierende Radarkuppel. Hauptaufgabe ist Luftraumüberwachung von Flugzeugträgern.", 
+             "1960", "Aktiv", None, None),
+             
+            ("E-3 Sentry", "Boeing 707-320B", "Luftgestützte Frühwarnung und Kontrolle (AWACS)", 
+             "selten", "~30 Einheiten (USAF)", "USAF, NATO, Saudi-Arabien, andere", 
+             "Große rotierende Radarkuppel oben. Koordiniert Luftoperationen über weite Gebiete.", 
+             "1972", "Aktiv", None, None),
+             
+            ("E-4B Nightwatch", "Boeing 747-200B", "Luftgestütztes Kommandozentrum (NAOC)", 
+             "extrem selten", "4 Einheiten", "USAF", 
+             "Doomsday Plane - Fliegendes Pentagon für Krisensituationen. Kann wochenlang in der Luft bleiben.", 
+             "1973", "Aktiv", None, None),
+             
+            ("KC-135 Stratotanker", "Boeing 707-80 (Prototyp)", "Luft-zu-Luft Betankung", 
+             "häufig", "~400 Einheiten", "USAF, verschiedene Luftstreitkräfte weltweit", 
+             "Rückgrat strategischer Luftbetankungsoperationen. Ermöglicht globale Reichweite für Kampfflugzeuge.", 
+             "1956", "Aktiv", None, None),
+             
+            ("P-8 Poseidon", "Boeing 737-800ERX", "Maritime Aufklärung und U-Boot-Jagd", 
+             "häufig", "140+ Einheiten (alle Betreiber)", "US Navy, Royal Navy, verschiedene Verbündete", 
+             "Ersetzt P-3 Orion. Moderne Avionik für maritime Überwachung und U-Boot-Abwehr.", 
+             "2009", "Aktiv", None, None),
+             
+            ("C-130 Hercules", "Lockheed Originaldesign", "Taktischer Transport", 
+             "sehr häufig", "2000+ Einheiten", "USAF und 70+ Länder", 
+             "Arbeitspferd des taktischen Transports. Extrem vielseitig mit zahlreichen Varianten für verschiedene Missionen.", 
+             "1954", "Aktiv", None, None),
+             
+            ("B-52 Stratofortress", "Boeing Originaldesign", "Strategischer Bomber", 
+             "selten", "76 Einheiten", "USAF", 
+             "Strategischer Langstreckenbomber. Im Dienst seit 1955, geplant bis in die 2050er Jahre.", 
+             "1952", "Aktiv", None, None)
+        ]
+
+        example_data = [
+            ("E-6 Mercury", "Boeing 707-320B", "Strategic Communications and Nuclear Command (TACAMO)", 
+             "very rare", "16 units", "US Navy", 
+             "Replaces the EC-130Q. Serves as a flying command center for nuclear forces. Can remain airborne for 15+ hours.", 
+             "1987", "Active", None, None),
+            
+            ("E-2 Hawkeye", "Grumman in-house development", "Carrier-based airspace surveillance (AEW&C)", 
+             "common", "~75 units (Active)", "US Navy, various allies", 
+             "Distinctive rotating radar dome. Primary mission is airspace surveillance from aircraft carriers.", 
+             "1960", "Active", None, None),
+             
+            ("E-3 Sentry", "Boeing 707-320B", "Airborne early warning and control (AWACS)", 
+             "rare", "~30 units (USAF)", "USAF, NATO, Saudi Arabia, others", 
+             "Large rotating radar dome on top. Coordinates air operations over vast areas.", 
+             "1972", "Active", None, None),
+             
+            ("E-4B Nightwatch", "Boeing 747-200B", "Airborne command center (NAOC)", 
+             "extremely rare", "4 units", "USAF", 
+             "Doomsday Plane - Flying Pentagon for crisis situations. Can remain airborne for weeks.", 
+             "1973", "Active", None, None),
+             
+            ("KC-135 Stratotanker", "Boeing 707-80 (Prototype)", "Air-to-air refueling", 
+             "common", "~400 units", "USAF, various air forces worldwide", 
+             "Backbone of strategic air refueling operations. Enables global reach for combat aircraft.", 
+             "1956", "Active", None, None),
+             
+            ("P-8 Poseidon", "Boeing 737-800ERX", "Maritime reconnaissance and submarine hunting", 
+             "common", "140+ units (all operators)", "US Navy, Royal Navy, various allies", 
+             "Replaces P-3 Orion. Modern avionics for maritime surveillance and anti-submarine warfare.", 
+             "2009", "Active", None, None),
+             
+            ("C-130 Hercules", "Lockheed original design", "Tactical transport", 
+             "very common", "2000+ units", "USAF and 70+ countries", 
+             "Workhorse tactical transport. Extremely versatile with numerous variants for different missions.", 
+             "1954", "Active", None, None),
+             
+            ("B-52 Stratofortress", "Boeing original design", "Strategic bomber", 
+             "rare", "76 units", "USAF", 
+             "Long-range strategic bomber. In service since 1955, planned to serve until 2050s.", 
+             "1952", "Active", None, None)
+        ]
+
+        try:
+            self.cursor.executemany("""
+                INSERT INTO aircraft (name, base, role, rarity, quantity, operator, details, first_flight, status, side_view_path, top_view_path)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, example_data)
+            self.save_translations('de', ((row[0], column, value) for row in german_data
+                                          for column, value in zip(self.TRANSLATED_COLUMNS, row[1:9])))
+            self.conn.commit()
+            logger.info(f"Created sample database with {len(example_data)} aircraft")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to create sample data: {e}")
+            raise
+
+    @timed("db.search_aircraft")
+    def search_aircraft(self, query, limit=None, filters=None, fuzzy=False):
+        """Search for aircraft based on input query (optionally only the first limit results).
+
+        filters is a dict of facet filters (see filter_aircraft) the results must also match.
+        With fuzzy, a query that matches nothing falls back to typo-tolerant name matching.
+        """
+        if fuzzy:
+            names = self.search_aircraft(query, limit, filters)
+            if names or not query.strip():
+                return names
+            names = [name for name, _ in self.fuzzy_search(query, limit or 50)]
+            if filters:
+                allowed = set(self.filter_aircraft(**filters))
+                names = [name for name in names if name in allowed]
+            return names
+        if filters:
+            if not query.strip():
+                return self.filter_aircraft(limit, **filters)
+            # Rank with the (cached) text search, keep what the indexed filter query allows
+            allowed = set(self.filter_aircraft(**filters))
+            return [name for name in self.search_aircraft(query) if name in allowed][:limit]
+        try:
+            if not query.strip():
+                self.cursor.execute("SELECT name FROM aircraft ORDER BY name LIMIT ?",
+                                    (limit if limit else -1,))
+                return [row[0] for row in self.cursor.fetchall()]
+
+            self._validate_caches()
+            key = query.lower()
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                return [row[0] for row in cached[1][:limit]]
+
+            mode = self._search_mode(query)
+
+            # Typing forward: filter the previous, shorter query's rows in memory
+            base = self.search_cache.find_narrowing_base(key, mode)
+            if base is not None and self._can_narrow(key, mode):
+                terms = key.split() if mode == 'trigram' else [key]
+                rows = [row for row in base if all(term in row[1] for term in terms)]
+            else:
+                try:
+                    rows = self._run_search(query, mode, limit)
+                except sqlite3.OperationalError as e:
+                    if mode == 'like':
+                        raise
+                    logger.warning(f"Full-text search failed, using LIKE search: {e}")
+                    mode = 'like'
+                    rows = self._run_search(query, mode, limit)
+
+            # A result cut off by the limit is incomplete and can't serve later lookups
+            if not limit or len(rows) < limit:
+                self.search_cache.put(key, mode, rows)
+            return [row[0] for row in rows[:limit]]
+        except sqlite3.Error as e:
+            logger.error(f"Search failed: {e}")
+            return []
+
+    def iter_aircraft(self, query="", columns=None, batch_size=1000):
+        """Yield matching aircraft as dicts, streamed in fetchmany batches.
+
+        Uses the same matching as search_aircraft (every aircraft for an empty
+        query), so memory use stays flat however many rows match.
+        """
+        columns = columns or self.COLUMNS
+        select = ", ".join(self._column_sql(c) for c in columns)
+        mode = self._search_mode(query) if query.strip() else 'all'
+        cursor = self.conn.cursor()
+        try:
+            try:
+                cursor.execute(*self._search_statement(query, mode, select))
+            except sqlite3.OperationalError as e:
+                if mode in ('all', 'like'):
+                    raise
+                logger.warning(f"Full-text search failed, using LIKE search: {e}")
+                cursor.execute(*self._search_statement(query, 'like', select))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+    def _search_mode(self, query):
+        """Return how a non-empty query is served: the FTS tokenizer name or 'like'"""
+        if self.fts_tokenizer and self._build_fts_query(query):
+            return self.fts_tokenizer
+        return 'like'
+
+    def _translated(self):
+        """Whether the current language reads from aircraft_translations"""
+        return self.language != self.BASE_LANGUAGE
+
+    def _column_sql(self, column):
+        """SQL expression for a column of aircraft a in the current language"""
+        if not self._translated() or column not in self.TRANSLATED_COLUMNS:
+            return f"a.{column}"
+        return (f"COALESCE((SELECT t.value FROM aircraft_translations t WHERE t.aircraft_id = a.id "
+                f"AND t.lang = '{self.language}' AND t.field = '{column}'), a.{column})")
+
+    def _translation_filter(self, fields):
+        """SQL condition restricting translations t to the current language and the given fields"""
+        names = ", ".join(f"'{field}'" for field in fields if field in self.TRANSLATED_COLUMNS)
+        return f"t.lang = '{self.language}' AND t.field IN ({names})"
+
+    def _search_statement(self, query, mode, select):
+        """Build (sql, params) running the select list over the aircraft a matching query in the given mode.
+
+        In a translated language a query matches the base-language text as well
+        as the translations, so both fall back gracefully for untranslated fields.
+        """
+        if mode == 'all':
+            return f"SELECT {select} FROM aircraft a ORDER BY a.name", ()
+        if mode == 'like':
+            query_pattern = f"%{query.lower()}%"
+            translated = ""
+            params = (query_pattern, query_pattern, query_pattern)
+            if self._translated():
+                translated = f"""OR EXISTS (SELECT 1 FROM aircraft_translations t WHERE t.aircraft_id = a.id
+                                 AND {self._translation_filter(("role", "operator"))} AND LOWER(t.value) LIKE ?)"""
+                params += (query_pattern,)
+            return f"""
+                SELECT {select} FROM aircraft a
+                WHERE LOWER(a.name) LIKE ? OR LOWER(a.role) LIKE ? OR LOWER(a.operator) LIKE ? {translated}
+                ORDER BY a.name
+            """, params
+
+        weights = ", ".join(str(w) for w in self.SEARCH_WEIGHTS)
+        if not self._translated():
+            return f"""
+                SELECT {select} FROM aircraft_fts
+                JOIN aircraft a ON a.id = aircraft_fts.rowid
+                WHERE aircraft_fts MATCH ?
+                ORDER BY bm25(aircraft_fts, {weights}), a.name
+            """, (self._build_fts_query(query),)
+
+        # Every term has to match the base text or one of the translated fields; the
+        # best score per term is summed, with translations weighted like their column
+        field_weight = " ".join(f"WHEN '{c}' THEN {w}" for c, w in zip(self.SEARCH_COLUMNS, self.SEARCH_WEIGHTS))
+        hits, params = [], ()
+        for i, term in enumerate(self._fts_terms(query)):
+            hits.append(f"""
+                SELECT {i} AS term, rowid AS id, bm25(aircraft_fts, {weights}) AS score
+                FROM aircraft_fts WHERE aircraft_fts MATCH ?
+                UNION ALL
+                SELECT {i}, t.aircraft_id, bm25(translations_fts) * CASE t.field {field_weight} ELSE 1.0 END
+                FROM translations_fts JOIN aircraft_translations t ON t.id = translations_fts.rowid
+                WHERE translations_fts MATCH ? AND {self._translation_filter(self.SEARCH_COLUMNS)}
+            """)
+            params += (term, term)
+        return f"""
+            SELECT {select} FROM (
+                SELECT id, SUM(score) AS score FROM (
+                    SELECT term, id, MIN(score) AS score FROM ({" UNION ALL ".join(hits)}) GROUP BY term, id
+                ) GROUP BY id HAVING COUNT(*) = {len(hits)}
+            ) m JOIN aircraft a ON a.id = m.id
+            ORDER BY m.score, a.name
+        """, params
+
+    def _run_search(self, query, mode, limit=None):
+        """Run a search in the given mode; returns (name, haystack) rows in result order.
+
+        The haystack is the searchable text folded the way the database folds
+        it, so SearchCache can narrow the rows with plain substring tests.
+        """
+        # LIKE only looks at name, role and operator
+        columns = self.SEARCH_COLUMNS[:3] if mode == 'like' else self.SEARCH_COLUMNS
+        select = ", ".join(f"a.{c}" for c in columns)
+        if self._translated():
+            select += (f", (SELECT group_concat(t.value, char(0)) FROM aircraft_translations t "
+                       f"WHERE t.aircraft_id = a.id AND {self._translation_filter(columns)})")
+        sql, params = self._search_statement(query, mode, select)
+        if limit:
+            sql, params = f"{sql} LIMIT ?", params + (limit,)
+        self.cursor.execute(sql, params)
+        if mode == 'like':
+            # LOWER() only folds ASCII
+            return [(row[0], "\0".join(c or "" for c in row).translate(ASCII_LOWER))
+                    for row in self.cursor.fetchall()]
+        return [(row[0], "\0".join(c or "" for c in row).lower()) for row in self.cursor.fetchall()]
+
+    @staticmethod
+    def _can_narrow(key, mode):
+        """Whether rows for this query can be derived from a prefix query's rows in memory"""
+        if mode == 'trigram':
+            return True
+        # LIKE wildcards would need pattern matching rather than a substring test
+        return mode == 'like' and not any(c in key for c in "%_")
+
+    def fuzzy_search(self, query, limit=20):
+        """Return up to limit (name, edit distance) pairs for a possibly misspelled name, closest first"""
+        try:
+            self.prepare_fuzzy_index()
+        except sqlite3.Error as e:
+            logger.error(f"Fuzzy index update failed: {e}")
+            return []
+        return self.fuzzy_index.search(query, limit)
+
+    def prepare_fuzzy_index(self):
+        """Build the fuzzy name index on first use; afterwards apply only names added or removed since"""
+        token = self.change_token()
+        if self.fuzzy_index is not None and token == self._fuzzy_token:
+            return
+        self.cursor.execute("SELECT name FROM aircraft WHERE name IS NOT NULL")
+        names = {row[0] for row in self.cursor.fetchall()}
+        if self.fuzzy_index is None:
+            self.fuzzy_index = FuzzyIndex(names)
+            logger.info(f"Built fuzzy name index over {len(names)} aircraft")
+        else:
+            indexed = self.fuzzy_index.names()
+            for name in indexed - names:
+                self.fuzzy_index.remove(name)
+            for name in names - indexed:
+                self.fuzzy_index.add(name)
+        self._fuzzy_token = token
+
+    def change_token(self):
+        """Return a value that changes whenever this or another connection modifies the database"""
+        self.cursor.execute("PRAGMA data_version")
+        return (self.conn.total_changes, self.cursor.fetchone()[0])
+
+    def _validate_caches(self):
+        """Drop cached search results and detail records if the database changed since they were stored"""
+        token = self.change_token()
+        if token != self._cache_token:
+            for cache in self._search_caches.values():
+                cache.clear()
+            self.detail_cache.clear()
+            self._cache_token = token
+
+    def count_aircraft(self):
+        """Return the number of aircraft in the database"""
+        try:
+            self.cursor.execute("SELECT COUNT(*) FROM aircraft")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Count failed: {e}")
+            return 0
+
+    def _filter_sql(self, operators=(), rarity=(), first_flight_min=None, first_flight_max=None,
+                    min_units=None, max_units=None):
+        """Build (where, params) restricting aircraft a to the facet filters; every condition has an index.
+
+        operators lists names that must all operate the aircraft, rarity lists
+        acceptable classes, the first flight bounds are inclusive years, and
+        min_units/max_units bound the number of units in service.
+        """
+        clauses, params = [], []
+        for operator in operators:
+            clauses.append("a.id IN (SELECT ao.aircraft_id FROM aircraft_operators ao "
+                           "JOIN operators o ON o.id = ao.operator_id WHERE o.name = ?)")
+            params.append(operator)
+        if rarity:
+            levels = [parse_rarity(r) if isinstance(r, str) else r for r in rarity]
+            if None in levels:
+                raise ValueError(f"unknown rarity in {list(rarity)}; expected one of {RARITY_LEVELS}")
+            clauses.append(f"a.rarity_level IN ({', '.join('?' for _ in levels)})")
+            params.extend(levels)
+        for column, op, value in (("first_flight_year", ">=", first_flight_min),
+                                  ("first_flight_year", "<=", first_flight_max),
+                                  ("quantity_min", ">=", min_units),
+                                  ("quantity_max", "<=", max_units)):
+            if value is not None:
+                clauses.append(f"a.{column} {op} ?")
+                params.append(int(value))
+        return " AND ".join(clauses) or "1", tuple(params)
+
+    def filter_aircraft(self, limit=None, **filters):
+        """Return the names of aircraft matching the facet filters (see _filter_sql), in name order"""
+        try:
+            where, params = self._filter_sql(**filters)
+            self.cursor.execute(f"SELECT a.name FROM aircraft a WHERE {where} ORDER BY a.name LIMIT ?",
+                                params + (limit if limit else -1,))
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Filter failed: {e}")
+            return []
+
+    def facet_counts(self, **filters):
+        """Count the aircraft matching filters per rarity, first-flight decade and operator.
+
+        All three facets come from one grouped query. Returns
+        {"rarity": {class: n}, "decade": {1950: n}, "operator": {name: n}}.
+        """
+        counts = {"rarity": {}, "decade": {}, "operator": {}}
+        try:
+            where, params = self._filter_sql(**filters)
+            self.cursor.execute(f"""
+                WITH matches AS (
+                    SELECT a.id, a.rarity_level, a.first_flight_year FROM aircraft a WHERE {where}
+                )
+                SELECT 'rarity', rarity_level, COUNT(*) FROM matches
+                WHERE rarity_level IS NOT NULL GROUP BY rarity_level
+                UNION ALL
+                SELECT 'decade', first_flight_year / 10 * 10, COUNT(*) FROM matches
+                WHERE first_flight_year IS NOT NULL GROUP BY first_flight_year / 10
+                UNION ALL
+                SELECT 'operator', o.name, COUNT(*) FROM matches m
+                JOIN aircraft_operators ao ON ao.aircraft_id = m.id
+                JOIN operators o ON o.id = ao.operator_id
+                GROUP BY o.id
+            """, params)
+            for facet, value, count in self.cursor.fetchall():
+                counts[facet][RARITY_LEVELS[value] if facet == "rarity" else value] = count
+        except sqlite3.Error as e:
+            logger.error(f"Facet count failed: {e}")
+        return counts
+
+    def get_aircraft_page(self, limit, offset=0, after_name=None):
+        """Return up to limit aircraft names in name order.
+
+        With after_name the page continues directly after that name (keyset
+        pagination, cheap for sequential scrolling); otherwise offset is used.
+        """
+        try:
+            if after_name is not None:
+                self.cursor.execute("SELECT name FROM aircraft WHERE name > ? ORDER BY name LIMIT ?",
+                                    (after_name, limit))
+            else:
+                self.cursor.execute("SELECT name FROM aircraft ORDER BY name LIMIT ? OFFSET ?",
+                                    (limit, offset))
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Page fetch failed: {e}")
+            return []
+
+    @timed("db.get_aircraft_info")
+    def get_aircraft_info(self, name):
+        """Retrieve comprehensive information about an aircraft"""
+        return self.get_many([name]).get(name)
+
+    @timed("db.get_many")
+    def get_many(self, names, batch_size=500):
+        """Return {name: detail record} for the given names that exist, in the order given.
+
+        Records come from the detail cache when possible; the rest are fetched
+        with one query per batch_size names.
+        """
+        try:
+            self._validate_caches()
+            # Deduplicated once, so iterators work and are only read here
+            names = list(dict.fromkeys(names))
+            found = {}
+            missing = []
+            for name in names:
+                record = self.detail_cache.get((name, self.language))
+                if record is None:
+                    missing.append(name)
+                else:
+                    found[name] = record
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                self.detail_cursor.execute(f"SELECT {self._detail_select()} FROM aircraft a "
+                                           f"WHERE a.name IN ({', '.join('?' for _ in batch)})", batch)
+                for row in self.detail_cursor:
+                    record = self._detail_record(row)
+                    self.detail_cache.put((row["name"], self.language), record)
+                    found[row["name"]] = record
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve aircraft info: {e}")
+            return {}
+        # Copies, so callers can't alter the cached records
+        return {name: dict(found[name]) for name in names if name in found}
+
+    def _detail_select(self):
+        """Select list of a detail record in the current language, every column named after its field"""
+        select = self._detail_selects.get(self.language)
+        if select is None:
+            select = self._detail_selects[self.language] = ", ".join(
+                f"{self._column_sql(column)} AS {column}" for column in self.COLUMNS)
+        return select
+
+    def _detail_record(self, row):
+        """Build a detail record from a named row, filling in the display defaults"""
+        return {column: row[column] if default is None else row[column] or default
+                for column, default in self.DETAIL_DEFAULTS.items()}
+
+    def __del__(self):
+        """Cleanup method"""
+        self.close()
@@ -0,0 +1,132 @@
+"""Streaming bulk exporter for the WingID aircraft table.
+
+Rows are read with fetchmany batches and written straight to the output, so
+memory use stays flat regardless of table size. An optional search query
+selects a subset with exactly the same matching as the GUI search box.
+
+    python wingid_export.py catalog.jsonl
+    python wingid_export.py navy.csv --query "navy"
+    python wingid_export.py catalog.parquet        # requires pyarrow
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from wingid_db import AircraftDatabase
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+
+def detect_format(path):
+    """Guess the output format from the file extension (JSON Lines by default)"""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("csv", "parquet"):
+        return ext
+    return "jsonl"
+
+
+def write_jsonl(rows, f, columns):
+    count = 0
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(rows, f, columns):
+    writer = csv.DictWriter(f, fieldnames=columns)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_parquet(rows, path, columns, row_group_size=50000):
+    """Write rows as a Parquet file, one row group per row_group_size rows"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        group = {column: [] for column in columns}
+        for row in rows:
+            for column in columns:
+                group[column].append(row[column])
+            count += 1
+            if count % row_group_size == 0:
+                writer.write_table(pa.table(group, schema=schema))
+                group = {column: [] for column in columns}
+        if group[columns[0]]:
+            writer.write_table(pa.table(group, schema=schema))
+    return count
+
+
+def export(db, path, fmt=None, query="", columns=None, batch_size=1000):
+    """Export the aircraft matching query from db to path ('-' for stdout); returns the row count"""
+    fmt = fmt or detect_format(path)
+    columns = list(columns or AircraftDatabase.COLUMNS)
+    rows = db.iter_aircraft(query, columns, batch_size)
+
+    if fmt == "parquet":
+        if path == "-":
+            raise ValueError("Parquet output cannot be written to stdout")
+        return write_parquet(rows, path, columns)
+
+    writer = write_csv if fmt == "csv" else write_jsonl
+    if path == "-":
+        return writer(rows, sys.stdout, columns)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return writer(rows, f, columns)
+
+
+def main():
+    """Export aircraft records from the command line"""
+    parser = argparse.ArgumentParser(description="Export aircraft from a WingID database")
+    parser.add_argument("output", help="output file, or '-' for stdout")
+    parser.add_argument("--format", choices=FORMATS, help="output format (default: from extension)")
+    parser.add_argument("--query", default="", help="only export aircraft matching this search")
+    parser.add_argument("--columns", help="comma-separated list of columns (default: all)")
+    parser.add_argument("--language", default="en", choices=("en", "de"), help="language of the exported text")
+    parser.add_argument("--db", help=f"database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows fetched per batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    columns = args.columns.split(",") if args.columns else None
+    if columns:
+        unknown = set(columns) - set(AircraftDatabase.COLUMNS)
+        if unknown:
+            parser.error(f"unknown columns: {', '.join(sorted(unknown))}")
+
+    db_file = args.db or AircraftDatabase.DEFAULT_DB_FILE
+    if not os.path.exists(db_file):
+        parser.error(f"database not found: {db_file}")
+
+    start = time.perf_counter()
+    db = AircraftDatabase.open_reader(args.language, db_file=db_file, seed=False)
+    try:
+        count = export(db, args.output, args.format, args.query, columns, args.batch_size)
+    except (RuntimeError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Exported {count} aircraft in {elapsed:.2f}s ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
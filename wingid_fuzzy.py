@@ -0,0 +1,195 @@
+"""Typo-tolerant name matching for WingID.
+
+FuzzyIndex keeps an in-memory trigram index over normalized aircraft names
+and their words. Punctuation and case are ignored ("P8 Poseidon" finds
+"P-8 Poseidon", "E4B" finds "E-4B Nightwatch"), and misspellings such as
+"Stratotnker" are found by edit distance. Candidates come from the rarest
+trigram postings of the query, and only the best of them are scored with a
+banded, bounded edit distance, so lookups stay in the low milliseconds on
+catalogs of 100k aircraft.
+"""
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+
+def normalize(text):
+    """Fold text to lowercase ASCII letters and digits ("E-4B" -> "e4b", "Jäger" -> "jager")"""
+    text = unicodedata.normalize("NFKD", text or "").lower()
+    return "".join(c for c in text if c.isalnum() and ord(c) < 128)
+
+
+def trigrams(term):
+    """Return the distinct trigrams of a term, anchored at its start"""
+    padded = "$" + term
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def prefix_distance(query, term, cutoff):
+    """Return the smallest edit distance between query and any prefix of term, or cutoff + 1 if larger.
+
+    Matching against prefixes lets a partially typed designation rank as well
+    as a complete one.
+    """
+    # A prefix longer than len(query) + cutoff can't be within the cutoff
+    term = term[:len(query) + cutoff]
+    n = len(term)
+    over = cutoff + 1
+    previous = list(range(n + 1))
+    for i, qc in enumerate(query, 1):
+        # Only cells within cutoff of the diagonal can stay within the cutoff (Ukkonen's band)
+        current = [over] * (n + 1)
+        if i <= cutoff:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - cutoff), min(n, i + cutoff) + 1):
+            value = previous[j - 1] + (qc != term[j - 1])
+            if previous[j] < value:
+                value = previous[j] + 1
+            if current[j - 1] < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > cutoff:
+            return over
+        previous = current
+    return min(min(previous), over)
+
+
+def max_distance(length):
+    """Number of typos tolerated for a normalized query of the given length"""
+    if length < 3:
+        return 0
+    return 1 if length <= 6 else 2
+
+
+class FuzzyIndex:
+    """Trigram postings over the normalized terms of aircraft names.
+
+    Every name contributes its whole normalized form ("e4bnightwatch") and
+    each normalized word ("e4b", "nightwatch"). Names can be added and removed
+    one at a time, so the index follows database changes without a rebuild.
+    """
+
+    def __init__(self, names=(), max_candidates=128, max_postings=20000):
+        self.max_candidates = max_candidates
+        self.max_postings = max_postings
+        self._terms = []           # term id -> normalized term
+        self._term_ids = {}        # normalized term -> term id
+        self._term_names = []      # term id -> ((name, True if the term is the whole name), ...)
+        self._postings = {}        # trigram -> [term ids]
+        self._names = {}           # name -> [term ids]
+        self._sorted_terms = None  # lazily built for short (prefix-only) queries
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def names(self):
+        """Return the set of indexed names"""
+        return set(self._names)
+
+    def add(self, name):
+        """Index a name (no-op if already present)"""
+        if name in self._names or not name:
+            return
+        whole = normalize(name)
+        terms = {whole: True}
+        for word in name.split():
+            terms.setdefault(normalize(word), False)
+
+        term_ids = []
+        for term, is_whole in terms.items():
+            if not term:
+                continue
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._terms)
+                self._terms.append(term)
+                self._term_names.append(())
+                for gram in trigrams(term):
+                    self._postings.setdefault(gram, []).append(term_id)
+                self._sorted_terms = None
+            # Tuples keep the per-term overhead small; most terms belong to a single name
+            self._term_names[term_id] += ((name, is_whole),)
+            term_ids.append(term_id)
+        self._names[name] = term_ids
+
+    def remove(self, name):
+        """Drop a name; terms no other name uses stay in the postings but no longer match"""
+        for term_id in self._names.pop(name, ()):
+            self._term_names[term_id] = tuple(entry for entry in self._term_names[term_id] if entry[0] != name)
+
+    def search(self, query, limit=20):
+        """Return up to limit (name, distance) pairs, closest first"""
+        q = normalize(query)
+        if not q:
+            return []
+        cutoff = max_distance(len(q))
+        if len(q) < 3:
+            candidates = self._prefix_candidates(q)
+        else:
+            candidates = self._trigram_candidates(q, cutoff)
+
+        best = {}
+        found = [0] * (cutoff + 1)
+        for term_id in candidates:
+            names = self._term_names[term_id]
+            term = self._terms[term_id]
+            # Too short to be within the cutoff even as a complete match
+            if not names or len(term) < len(q) - cutoff:
+                continue
+            distance = prefix_distance(q, term, cutoff)
+            if distance > cutoff:
+                continue
+            for name, is_whole in names:
+                # Equal distances: a match on the whole name beats one on a later word
+                rank = (distance, not is_whole)
+                if name not in best:
+                    found[distance] += 1
+                elif rank < best[name]:
+                    found[best[name][0]] -= 1
+                    found[distance] += 1
+                else:
+                    continue
+                best[name] = rank
+            # Once limit names are closer than the cutoff, farther candidates can't make the list
+            while cutoff > 0 and sum(found[:cutoff]) >= limit:
+                cutoff -= 1
+        ranked = sorted(((name, rank) for name, rank in best.items() if rank[0] <= cutoff),
+                        key=lambda item: (item[1], len(item[0]), item[0]))
+        return [(name, rank[0]) for name, rank in ranked[:limit]]
+
+    def _trigram_candidates(self, q, cutoff):
+        """Term ids sharing enough trigrams with q to be within cutoff edits, most shared first"""
+        grams = sorted(trigrams(q), key=lambda gram: len(self._postings.get(gram, ())))
+        # Each edit destroys at most three of the query's trigrams, so a term within the
+        # cutoff shares at least one of the len(grams) - needed + 1 rarest ones
+        needed = max(len(grams) - 3 * cutoff, 1)
+        counts = Counter()
+        budget = self.max_postings
+        for gram in grams[:len(grams) - needed + 1]:
+            postings = self._postings.get(gram, ())
+            # Very common trigrams say little about a match; skipping them bounds the latency
+            if counts and len(postings) > budget:
+                break
+            counts.update(postings)
+            budget -= len(postings)
+        return [term_id for term_id, _ in counts.most_common(self.max_candidates)]
+
+    def _prefix_candidates(self, q):
+        """Term ids starting with q (queries too short for trigrams)"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted((term, term_id) for term_id, term in enumerate(self._terms))
+        start = bisect_left(self._sorted_terms, (q,))
+        candidates = []
+        for term, term_id in self._sorted_terms[start:]:
+            if not term.startswith(q) or len(candidates) >= self.max_candidates:
+                break
+            candidates.append(term_id)
+        return candidates
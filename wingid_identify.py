@@ -0,0 +1,406 @@
+"""Identify aircraft from a picture of their silhouette.
+
+Every side/top view image referenced by the database is reduced to a compact
+descriptor that is stored in the silhouette_index table:
+
+    phash      64-bit DCT perceptual hash of the normalized outline
+    features   log-scaled Hu moment invariants, an 8x8 grid of how much of
+               each cell the outline fills, and the aspect ratio of its
+               bounding box, as float32
+
+Outlines are cropped to their bounding box and scaled to a fixed square
+before they are described, so the size and position of the aircraft in the
+picture do not matter. A query is matched against all descriptors at once:
+one matrix product per feature block and a popcount over the hashes. The
+mirrored query is scored as well, so an aircraft facing the other way is
+still found. Against 100k silhouettes a lookup takes about 20 ms, most of it
+spent describing the query image, once the index is loaded.
+
+    python wingid_identify.py --db airplane.db index
+    python wingid_identify.py match photo.png --top 10
+
+Requires NumPy and Pillow.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from PIL import Image
+
+from wingid_db import AircraftDatabase
+from wingid_metrics import timed
+from wingid_thumbnails import ThumbnailStore, packed_image
+
+logger = logging.getLogger(__name__)
+
+# Bump when the descriptor changes; outdated rows are recomputed by the next index run
+DESCRIPTOR_VERSION = 1
+WORK_SIZE = 256
+MASK_SIZE = 64
+MAX_SKEW = 20
+GRID_SIZE = 8
+HU_FLOOR = 1e-9
+# Feature vector layout: (start, stop, weight) of the Hu moments, occupancy grid and log aspect ratio.
+# A match distance is the weighted sum of the parts' Euclidean distances plus the weighted square root
+# of the hash distance; the weights are roughly the inverse of each part's typical spread.
+FEATURE_BLOCKS = ((0, 7, 0.55), (7, 7 + GRID_SIZE * GRID_SIZE, 0.9), (7 + GRID_SIZE * GRID_SIZE, 8 + GRID_SIZE * GRID_SIZE, 2.2))
+FEATURE_COUNT = FEATURE_BLOCKS[-1][1]
+HASH_WEIGHT = 0.02
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dct_matrix(n):
+    """Orthonormal DCT-II basis as an n x n matrix"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+DCT_32 = dct_matrix(32)
+
+
+def hamming(hashes, query_hashes):
+    """Bit differences between every 64-bit hash and each query hash, as a (queries, hashes) array"""
+    xor = hashes[None, :] ^ query_hashes[:, None]
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor)
+    # NumPy before 2.0 has no popcount; count the bits of each byte by table lookup
+    return POPCOUNT[xor.view(np.uint8)].reshape(xor.shape + (8,)).sum(axis=2, dtype=np.uint8)
+
+
+def otsu_threshold(gray):
+    """Return the gray level that best separates an 8-bit image into two classes"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    below = np.cumsum(hist)
+    above = total - below
+    below_sum = np.cumsum(hist * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread = (below_sum[-1] * below / total - below_sum) ** 2 / (below * above)
+    spread[~np.isfinite(spread)] = 0
+    return int(np.argmax(spread))
+
+
+def foreground_of(gray, threshold, invert):
+    """Boolean outline pixels of an 8-bit array"""
+    foreground = gray <= threshold
+    return ~foreground if invert else foreground
+
+
+def silhouette_mask(image):
+    """Return the outline in a PIL image as a MASK_SIZE square float mask and its aspect ratio.
+
+    The background is whichever class covers most of the image border, so
+    dark-on-light and light-on-dark silhouettes both work. Outlines tilted
+    by less than MAX_SKEW degrees are turned level along their long axis.
+    """
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        image = Image.alpha_composite(Image.new("RGBA", rgba.size, (255, 255, 255, 255)), rgba)
+    image = image.convert("L")
+    # Threshold, polarity and position are found on a reduced copy of large photos
+    reduced = image.copy()
+    reduced.thumbnail((WORK_SIZE, WORK_SIZE))
+    gray = np.asarray(reduced)
+    threshold = otsu_threshold(gray)
+    foreground = gray <= threshold
+    border = np.concatenate((foreground[0], foreground[-1], foreground[:, 0], foreground[:, -1]))
+    invert = border.mean() > 0.5
+    foreground = foreground ^ invert
+    ys, xs = np.nonzero(foreground)
+    if not ys.size or foreground.all():
+        raise ValueError("no silhouette found in the image")
+
+    # The outline itself is cut from the full-size image, so small aircraft keep their detail
+    dx, dy = xs - xs.mean(), ys - ys.mean()
+    skew = np.degrees(0.5 * np.arctan2(2 * (dx * dy).mean(), (dx * dx).mean() - (dy * dy).mean()))
+    rotate = 0.5 < abs(skew) < MAX_SKEW
+    # Rotating needs room for the corners; the crop must stay inside the image, which PIL would pad with black
+    margin = int(max(np.ptp(xs), np.ptp(ys)) * 0.3) + 2 if rotate else 1
+    scale = image.width / reduced.width
+    crop = image.crop((max(int((xs.min() - margin) * scale), 0), max(int((ys.min() - margin) * scale), 0),
+                       min(int((xs.max() + margin + 1) * scale), image.width),
+                       min(int((ys.max() + margin + 1) * scale), image.height)))
+    if rotate:
+        crop = crop.rotate(skew, resample=Image.BILINEAR, fillcolor=0 if invert else 255)
+    crop.thumbnail((WORK_SIZE, WORK_SIZE))
+    foreground = foreground_of(np.asarray(crop), threshold, invert)
+
+    rows = np.flatnonzero(foreground.any(axis=1))
+    cols = np.flatnonzero(foreground.any(axis=0))
+    if not rows.size:
+        raise ValueError("no silhouette found in the image")
+    foreground = foreground[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    height, width = foreground.shape
+    side = max(height, width)
+    square = np.zeros((side, side), dtype=np.uint8)
+    top, left = (side - height) // 2, (side - width) // 2
+    square[top:top + height, left:left + width] = foreground * 255
+    mask = Image.fromarray(square).resize((MASK_SIZE, MASK_SIZE), Image.BILINEAR)
+    return np.asarray(mask, dtype=np.float32) / 255, width / height
+
+
+def perceptual_hash(mask):
+    """64-bit DCT hash of a mask, as 8 bytes"""
+    small = mask.reshape(32, MASK_SIZE // 32, 32, MASK_SIZE // 32).mean(axis=(1, 3))
+    coefficients = (DCT_32 @ small @ DCT_32.T)[:8, :8].ravel()
+    # The DC term only measures the filled area; the median of the others keeps the bits balanced
+    return np.packbits(coefficients > np.median(coefficients[1:]))
+
+
+def hu_moments(mask):
+    """Log-scaled magnitudes of the seven Hu moment invariants"""
+    ys, xs = np.mgrid[:mask.shape[0], :mask.shape[1]].astype(np.float64)
+    m00 = mask.sum()
+    x = xs - (xs * mask).sum() / m00
+    y = ys - (ys * mask).sum() / m00
+
+    def eta(p, q):
+        return (x ** p * y ** q * mask).sum() / m00 ** (1 + (p + q) / 2)
+
+    n20, n02, n11 = eta(2, 0), eta(0, 2), eta(1, 1)
+    n30, n03, n21, n12 = eta(3, 0), eta(0, 3), eta(2, 1), eta(1, 2)
+    a, b = n30 + n12, n21 + n03
+    hu = np.array([
+        n20 + n02,
+        (n20 - n02) ** 2 + 4 * n11 ** 2,
+        (n30 - 3 * n12) ** 2 + (3 * n21 - n03) ** 2,
+        a ** 2 + b ** 2,
+        (n30 - 3 * n12) * a * (a ** 2 - 3 * b ** 2) + (3 * n21 - n03) * b * (3 * a ** 2 - b ** 2),
+        (n20 - n02) * (a ** 2 - b ** 2) + 4 * n11 * a * b,
+        (3 * n21 - n03) * a * (a ** 2 - 3 * b ** 2) - (n30 - 3 * n12) * b * (3 * a ** 2 - b ** 2),
+    ])
+    # Magnitudes only: the sign of the small invariants flips with mirroring and noise
+    return -np.log10(np.abs(hu) + HU_FLOOR)
+
+
+def occupancy_grid(mask):
+    """Filled fraction of each cell of a GRID_SIZE x GRID_SIZE grid over the mask"""
+    cell = MASK_SIZE // GRID_SIZE
+    return mask.reshape(GRID_SIZE, cell, GRID_SIZE, cell).mean(axis=(1, 3)).ravel()
+
+
+def describe_mask(mask, aspect):
+    """Return the (phash, features) descriptor of a normalized mask"""
+    features = np.concatenate((hu_moments(mask), occupancy_grid(mask), [np.log(aspect)]))
+    return perceptual_hash(mask), features.astype(np.float32)
+
+
+def describe(image):
+    """Return the (phash, features) descriptor of an image file or PIL image"""
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as opened:
+            return describe(opened)
+    return describe_mask(*silhouette_mask(image))
+
+
+def describe_file(path, packed=None):
+    """Describe one image for the index, from its atlas entry if it is packed (run in worker processes)"""
+    if packed is None:
+        stat = os.stat(path)
+        mtime_ns, file_size = stat.st_mtime_ns, stat.st_size
+        phash, features = describe(path)
+    else:
+        mtime_ns, file_size, source_size, pack_path, offset, mode, size = packed
+        image = packed_image(pack_path, offset, mode, size)
+        # Packed images are stretched to the display size; the aspect ratio is part of the descriptor
+        height = max(round(size[0] * source_size[1] / source_size[0]), 1)
+        phash, features = describe(image.resize((size[0], height), Image.BILINEAR))
+    return path, mtime_ns, file_size, DESCRIPTOR_VERSION, phash.tobytes(), features.tobytes()
+
+
+def referenced_images(conn):
+    """Return {image path: [(aircraft name, view)]} for every image the aircraft table refers to"""
+    images = {}
+    rows = conn.execute("SELECT name, side_view_path, top_view_path FROM aircraft "
+                        "WHERE side_view_path IS NOT NULL OR top_view_path IS NOT NULL")
+    for name, side, top in rows:
+        if side:
+            images.setdefault(side, []).append((name, "side"))
+        if top:
+            images.setdefault(top, []).append((name, "top"))
+    return images
+
+
+def update_index(db_file, workers=None, batch_size=500, store_dir="thumbnails"):
+    """Describe every new or changed image referenced by db_file in a process pool.
+
+    Images packed into the atlas of the thumbnail store in store_dir are read
+    from the atlas, so their source files are not touched. Rows for images
+    that are no longer referenced or no longer exist are removed. Returns an
+    (indexed, failed, removed) tuple.
+    """
+    packed = {}
+    if store_dir and os.path.exists(os.path.join(store_dir, "index.db")):
+        store = ThumbnailStore(store_dir)
+        try:
+            packed = store.packed_sources()
+        finally:
+            store.close()
+
+    with AircraftDatabase(db_file=db_file, seed=False) as db:
+        conn = db.conn
+        images = referenced_images(conn)
+        stored = {path: (mtime_ns, size, version) for path, mtime_ns, size, version
+                  in conn.execute("SELECT source_path, mtime_ns, file_size, version FROM silhouette_index")}
+
+        jobs, gone = [], [path for path in stored if path not in images]
+        for path in images:
+            entry = packed.get(os.path.abspath(path))
+            if entry is not None:
+                if stored.get(path) != (entry[0], entry[1], DESCRIPTOR_VERSION):
+                    jobs.append((path, entry))
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                logger.warning(f"Image not found: {path}")
+                if path in stored:
+                    gone.append(path)
+                continue
+            if stored.get(path) != (stat.st_mtime_ns, stat.st_size, DESCRIPTOR_VERSION):
+                jobs.append((path, None))
+
+        conn.executemany("DELETE FROM silhouette_index WHERE source_path = ?", ((path,) for path in gone))
+        conn.commit()
+
+        indexed, failed, batch = 0, 0, []
+        if jobs:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(describe_file, path, entry): path for path, entry in jobs}
+                for future in as_completed(futures):
+                    try:
+                        batch.append(future.result())
+                        indexed += 1
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"Failed to describe {futures[future]}: {e}")
+                    if len(batch) >= batch_size:
+                        conn.executemany("INSERT OR REPLACE INTO silhouette_index VALUES (?, ?, ?, ?, ?, ?)", batch)
+                        conn.commit()
+                        batch = []
+            if batch:
+                conn.executemany("INSERT OR REPLACE INTO silhouette_index VALUES (?, ?, ?, ?, ?, ?)", batch)
+                conn.commit()
+    return indexed, failed, len(gone)
+
+
+class SilhouetteMatcher:
+    """All indexed descriptors in memory, matched against query images in one batch.
+
+    Load it once per database version (AircraftDatabase.change_token() tells
+    when to reload); matching does not touch the database.
+    """
+
+    def __init__(self, paths, hashes, features, images):
+        self.paths = paths
+        self.images = images
+        self.hashes = np.ascontiguousarray(hashes).view(np.uint64).ravel()
+        # Each feature block transposed and contiguous, with the squared length of every row,
+        # for |a - b|^2 = |a|^2 - 2ab + |b|^2 as one matrix product per block
+        self.blocks = [np.ascontiguousarray(features[:, start:stop].T) for start, stop, _ in FEATURE_BLOCKS]
+        self.block_norms = [np.einsum("ij,ij->j", block, block) for block in self.blocks]
+
+    @classmethod
+    def load(cls, conn):
+        """Read the silhouette index of a database connection"""
+        images = referenced_images(conn)
+        rows = conn.execute("SELECT source_path, phash, features FROM silhouette_index WHERE version = ? "
+                            "ORDER BY source_path", (DESCRIPTOR_VERSION,)).fetchall()
+        rows = [row for row in rows if row[0] in images]
+        # One buffer per column instead of an array per row keeps loading 100k rows fast
+        hashes = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.uint8).reshape(-1, 8)
+        features = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(-1, FEATURE_COUNT)
+        return cls([row[0] for row in rows], hashes, features, images)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def distances(self, image):
+        """Return the distance of every indexed silhouette to the image or its mirror image"""
+        mask, aspect = silhouette_mask(image)
+        queries = [describe_mask(mask, aspect), describe_mask(np.ascontiguousarray(mask[:, ::-1]), aspect)]
+        query_hashes = np.stack([phash for phash, _ in queries]).view(np.uint64).ravel()
+        query_features = np.stack([features for _, features in queries])
+
+        scores = np.zeros((len(queries), len(self)), dtype=np.float32)
+        for (start, stop, weight), block, norms in zip(FEATURE_BLOCKS, self.blocks, self.block_norms):
+            query = query_features[:, start:stop]
+            squared = norms - 2 * (query @ block)
+            squared += np.einsum("ij,ij->i", query, query)[:, None]
+            scores += weight * np.sqrt(np.maximum(squared, 0, out=squared), out=squared)
+        scores += HASH_WEIGHT * np.sqrt(hamming(self.hashes, query_hashes))
+        return np.minimum(scores[0], scores[1])
+
+    @timed("identify.match")
+    def match(self, image, k=10):
+        """Return up to k (aircraft name, view, distance) tuples for an image file or PIL image, closest first"""
+        if not len(self) or k <= 0:
+            return []
+        if not isinstance(image, Image.Image):
+            with Image.open(image) as opened:
+                return self.match(opened, k)
+        scores = self.distances(image)
+        # Aircraft share images and can match with both views, so rank a few more images than k
+        count = min(len(scores), k * 2)
+        nearest = np.argpartition(scores, count - 1)[:count]
+        results, seen = [], set()
+        for i in nearest[np.argsort(scores[nearest], kind="stable")]:
+            for name, view in self.images[self.paths[i]]:
+                if name not in seen:
+                    seen.add(name)
+                    results.append((name, view, float(scores[i])))
+        return results[:k]
+
+
+def main():
+    """Build the silhouette index or identify an image from the command line"""
+    parser = argparse.ArgumentParser(description="Identify WingID aircraft from silhouette images")
+    parser.add_argument("--db", default=AircraftDatabase.DEFAULT_DB_FILE,
+                        help=f"aircraft database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index_parser = commands.add_parser("index", help="describe all new or changed silhouette images")
+    index_parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    index_parser.add_argument("--store", default="thumbnails",
+                              help="thumbnail store whose packed atlas is read instead of the image files "
+                                   "(default: thumbnails)")
+    match_parser = commands.add_parser("match", help="list the aircraft whose silhouettes look most like an image")
+    match_parser.add_argument("image", help="image file to identify")
+    match_parser.add_argument("--top", type=int, default=10, help="number of results (default: 10)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.command == "index" else logging.WARNING)
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+
+    if args.command == "index":
+        start = time.perf_counter()
+        indexed, failed, removed = update_index(args.db, args.workers, store_dir=args.store)
+        logger.info(f"Indexed {indexed} silhouettes ({failed} failed, {removed} removed) "
+                    f"in {time.perf_counter() - start:.2f}s")
+        return 1 if failed else 0
+
+    with AircraftDatabase.open_reader(db_file=args.db, seed=False) as db:
+        matcher = SilhouetteMatcher.load(db.conn)
+    if not len(matcher):
+        print("The silhouette index is empty; run: python wingid_identify.py index", file=sys.stderr)
+        return 1
+    try:
+        results = matcher.match(args.image, args.top)
+    except (OSError, ValueError) as e:
+        print(f"Cannot identify {args.image}: {e}", file=sys.stderr)
+        return 1
+    for name, view, distance in results:
+        print(f"{distance:8.3f}  {view:<4}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
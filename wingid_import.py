@@ -0,0 +1,320 @@
+"""Streaming bulk importer for the WingID aircraft table.
+
+Reads CSV, JSON Lines or JSON array files record by record, so memory use
+does not grow with the file size. Rows are validated, then upserted on
+`name` with batched executemany calls inside large transactions. Columns
+missing from a record are left untouched on existing aircraft. Records in a
+language other than English update that language's translations; aircraft
+they name are created if missing.
+
+    python wingid_import.py catalog.csv
+    python wingid_import.py catalog.jsonl --language de --dry-run
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from wingid_db import AircraftDatabase
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = AircraftDatabase.COLUMNS
+
+# By default the FTS index is rebuilt once at the end only when an import has at least this many
+# rows, or this share of the rows already in the table; smaller imports keep the triggers
+DEFER_INDEX_ROWS = 10000
+DEFER_INDEX_FRACTION = 0.1
+
+
+class ImportReport:
+    """Counters and per-row errors collected during an import"""
+
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line, name, message):
+        self.errors.append({"line": line, "name": name, "error": message})
+
+    def summary(self):
+        return (f"{self.read} rows read, {self.written} written, {len(self.errors)} errors "
+                f"in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+def iter_csv(f):
+    """Yield (line, record) pairs from a CSV file with a header row"""
+    reader = csv.DictReader(f)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def iter_jsonl(f):
+    """Yield (line, record) pairs from a JSON Lines file"""
+    for line_no, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f"invalid JSON: {e}")
+
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """Yield (index, record) pairs from a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("expected a JSON array")
+    buffer = buffer[1:]
+    index = 0
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                raise ValueError(f"truncated or invalid JSON after record {index}")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        index += 1
+        yield index, record
+        buffer = buffer[end:]
+        if len(buffer) < chunk_size and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+
+def detect_format(path, f):
+    """Guess the input format from the file extension, falling back to the first character"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    first = f.read(1)
+    f.seek(0)
+    return "json" if first == "[" else "jsonl"
+
+
+def validate(record):
+    """Return a cleaned {column: value} dict for a record, or raise ValueError"""
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    if None in record:
+        raise ValueError("more values than header columns")
+    unknown = set(record) - set(COLUMNS) - {"id"}
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    row = {}
+    for column in COLUMNS:
+        if column not in record:
+            continue
+        value = record[column]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif value is not None and not isinstance(value, str):
+            raise ValueError(f"field '{column}' must be a string")
+        value = value.strip() if value else None
+        row[column] = value or None
+    if not row.get("name"):
+        raise ValueError("missing aircraft name")
+    return row
+
+
+def projected_rows(f, rows_read):
+    """Estimate the rows in a file from the share of its bytes that the first rows_read used up"""
+    try:
+        consumed = f.buffer.tell()
+        size = os.fstat(f.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return rows_read
+    return rows_read * size // consumed if consumed else rows_read
+
+
+def upsert_sql(columns):
+    """Build an upsert statement for one set of columns"""
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "name")
+    conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    return (f"INSERT INTO aircraft ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(name) {conflict}")
+
+
+def flush(cursor, batches, report, db=None, translations=None):
+    """Write pending rows grouped by column set; isolates failing rows if a batch errors"""
+    for columns, rows in batches.items():
+        sql = upsert_sql(columns)
+        cursor.execute("SAVEPOINT batch")
+        try:
+            cursor.executemany(sql, [values for _, _, values in rows])
+            cursor.execute("RELEASE batch")
+            report.written += len(rows)
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO batch")
+            cursor.execute("RELEASE batch")
+            for line, name, values in rows:
+                try:
+                    cursor.execute(sql, values)
+                    report.written += 1
+                except sqlite3.Error as e:
+                    report.add_error(line, name, str(e))
+    batches.clear()
+
+    if translations:
+        # Aircraft rows are written first, so every translation finds its aircraft
+        try:
+            db.save_translations(db.language, translations)
+        except sqlite3.Error as e:
+            report.add_error(None, None, f"saving {db.language} translations failed: {e}")
+        translations.clear()
+
+
+def import_file(db, path, fmt=None, batch_size=1000, commit_every=50000, dry_run=False, defer_index=None):
+    """Stream a CSV/JSONL/JSON file into db's aircraft table and return an ImportReport.
+
+    Text fields are stored as translations when db's language is not the base language.
+    defer_index=True drops the FTS triggers and rebuilds the index at the end, False
+    keeps them, and None switches to a rebuild once the import turns out to be large.
+    """
+    report = ImportReport()
+    translations = [] if db.language != db.BASE_LANGUAGE else None
+    conn, cursor = db.conn, db.conn.cursor()
+
+    # Trade durability for speed during the load; a crash only loses the uncommitted batch
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.execute("PRAGMA cache_size = -65536")
+
+    # Rebuilding the FTS index once is much cheaper than maintaining it row by row, but the rebuild
+    # reads the whole table, so it only pays off for imports that are large compared with it
+    defer_after = None
+    if db.fts_tokenizer and not dry_run and defer_index is not False:
+        defer_after = 0 if defer_index else max(DEFER_INDEX_ROWS, int(db.count_aircraft() * DEFER_INDEX_FRACTION))
+    deferred = False
+    if defer_after == 0:
+        db.drop_search_triggers()
+        deferred = True
+
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            fmt = fmt or detect_format(path, f)
+            records = {"csv": iter_csv, "jsonl": iter_jsonl, "json": iter_json_array}[fmt](f)
+
+            batches, pending, uncommitted = {}, 0, 0
+            cursor.execute("BEGIN")
+            for line, record in records:
+                report.read += 1
+                try:
+                    row = validate(record)
+                except ValueError as e:
+                    name = record.get("name") if isinstance(record, dict) else None
+                    report.add_error(line, name, str(e))
+                    continue
+                if translations is not None:
+                    translations.extend((row["name"], column, row.pop(column))
+                                        for column in db.TRANSLATED_COLUMNS if column in row)
+                columns = tuple(row)
+                batches.setdefault(columns, []).append((line, row["name"], tuple(row.values())))
+                pending += 1
+
+                if pending >= batch_size:
+                    if not deferred and defer_after is not None and projected_rows(f, report.read) >= defer_after:
+                        # Rows written so far are already indexed; the rebuild at the end covers them too
+                        db.drop_search_triggers()
+                        deferred = True
+                    flush(cursor, batches, report, db, translations)
+                    uncommitted += pending
+                    pending = 0
+                    if uncommitted >= commit_every and not dry_run:
+                        conn.commit()
+                        cursor.execute("BEGIN")
+                        uncommitted = 0
+                        logger.info(f"{report.read} rows processed "
+                                    f"({report.read / (time.perf_counter() - report.started):,.0f} rows/s)")
+
+            if not deferred and defer_after is not None and report.read >= defer_after:
+                db.drop_search_triggers()
+                deferred = True
+            flush(cursor, batches, report, db, translations)
+            if dry_run:
+                conn.rollback()
+            else:
+                db.refresh_facets()
+                db.refresh_hashes()
+                conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        if deferred:
+            db.create_search_triggers()
+            db.rebuild_search_index()
+            conn.commit()
+        cursor.execute("PRAGMA synchronous = FULL")
+
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+def main():
+    """Import aircraft records from the command line"""
+    parser = argparse.ArgumentParser(description="Bulk import aircraft into a WingID database")
+    parser.add_argument("file", help="CSV, JSON Lines or JSON array file")
+    parser.add_argument("--format", choices=("csv", "jsonl", "json"), help="input format (default: from extension)")
+    parser.add_argument("--language", default="en", choices=("en", "de"), help="language of the imported text")
+    parser.add_argument("--db", help=f"database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per executemany batch")
+    parser.add_argument("--commit-every", type=int, default=50000, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="validate and write, then roll back")
+    parser.add_argument("--errors", help="write per-row errors to this JSONL file")
+    parser.add_argument("--defer-index", dest="defer_index", action="store_true", default=None,
+                        help="rebuild the full-text index once at the end instead of updating it per row")
+    parser.add_argument("--no-defer-index", dest="defer_index", action="store_false",
+                        help="always update the full-text index per row "
+                             f"(default: rebuild only for imports of {DEFER_INDEX_ROWS}+ rows "
+                             f"or {DEFER_INDEX_FRACTION:.0%}% of the table)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = AircraftDatabase(args.language, db_file=args.db, seed=False)
+    try:
+        report = import_file(db, args.file, args.format, args.batch_size, args.commit_every, args.dry_run,
+                             args.defer_index)
+    finally:
+        db.close()
+
+    for error in report.errors[:20]:
+        logger.warning(f"line {error['line']} ({error['name'] or '?'}): {error['error']}")
+    if len(report.errors) > 20:
+        logger.warning(f"... and {len(report.errors) - 20} more errors")
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            for error in report.errors:
+                f.write(json.dumps(error, ensure_ascii=False) + "\n")
+
+    logger.info(("Dry run: " if args.dry_run else "") + report.summary())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
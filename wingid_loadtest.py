@@ -0,0 +1,124 @@
+"""Small load generator for wingid_server.py.
+
+Fires a mix of search and detail requests from several client threads (each
+with its own keep-alive connection) and reports requests/sec and latency
+percentiles.
+
+    python wingid_loadtest.py --url http://127.0.0.1:8765 --threads 8 --duration 10
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from wingid_metrics import percentile
+
+
+def fetch_names(host, port, limit=500):
+    """Ask the server for aircraft names to build realistic requests from"""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", f"/search?q=&limit={limit}")
+    names = json.loads(conn.getresponse().read())["results"]
+    conn.close()
+    return names
+
+
+def build_paths(names, count=2000, seed=1):
+    """Build a request mix: prefix searches as typed in the GUI plus detail lookups"""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        name = rng.choice(names)
+        if rng.random() < 0.5:
+            prefix = name[:rng.randint(1, max(len(name), 1))]
+            paths.append(f"/search?q={quote(prefix)}&limit=50")
+        else:
+            paths.append(f"/aircraft/{quote(name, safe='')}")
+    return paths
+
+
+def worker(host, port, paths, deadline, use_etags, results, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    etags = {}
+    latencies, errors, not_modified = [], 0, 0
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        headers = {"If-None-Match": etags[path]} if use_etags and path in etags else {}
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status == 304:
+            not_modified += 1
+        elif response.status >= 500:
+            errors += 1
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+    conn.close()
+    with lock:
+        results["latencies"].extend(latencies)
+        results["errors"] += errors
+        results["not_modified"] += not_modified
+
+
+def main():
+    """Run the load test and print a JSON summary"""
+    parser = argparse.ArgumentParser(description="Load-test a running wingid_server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="server base URL")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="test duration in seconds")
+    parser.add_argument("--etags", action="store_true", help="revalidate with If-None-Match like a caching client")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    names = fetch_names(host, port)
+    if not names:
+        parser.error("the server returned no aircraft")
+    paths = build_paths(names)
+
+    results = {"latencies": [], "errors": 0, "not_modified": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=worker, args=(host, port, paths[i::args.threads] or paths, deadline,
+                                                     args.etags, results, lock))
+               for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(results["latencies"])
+    summary = {
+        "requests": len(latencies),
+        "errors": results["errors"],
+        "not_modified": results["not_modified"],
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        },
+    }
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""One-time merge of the old per-language database files into airplane.db.
+
+Earlier versions kept a complete copy of the data for every language
+(airplane.db for English, airplane_de.db for German). Now a single database
+holds the aircraft once, plus per-field translations. This tool folds a
+language file into it: aircraft are matched by name, text that differs from
+the English row is stored as a translation, aircraft that only exist in the
+merged file are added, and missing image paths are filled in.
+
+    python wingid_merge.py airplane_de.db --language de
+
+The source file is only read. Merging the same file again is harmless.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from wingid_db import AircraftDatabase, read_only_uri
+
+logger = logging.getLogger(__name__)
+
+
+def iter_legacy_rows(path, batch_size=1000):
+    """Yield lists of aircraft dicts from an old database file, opened read-only"""
+    source = sqlite3.connect(read_only_uri(path), uri=True)
+    try:
+        # Old files may predate the image path columns
+        present = {row[1] for row in source.execute("PRAGMA table_info(aircraft)")}
+        if "name" not in present:
+            raise ValueError(f"{path} has no aircraft table")
+        columns = [c for c in AircraftDatabase.COLUMNS if c in present]
+        cursor = source.execute(f"SELECT {', '.join(columns)} FROM aircraft WHERE name IS NOT NULL")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = []
+            for values in rows:
+                row = dict.fromkeys(AircraftDatabase.COLUMNS)
+                row.update(zip(columns, values))
+                batch.append(row)
+            yield batch
+    finally:
+        source.close()
+
+
+def merge_file(db, path, language, batch_size=1000):
+    """Merge an old single-language database file into db; returns (added, translated) counts"""
+    columns = AircraftDatabase.COLUMNS
+    insert_sql = f"""
+        INSERT INTO aircraft ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+        ON CONFLICT(name) DO UPDATE SET
+            side_view_path = COALESCE(aircraft.side_view_path, excluded.side_view_path),
+            top_view_path = COALESCE(aircraft.top_view_path, excluded.top_view_path)
+    """
+    translate = language != db.BASE_LANGUAGE
+    before = db.count_aircraft()
+    translated = 0
+
+    cursor = db.conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        for rows in iter_legacy_rows(path, batch_size):
+            # Aircraft missing from the target get the merged file's text as their fallback
+            cursor.executemany(insert_sql, [tuple(row[c] for c in columns) for row in rows])
+            if translate:
+                translated += db.save_translations(language, ((row["name"], column, row[column])
+                                                              for row in rows for column in db.TRANSLATED_COLUMNS))
+        db.refresh_facets()
+        db.refresh_hashes()
+        db.conn.commit()
+    except BaseException:
+        db.conn.rollback()
+        raise
+    return db.count_aircraft() - before, translated
+
+
+def main():
+    """Merge a per-language database file from the command line"""
+    parser = argparse.ArgumentParser(description="Merge an old per-language WingID database into the shared database")
+    parser.add_argument("source", help="old database file, e.g. airplane_de.db")
+    parser.add_argument("--language", required=True, help="language of the source file's text, e.g. de")
+    parser.add_argument("--db", help=f"target database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    target = args.db or AircraftDatabase.DEFAULT_DB_FILE
+    if not os.path.exists(args.source):
+        parser.error(f"database not found: {args.source}")
+    if os.path.abspath(args.source) == os.path.abspath(target):
+        parser.error("source and target are the same file")
+
+    start = time.perf_counter()
+    with AircraftDatabase(args.language, db_file=target, seed=False) as db:
+        try:
+            added, translated = merge_file(db, args.source, args.language)
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Merge failed: {e}")
+            return 1
+    logger.info(f"Merged {args.source} into {target}: {added} aircraft added, "
+                f"{translated} translated fields written in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
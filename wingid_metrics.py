@@ -0,0 +1,193 @@
+"""In-process timing metrics and on-demand profiling for WingID.
+
+Hot paths are wrapped with the `timed` decorator (or the `metrics.timer`
+context manager). Every call adds its duration to a rolling histogram: the
+last `window` samples give current p50/p95/p99, while counts, totals and
+fixed latency buckets cover the whole session. Recording costs about a
+microsecond and is thread-safe, so it stays on in production builds.
+
+    from wingid_metrics import metrics, timed
+
+    @timed("db.search_aircraft")
+    def search_aircraft(self, query): ...
+
+    metrics.dump("wingid-metrics.json")
+
+Calls slower than `metrics.slow_ms` are also logged, so a "the app is
+laggy" report with the log attached shows what was slow.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the all-time latency buckets; slower calls land in the last, open bucket
+BUCKET_BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+class Histogram:
+    """Recent samples of one timed operation plus all-time totals"""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        ms = seconds * 1000
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def summary(self):
+        """Return the statistics as a JSON-friendly dict (times in ms)"""
+        recent = sorted(self.samples)
+        labels = [f"<={bound}" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "recent": {
+                "samples": len(recent),
+                "p50_ms": round(percentile(recent, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(recent, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(recent, 0.99) * 1000, 3),
+            },
+            "buckets_ms": dict(zip(labels, self.buckets)),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of named histograms"""
+
+    def __init__(self, window=1000, slow_ms=250):
+        self.window = window
+        self.slow_ms = slow_ms
+        self.started = time.time()
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Add one duration (in seconds) to the named histogram"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.window)
+            histogram.add(seconds)
+        if self.slow_ms and seconds * 1000 >= self.slow_ms:
+            logger.info(f"Slow {name}: {seconds * 1000:.0f} ms")
+
+    @contextmanager
+    def timer(self, name):
+        """Time the body of a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator that records the duration of every call under name"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def snapshot(self, context=None):
+        """Return all statistics (and optional context such as the catalog size) as a dict"""
+        with self._lock:
+            operations = {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "uptime_s": round(time.time() - self.started, 1),
+            "pid": os.getpid(),
+            "context": context or {},
+            "operations": operations,
+        }
+
+    def dump(self, path, context=None):
+        """Write a snapshot to path as JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(context), f, indent=2, ensure_ascii=False)
+        logger.info(f"Wrote metrics snapshot to {path}")
+
+    def reset(self):
+        """Forget all recorded samples"""
+        with self._lock:
+            self._histograms.clear()
+            self.started = time.time()
+
+
+def format_table(snapshot):
+    """Render a snapshot's operations as a fixed-width text table"""
+    lines = [f"{'operation':<28}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)"]
+    for name, stats in snapshot["operations"].items():
+        recent = stats["recent"]
+        lines.append(f"{name:<28}{stats['count']:>7}{recent['p50_ms']:>9.1f}{recent['p95_ms']:>9.1f}"
+                     f"{recent['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+    return "\n".join(lines)
+
+
+class Profiler:
+    """cProfile capture that is started and stopped on demand.
+
+    cProfile only follows the thread that started it, so started from the Tk
+    thread it shows where the UI itself spends its time.
+    """
+
+    def __init__(self):
+        self._profile = None
+
+    @property
+    def active(self):
+        return self._profile is not None
+
+    def start(self):
+        """Start a new capture (no-op if one is running)"""
+        if self._profile is None:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self, path=None):
+        """Stop the capture and write it to path (pstats format) if given"""
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return
+        profile.disable()
+        if path:
+            profile.dump_stats(path)
+            logger.info(f"Wrote profile to {path} (view with: python -m pstats {path})")
+
+
+metrics = Metrics()
+timed = metrics.timed
@@ -0,0 +1,373 @@
+"""Local read-only HTTP/JSON query service for a shared WingID database.
+
+Serves the same lookups as the GUI to several analysts and scripts at once.
+Requests are handled by a threaded server that borrows connections from a
+pool of read-only SQLite connections. The database is switched to WAL mode
+so imports can keep writing while it serves reads.
+
+    python wingid_server.py --port 8765
+
+Endpoints:
+    GET /search?q=<query>[&limit=N][&lang=de][&fuzzy=1]
+                                             {"query": ..., "results": [names]}
+    GET /aircraft/<name>[?lang=de]           detail record, 404 if unknown
+    GET /thumbnail/<name>/<side|top>[?size=WxH]
+                                             PNG silhouette (requires Pillow)
+    GET /health                              {"status": "ok"}
+    GET /metrics                             timing statistics of the lookups served so far
+    POST /identify[?top=N]                   image file as the request body
+                                             {"results": [{"name", "view", "distance"}]}
+                                             (requires NumPy and Pillow and a silhouette
+                                             index built with wingid_identify.py)
+
+JSON responses carry an ETag and a Last-Modified header derived from the
+database files, and thumbnails are tagged by content digest. Clients that
+send If-None-Match or If-Modified-Since get 304 Not Modified when nothing
+changed. Every language is served from the same database; without a lang
+parameter the server's --language is used.
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from wingid_db import AircraftDatabase
+from wingid_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only AircraftDatabase connections"""
+
+    def __init__(self, db_file, language="en", size=8):
+        self.db_file = db_file
+        self.language = language
+        self.size = size
+        self._pool = queue.Queue()
+        # One fuzzy name index serves every request instead of one per pooled connection
+        self._fuzzy_db = None
+        self._fuzzy_lock = threading.Lock()
+        for _ in range(size):
+            self._pool.put(AircraftDatabase(language, db_file=db_file, read_only=True))
+
+    @contextmanager
+    def connection(self, language=None, timeout=10.0):
+        """Borrow a connection, switched to language, for the duration of a with block"""
+        db = self._pool.get(timeout=timeout)
+        try:
+            db.set_language(language or self.language)
+            yield db
+        finally:
+            self._pool.put(db)
+
+    def fuzzy_search(self, query, limit=50):
+        """Return typo-tolerant name matches from the shared fuzzy index"""
+        with self._fuzzy_lock:
+            if self._fuzzy_db is None:
+                self._fuzzy_db = AircraftDatabase(self.language, db_file=self.db_file, read_only=True)
+            return [name for name, _ in self._fuzzy_db.fuzzy_search(query, limit)]
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        if self._fuzzy_db is not None:
+            self._fuzzy_db.close()
+
+    def version(self):
+        """Return (mtime_ns, validator) describing the current state of the database files"""
+        mtime_ns, parts = 0, []
+        for path in (self.db_file, self.db_file + "-wal"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        return mtime_ns, "/".join(parts)
+
+
+class WingIDRequestHandler(BaseHTTPRequestHandler):
+    server_version = "WingID/2.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        try:
+            if parts == ["health"]:
+                self.send_json({"status": "ok"}, cacheable=False)
+            elif parts == ["metrics"]:
+                self.send_json(metrics.snapshot({"pool_size": self.server.pool.size}), cacheable=False)
+            elif parts == ["search"]:
+                self.handle_search(params)
+            elif len(parts) == 2 and parts[0] == "aircraft":
+                self.handle_info(parts[1], params)
+            elif len(parts) == 3 and parts[0] == "thumbnail":
+                self.handle_thumbnail(parts[1], parts[2], params)
+            else:
+                self.send_error_json(HTTPStatus.NOT_FOUND, "unknown endpoint")
+        except queue.Empty:
+            self.send_error_json(HTTPStatus.SERVICE_UNAVAILABLE, "all database connections are busy")
+        except ValueError as e:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            logger.exception(f"Request failed: {self.path}")
+            self.send_error_json(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        try:
+            if url.path.strip("/") == "identify":
+                self.handle_identify(params)
+            else:
+                self.close_connection = True
+                self.send_error_json(HTTPStatus.NOT_FOUND, "unknown endpoint")
+        except queue.Empty:
+            self.send_error_json(HTTPStatus.SERVICE_UNAVAILABLE, "all database connections are busy")
+        except ValueError as e:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            logger.exception(f"Request failed: {self.path}")
+            self.send_error_json(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+    def handle_search(self, params):
+        query = params.get("q", [""])[0]
+        limit = int(params.get("limit", ["0"])[0])
+        if self.not_modified():
+            return
+        with self.server.pool.connection(params.get("lang", [None])[0]) as db:
+            names = db.search_aircraft(query, limit if limit > 0 else None)
+        if not names and query.strip() and params.get("fuzzy", ["0"])[0] == "1":
+            names = self.server.pool.fuzzy_search(query, limit if limit > 0 else 50)
+        self.send_json({"query": query, "results": names})
+
+    def handle_info(self, name, params):
+        if self.not_modified():
+            return
+        with self.server.pool.connection(params.get("lang", [None])[0]) as db:
+            info = db.get_aircraft_info(name)
+        if info is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"no information found for aircraft: {name}")
+        else:
+            self.send_json(dict(info, name=name))
+
+    def handle_thumbnail(self, name, view, params):
+        if view not in ("side", "top"):
+            raise ValueError("view must be 'side' or 'top'")
+        width, height = (int(v) for v in params.get("size", ["250x120"])[0].lower().split("x"))
+        store = self.server.thumbnail_store()
+        if store is None:
+            self.send_error_json(HTTPStatus.NOT_IMPLEMENTED, "thumbnails require Pillow")
+            return
+
+        with self.server.pool.connection() as db:
+            info = db.get_aircraft_info(name)
+        path = info and info[f"{view}_view_path"]
+        if not path:
+            self.send_error_json(HTTPStatus.NOT_FOUND, "no image available")
+            return
+        # Checked before the source file: serving from the atlas must not touch the file system
+        packed = store.lookup_packed(path, (width, height))
+        if packed:
+            # Packed images have no PNG file; the atlas entry (pack, offset, source mtime) validates them
+            pack_path, offset, _, mtime_ns = packed
+            etag = '"{}-{}-{}"'.format(os.path.basename(pack_path)[:-5], offset, mtime_ns)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_not_modified(etag, None)
+                return
+            buffer = io.BytesIO()
+            store.get_image(path, (width, height)).save(buffer, "PNG")
+            self.send_png(buffer.getvalue(), etag)
+            return
+
+        if not os.path.exists(path):
+            self.send_error_json(HTTPStatus.NOT_FOUND, "no image available")
+            return
+        thumb = store.lookup(path, (width, height))
+        if thumb is None:
+            store.get_image(path, (width, height))
+            thumb = store.lookup(path, (width, height))
+        if thumb is None:
+            self.send_error_json(HTTPStatus.INTERNAL_SERVER_ERROR, "thumbnail could not be stored")
+            return
+
+        # Thumbnails are content addressed, so the file name is a strong validator
+        etag = '"{}"'.format(os.path.basename(thumb)[:-4])
+        if self.headers.get("If-None-Match") == etag:
+            self.send_not_modified(etag, None)
+            return
+        with open(thumb, "rb") as f:
+            self.send_png(f.read(), etag)
+
+    def handle_identify(self, params):
+        top = int(params.get("top", ["10"])[0])
+        length = int(self.headers.get("Content-Length") or 0)
+        if not 0 < length <= MAX_UPLOAD_BYTES:
+            # The body is not read, so the connection can't be reused
+            self.close_connection = True
+            raise ValueError(f"send an image of at most {MAX_UPLOAD_BYTES} bytes as the request body")
+        body = self.rfile.read(length)
+        matcher = self.server.silhouette_matcher()
+        if matcher is None:
+            self.send_error_json(HTTPStatus.NOT_IMPLEMENTED, "identification requires NumPy and Pillow")
+            return
+        if not len(matcher):
+            self.send_error_json(HTTPStatus.SERVICE_UNAVAILABLE, "the silhouette index is empty")
+            return
+        from PIL import Image, UnidentifiedImageError
+        try:
+            with Image.open(io.BytesIO(body)) as image:
+                results = matcher.match(image, max(1, min(top, 100)))
+        except UnidentifiedImageError:
+            raise ValueError("the request body is not a supported image")
+        self.send_json({"results": [{"name": name, "view": view, "distance": round(distance, 4)}
+                                    for name, view, distance in results]}, cacheable=False)
+
+    def validators(self):
+        """Return (etag, last_modified) for the requested URL at the current database version"""
+        mtime_ns, version = self.server.pool.version()
+        digest = hashlib.sha1(f"{version}|{self.path}".encode("utf-8")).hexdigest()[:20]
+        return f'W/"{digest}"', formatdate(mtime_ns / 1e9, usegmt=True)
+
+    def not_modified(self):
+        """Answer 304 and return True if the client's cached copy is still current"""
+        etag, last_modified = self.validators()
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        fresh = False
+        if if_none_match is not None:
+            fresh = etag in (tag.strip() for tag in if_none_match.split(","))
+        elif if_modified_since:
+            try:
+                fresh = parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+            except (TypeError, ValueError):
+                fresh = False
+        if fresh:
+            self.send_not_modified(etag, last_modified)
+        return fresh
+
+    def send_not_modified(self, etag, last_modified):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+
+    def send_json(self, payload, status=HTTPStatus.OK, cacheable=True):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if cacheable:
+            etag, last_modified = self.validators()
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_png(self, body, etag):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json({"error": message}, status=status, cacheable=False)
+
+
+class WingIDServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool, thumbnail_dir="thumbnails"):
+        super().__init__(address, WingIDRequestHandler)
+        self.pool = pool
+        self.thumbnail_dir = thumbnail_dir
+        self._thumbnail_store = None
+        self._thumbnail_lock = threading.Lock()
+        self._matcher = None
+        self._matcher_version = None
+        self._matcher_lock = threading.Lock()
+
+    def thumbnail_store(self):
+        """Open the thumbnail store on first use; returns None if Pillow is not installed"""
+        with self._thumbnail_lock:
+            if self._thumbnail_store is None:
+                try:
+                    from wingid_thumbnails import ThumbnailStore
+                except ImportError:
+                    return None
+                self._thumbnail_store = ThumbnailStore(self.thumbnail_dir)
+            return self._thumbnail_store
+
+    def silhouette_matcher(self):
+        """Load the silhouette index, again whenever the database changed; None without NumPy and Pillow"""
+        with self._matcher_lock:
+            try:
+                from wingid_identify import SilhouetteMatcher
+            except ImportError:
+                return None
+            _, version = self.pool.version()
+            if self._matcher is None or version != self._matcher_version:
+                with self.pool.connection() as db:
+                    self._matcher = SilhouetteMatcher.load(db.conn)
+                self._matcher_version = version
+            return self._matcher
+
+
+def main():
+    """Run the query service"""
+    parser = argparse.ArgumentParser(description="Serve a WingID database over local HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("--language", default="en", choices=("en", "de"), help="default language of the returned text")
+    parser.add_argument("--db", help=f"database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    parser.add_argument("--pool-size", type=int, default=8, help="number of read-only connections")
+    parser.add_argument("--thumbnails", default="thumbnails", help="thumbnail store directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db_file = args.db or AircraftDatabase.DEFAULT_DB_FILE
+    if not os.path.exists(db_file):
+        parser.error(f"database not found: {db_file}")
+
+    # Migrate once up front; WAL lets writers (e.g. the importer) work while the pool keeps reading
+    with AircraftDatabase(args.language, db_file=db_file, seed=False) as db:
+        db.enable_wal()
+
+    pool = ConnectionPool(db_file, args.language, args.pool_size)
+    server = WingIDServer((args.host, args.port), pool, args.thumbnails)
+    logger.info(f"Serving {db_file} on http://{args.host}:{args.port} with {args.pool_size} connections")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
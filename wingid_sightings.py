@@ -0,0 +1,375 @@
+"""Sightings log for WingID: when and where aircraft were seen.
+
+Sightings (time, aircraft type, location, tail number and notes) are
+appended in batches to the sightings table of the aircraft database. Every
+batch also updates sighting_rollups, which holds one row per day and
+aircraft type with the number of sightings and the first and last time
+seen. The reports below and the history in the details panel read the
+rollups and the (aircraft_id, seen_at) index, so they never scan the log:
+
+    python wingid_sightings.py import sightings.csv
+    python wingid_sightings.py weekly --since 2026-09-01
+    python wingid_sightings.py seen "E-3 Sentry" "E-6 Mercury"
+    python wingid_sightings.py rarest --month 2026-10
+    python wingid_sightings.py history "E-3 Sentry"
+
+Input files are CSV (with a header row), JSON Lines or JSON arrays with the
+fields seen_at, aircraft, location, tail_number and notes. aircraft is the
+type's name in the catalog. Times are ISO 8601; times without a UTC offset
+are taken as UTC.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from wingid_db import AircraftDatabase
+from wingid_import import ImportReport, detect_format, iter_csv, iter_json_array, iter_jsonl
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("seen_at", "aircraft", "location", "tail_number", "notes")
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def day_number(date):
+    """Return the days since 1970-01-01 of a date or 'YYYY-MM-DD' text"""
+    if isinstance(date, str):
+        date = datetime.date.fromisoformat(date)
+    return (date - EPOCH).days
+
+
+def day_date(day):
+    """Return a day number as 'YYYY-MM-DD'"""
+    return (EPOCH + datetime.timedelta(days=day)).isoformat()
+
+
+def week_start(day):
+    """Return the day number of the Monday starting day's week (1970-01-01 was a Thursday)"""
+    return day - (day + 3) % 7
+
+
+def month_days(month):
+    """Return the first and last day number of a 'YYYY-MM' month"""
+    first = datetime.date.fromisoformat(month + "-01")
+    following = datetime.date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return day_number(first), day_number(following) - 1
+
+
+def parse_time(value):
+    """Return (seen_at, day) for an ISO 8601 time: UTC text to the second and its day number"""
+    text = value.strip()
+    if text[-1:] in ("Z", "z"):
+        text = text[:-1] + "+00:00"
+    try:
+        moment = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"invalid time {value!r}, expected ISO 8601 such as 2026-10-17T14:03")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ"), day_number(moment.date())
+
+
+def validate(record):
+    """Return a cleaned {field: value} dict (with seen_at normalized and its day) for a record, or raise ValueError"""
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    if None in record:
+        raise ValueError("more values than header columns")
+    unknown = set(record) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+
+    row = {}
+    for field in FIELDS:
+        value = record.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        elif value is not None and not isinstance(value, str):
+            raise ValueError(f"field '{field}' must be a string")
+        row[field] = (value.strip() if value else None) or None
+    if not row["aircraft"]:
+        raise ValueError("missing aircraft")
+    if not row["seen_at"]:
+        raise ValueError("missing seen_at")
+    row["seen_at"], row["day"] = parse_time(row["seen_at"])
+    return row
+
+
+class SightingLog:
+    """Batched ingestion into the sightings log and queries over its rollups"""
+
+    def __init__(self, db):
+        self.db = db
+        self.cursor = db.conn.cursor()
+        # Aircraft name -> id (None for names not in the catalog), shared by all batches
+        self._ids = {}
+
+    def _resolve(self, names, batch_size=500):
+        """Look up the aircraft ids of names not seen before; exact matches first, then ignoring case"""
+        missing = [name for name in dict.fromkeys(names) if name not in self._ids]
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            self.cursor.execute(f"SELECT name, id FROM aircraft WHERE name IN ({', '.join('?' for _ in batch)})",
+                                batch)
+            self._ids.update(self.cursor.fetchall())
+        for name in missing:
+            if name not in self._ids:
+                self.cursor.execute("SELECT id FROM aircraft WHERE name = ? COLLATE NOCASE LIMIT 1", (name,))
+                row = self.cursor.fetchone()
+                self._ids[name] = row[0] if row else None
+
+    def _flush(self, batch, report):
+        """Append one batch of validated (line, row) pairs and fold it into the rollups"""
+        self._resolve(row["aircraft"] for _, row in batch)
+        sightings, rollups = [], {}
+        for line, row in batch:
+            aircraft_id = self._ids[row["aircraft"]]
+            if aircraft_id is None:
+                report.add_error(line, row["aircraft"], "aircraft is not in the catalog")
+                continue
+            sightings.append((aircraft_id, row["seen_at"], row["day"], row["location"], row["tail_number"],
+                              row["notes"]))
+            key = (row["day"], aircraft_id)
+            count, first, last = rollups.get(key, (0, row["seen_at"], row["seen_at"]))
+            rollups[key] = (count + 1, min(first, row["seen_at"]), max(last, row["seen_at"]))
+
+        self.cursor.executemany("""
+            INSERT INTO sightings (aircraft_id, seen_at, day, location, tail_number, notes)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, sightings)
+        self.cursor.executemany("""
+            INSERT INTO sighting_rollups (day, aircraft_id, sightings, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(day, aircraft_id) DO UPDATE SET
+                sightings = sightings + excluded.sightings,
+                first_seen = MIN(first_seen, excluded.first_seen),
+                last_seen = MAX(last_seen, excluded.last_seen)
+        """, [key + value for key, value in rollups.items()])
+        report.written += len(sightings)
+        batch.clear()
+
+    def add_many(self, records, report=None, batch_size=1000):
+        """Append (line, record) pairs to the log (the caller commits); returns the ImportReport"""
+        report = report or ImportReport()
+        batch = []
+        for line, record in records:
+            report.read += 1
+            try:
+                batch.append((line, validate(record)))
+            except ValueError as e:
+                report.add_error(line, record.get("aircraft") if isinstance(record, dict) else None, str(e))
+                continue
+            if len(batch) >= batch_size:
+                self._flush(batch, report)
+        if batch:
+            self._flush(batch, report)
+        return report
+
+    def import_file(self, path, fmt=None, batch_size=1000, dry_run=False):
+        """Append the sightings of a CSV/JSONL/JSON file in one transaction and return an ImportReport"""
+        report = ImportReport()
+        conn = self.db.conn
+        self.cursor.execute("BEGIN")
+        try:
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                fmt = fmt or detect_format(path, f)
+                records = {"csv": iter_csv, "jsonl": iter_jsonl, "json": iter_json_array}[fmt](f)
+                self.add_many(records, report, batch_size)
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        report.elapsed = time.perf_counter() - report.started
+        return report
+
+    def rebuild_rollups(self):
+        """Recompute the rollups from the whole log, e.g. after editing sightings by hand (the caller commits)"""
+        self.cursor.execute("DELETE FROM sighting_rollups")
+        self.cursor.execute("""
+            INSERT INTO sighting_rollups (day, aircraft_id, sightings, first_seen, last_seen)
+            SELECT day, aircraft_id, COUNT(*), MIN(seen_at), MAX(seen_at) FROM sightings GROUP BY day, aircraft_id
+        """)
+        return self.cursor.rowcount
+
+    def weekly_counts(self, since, until):
+        """Return (week start, aircraft name, sightings) for the days since..until, by week and most sighted first"""
+        try:
+            self.cursor.execute("""
+                SELECT r.day - (r.day + 3) % 7 AS week, a.name, SUM(r.sightings) AS total
+                FROM sighting_rollups r JOIN aircraft a ON a.id = r.aircraft_id
+                WHERE r.day BETWEEN ? AND ?
+                GROUP BY week, r.aircraft_id
+                ORDER BY week, total DESC, a.name
+            """, (day_number(since), day_number(until)))
+            return [(day_date(week), name, total) for week, name, total in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Weekly sightings query failed: {e}")
+            return []
+
+    def first_last_seen(self, names=None):
+        """Return (name, sightings, first seen, last seen) for the given aircraft, or every sighted one, latest first"""
+        where, params = "", ()
+        try:
+            if names:
+                # Names are matched like the imported ones: exactly, then ignoring case
+                self._resolve(names)
+                params = tuple(self._ids[name] for name in names if self._ids[name] is not None)
+                where = f"WHERE r.aircraft_id IN ({', '.join('?' for _ in params)})"
+            self.cursor.execute(f"""
+                SELECT a.name, SUM(r.sightings), MIN(r.first_seen), MAX(r.last_seen)
+                FROM sighting_rollups r JOIN aircraft a ON a.id = r.aircraft_id
+                {where}
+                GROUP BY r.aircraft_id
+                ORDER BY MAX(r.last_seen) DESC
+            """, params)
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"First/last seen query failed: {e}")
+            return []
+
+    def rarest(self, since, until, limit=20):
+        """Return (name, rarity, sightings) of the types seen in since..until, rarest class first, then fewest sightings"""
+        try:
+            self.cursor.execute("""
+                SELECT a.name, a.rarity, SUM(r.sightings) AS total
+                FROM sighting_rollups r JOIN aircraft a ON a.id = r.aircraft_id
+                WHERE r.day BETWEEN ? AND ?
+                GROUP BY r.aircraft_id
+                ORDER BY a.rarity_level IS NULL, a.rarity_level, total, a.name
+                LIMIT ?
+            """, (day_number(since), day_number(until), limit))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Rarest sightings query failed: {e}")
+            return []
+
+    def history(self, name, weeks=12, recent=5, today=None):
+        """Return the sighting history of one aircraft, or None if it was never sighted.
+
+        The dict holds the total, the first and last time seen, the sightings
+        per week for the last `weeks` weeks (oldest first) and the `recent`
+        latest sightings as (seen_at, location, tail_number, notes).
+        """
+        try:
+            # Resolved like the imported names, so a type is found under any spelling its sightings used
+            self._resolve([name])
+            aircraft_id = self._ids[name]
+            if aircraft_id is None:
+                return None
+            self.cursor.execute("""
+                SELECT SUM(sightings), MIN(first_seen), MAX(last_seen) FROM sighting_rollups WHERE aircraft_id = ?
+            """, (aircraft_id,))
+            total, first_seen, last_seen = self.cursor.fetchone()
+            if total is None:
+                return None
+
+            current = week_start(day_number(today or datetime.datetime.now(datetime.timezone.utc).date()))
+            oldest = current - 7 * (weeks - 1)
+            self.cursor.execute("""
+                SELECT day - (day + 3) % 7 AS week, SUM(sightings) FROM sighting_rollups
+                WHERE aircraft_id = ? AND day >= ?
+                GROUP BY week
+            """, (aircraft_id, oldest))
+            by_week = dict(self.cursor.fetchall())
+            self.cursor.execute("""
+                SELECT seen_at, location, tail_number, notes FROM sightings
+                WHERE aircraft_id = ? ORDER BY seen_at DESC LIMIT ?
+            """, (aircraft_id, recent))
+            return {
+                "sightings": total,
+                "first_seen": first_seen,
+                "last_seen": last_seen,
+                "weeks": [(day_date(week), by_week.get(week, 0)) for week in range(oldest, current + 1, 7)],
+                "recent": self.cursor.fetchall(),
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Sighting history of {name} failed: {e}")
+            return None
+
+
+def main():
+    """Import sightings or report on them from the command line"""
+    parser = argparse.ArgumentParser(description="Log aircraft sightings and report on them")
+    parser.add_argument("--db", default=AircraftDatabase.DEFAULT_DB_FILE,
+                        help=f"aircraft database file (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="append the sightings of a CSV, JSON Lines or JSON file")
+    import_parser.add_argument("file", help="sightings file")
+    import_parser.add_argument("--format", choices=("csv", "jsonl", "json"), help="input format (default: from extension)")
+    import_parser.add_argument("--dry-run", action="store_true", help="validate and write, then roll back")
+    import_parser.add_argument("--errors", help="write per-row errors to this JSONL file")
+    weekly_parser = commands.add_parser("weekly", help="sightings per type per week")
+    weekly_parser.add_argument("--since", help="first day, YYYY-MM-DD (default: 12 weeks ago)")
+    weekly_parser.add_argument("--until", help="last day, YYYY-MM-DD (default: today)")
+    seen_parser = commands.add_parser("seen", help="first and last time each type was seen")
+    seen_parser.add_argument("names", nargs="*", help="aircraft names (default: every sighted type)")
+    rarest_parser = commands.add_parser("rarest", help="rarest types sighted in a month")
+    rarest_parser.add_argument("--month", help="YYYY-MM (default: this month)")
+    rarest_parser.add_argument("--limit", type=int, default=20, help="number of types (default: 20)")
+    history_parser = commands.add_parser("history", help="sighting history of one type")
+    history_parser.add_argument("name", help="aircraft name")
+    commands.add_parser("rebuild", help="recompute the rollups from the whole log")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.command in ("import", "rebuild") else logging.WARNING)
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+
+    with AircraftDatabase(db_file=args.db, seed=False) as db:
+        log = SightingLog(db)
+        try:
+            if args.command == "import":
+                report = log.import_file(args.file, args.format, dry_run=args.dry_run)
+                for error in report.errors[:20]:
+                    logger.warning(f"line {error['line']} ({error['name'] or '?'}): {error['error']}")
+                if len(report.errors) > 20:
+                    logger.warning(f"... and {len(report.errors) - 20} more errors")
+                if args.errors:
+                    with open(args.errors, "w", encoding="utf-8") as f:
+                        for error in report.errors:
+                            f.write(json.dumps(error, ensure_ascii=False) + "\n")
+                logger.info(("Dry run: " if args.dry_run else "") + report.summary())
+                return 1 if report.errors else 0
+            if args.command == "rebuild":
+                with db.conn:
+                    logger.info(f"Rebuilt {log.rebuild_rollups()} daily rollups")
+                return 0
+            if args.command == "weekly":
+                since = args.since or day_date(week_start(day_number(today)) - 7 * 11)
+                for week, name, count in log.weekly_counts(since, args.until or today.isoformat()):
+                    print(f"{week}  {count:6}  {name}")
+            elif args.command == "seen":
+                for name, count, first_seen, last_seen in log.first_last_seen(args.names):
+                    print(f"{first_seen}  {last_seen}  {count:6}  {name}")
+            elif args.command == "rarest":
+                first, last = month_days(args.month or today.strftime("%Y-%m"))
+                for name, rarity, count in log.rarest(day_date(first), day_date(last), args.limit):
+                    print(f"{rarity or '?':<15} {count:6}  {name}")
+            elif args.command == "history":
+                history = log.history(args.name, today=today)
+                if history is None:
+                    print(f"No sightings of {args.name}", file=sys.stderr)
+                    return 1
+                print(f"{history['sightings']} sightings, first {history['first_seen']}, last {history['last_seen']}")
+                for week, count in history["weeks"]:
+                    print(f"week of {week}  {count:6}")
+                for seen_at, location, tail_number, notes in history["recent"]:
+                    print(f"{seen_at}  {location or '':<20} {tail_number or '':<10} {notes or ''}")
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.error(f"{args.command} failed: {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""Incremental sync between two copies of a WingID database.
+
+Every aircraft row carries an updated_at time and a hash of its content
+(text, image paths and translations), kept current by triggers and
+AircraftDatabase.refresh_hashes(). Syncing another copy into this one
+streams the other copy's names and hashes into a temporary table in
+batches. The two copies are then compared in SQL, so only rows that differ
+reach Python. Those rows are applied in one transaction:
+
+- aircraft that only exist in the other copy are added
+- aircraft changed only in the other copy since the last sync from it are updated
+- aircraft changed in both copies are conflicts: they are reported and left
+  alone unless --prefer picks a side. Every copy counts as changed on the
+  first sync from it. Unresolved conflicts are remembered per copy and
+  reported again by every later sync from it until they are resolved
+
+    python wingid_sync.py team_b/airplane.db
+    python wingid_sync.py team_b/airplane.db --prefer newer --dry-run
+
+Aircraft are matched by name. The other copy is only read. Aircraft missing
+from it are never deleted, because a deleted row can't be told apart from
+one that copy never had. "Changed since the last sync" compares updated_at
+times from both machines, so their clocks should roughly agree.
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from wingid_db import CHANGE_TIME_SQL, AircraftDatabase, digest_rows, read_only_uri
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = AircraftDatabase.COLUMNS
+PREFER = ("source", "target", "newer")
+
+
+class SyncReport:
+    """Counters and conflicts collected during a sync"""
+
+    def __init__(self):
+        self.compared = 0
+        self.added = 0
+        self.updated = 0
+        self.kept = 0
+        self.only_in_target = 0
+        self.conflicts = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_conflict(self, name, source_updated_at, target_updated_at, resolution):
+        self.conflicts.append({"name": name, "source_updated_at": source_updated_at,
+                               "target_updated_at": target_updated_at, "resolution": resolution})
+
+    @property
+    def unresolved(self):
+        return [conflict for conflict in self.conflicts if conflict["resolution"] is None]
+
+    def summary(self):
+        return (f"{self.compared} aircraft compared, {self.added} added, {self.updated} updated, "
+                f"{self.kept} newer here, {self.only_in_target} only here, {len(self.conflicts)} conflicts "
+                f"({len(self.unresolved)} unresolved) in {self.elapsed:.2f}s")
+
+
+def load_source_hashes(cursor, source, batch_size=5000):
+    """Copy (name, id, content_hash, updated_at) of every source aircraft into temp.sync_source.
+
+    Rows the source has not hashed yet (or all rows of a source that predates
+    change tracking) are hashed here, the same way refresh_hashes() would.
+    """
+    present = {row[1] for row in source.execute("PRAGMA table_info(aircraft)")}
+    if not set(COLUMNS) <= present:
+        raise ValueError("the source database has no aircraft table or predates the image path columns")
+    has_translations = source.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'aircraft_translations'").fetchone() is not None
+    tracked = {"updated_at", "content_hash"} <= present
+
+    cursor.execute("DROP TABLE IF EXISTS temp.sync_source")
+    cursor.execute("""
+        CREATE TEMP TABLE sync_source (
+            name TEXT PRIMARY KEY,
+            id INTEGER NOT NULL,
+            content_hash BLOB NOT NULL,
+            updated_at TEXT
+        )
+    """)
+    insert_sql = "INSERT OR IGNORE INTO temp.sync_source (name, id, content_hash, updated_at) VALUES (?, ?, ?, ?)"
+    if tracked:
+        rows = source.execute("""
+            SELECT name, id, content_hash, updated_at FROM aircraft
+            WHERE name IS NOT NULL AND content_hash IS NOT NULL
+        """)
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                break
+            cursor.executemany(insert_sql, batch)
+
+    stale = source.execute(f"""
+        SELECT id, {', '.join(COLUMNS)}{', updated_at' if tracked else ', NULL'} FROM aircraft
+        WHERE name IS NOT NULL{' AND content_hash IS NULL' if tracked else ''} ORDER BY id
+    """)
+    hash_cursor = source.cursor()
+    hashed = 0
+    while True:
+        batch = stale.fetchmany(batch_size)
+        if not batch:
+            break
+        digests = digest_rows(hash_cursor, [row[:-1] for row in batch], translations=has_translations)
+        cursor.executemany(insert_sql, [(row[1], row[0], digest, row[-1]) for row, (digest, _) in zip(batch, digests)])
+        hashed += len(batch)
+    if hashed:
+        logger.info(f"Hashed {hashed} source rows that had no content hash")
+    return has_translations
+
+
+def plan_sync(cursor, last_synced, prefer, report, pending=frozenset()):
+    """Compare the hashes in SQL and return {source id: (content_hash, updated_at)} to apply; fills in report.
+
+    Names in pending were left unresolved by an earlier sync and stay
+    conflicts for as long as the two copies differ.
+    """
+    cursor.execute("SELECT COUNT(*) FROM temp.sync_source")
+    report.compared = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT COUNT(*) FROM aircraft a
+        WHERE a.name IS NOT NULL AND NOT EXISTS (SELECT 1 FROM temp.sync_source s WHERE s.name = a.name)
+    """)
+    report.only_in_target = cursor.fetchone()[0]
+
+    # Only differing rows leave SQLite; identical catalogs return nothing here
+    cursor.execute("""
+        SELECT s.name, s.id, s.content_hash, s.updated_at, a.id, a.updated_at
+        FROM temp.sync_source s LEFT JOIN aircraft a ON a.name = s.name
+        WHERE a.content_hash IS NOT s.content_hash
+    """)
+    apply = {}
+    for name, source_id, content_hash, source_time, target_id, target_time in cursor.fetchall():
+        if target_id is None:
+            apply[source_id] = (content_hash, source_time)
+            report.added += 1
+            continue
+        unsettled = last_synced is None or name in pending
+        if not unsettled and (source_time or "") <= last_synced:
+            # The last sync already saw this version; the row here is newer or won an earlier conflict
+            report.kept += 1
+            continue
+        if not unsettled and (target_time or "") <= last_synced:
+            take_source = True
+        else:
+            resolution = None
+            if prefer == "newer":
+                resolution = "source" if (source_time or "") > (target_time or "") else "target"
+            elif prefer:
+                resolution = prefer
+            report.add_conflict(name, source_time, target_time, resolution)
+            if resolution is None:
+                continue
+            take_source = resolution == "source"
+        if take_source:
+            apply[source_id] = (content_hash, source_time)
+            report.updated += 1
+        else:
+            report.kept += 1
+    return apply
+
+
+def apply_rows(db, source, apply, has_translations, batch_size=500):
+    """Copy source aircraft {id: (content_hash, updated_at)} with their translations into db (the caller commits)"""
+    cursor = db.conn.cursor()
+    updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c != "name")
+    upsert_sql = f"""
+        INSERT INTO aircraft ({', '.join(COLUMNS)}, content_hash) VALUES ({', '.join('?' for _ in COLUMNS)}, ?)
+        ON CONFLICT(name) DO UPDATE SET {updates}, content_hash = excluded.content_hash
+    """
+    ids = sorted(apply)
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = source.execute(f"SELECT id, {', '.join(COLUMNS)} FROM aircraft WHERE id IN ({placeholders})",
+                              chunk).fetchall()
+        cursor.executemany(upsert_sql, [row[1:] + (apply[row[0]][0],) for row in rows])
+
+        names = [(row[1],) for row in rows]
+        cursor.executemany("""
+            DELETE FROM aircraft_translations WHERE aircraft_id = (SELECT id FROM aircraft WHERE name = ?)
+        """, names)
+        if has_translations:
+            translations = source.execute(f"""
+                SELECT a.name, t.lang, t.field, t.value
+                FROM aircraft_translations t JOIN aircraft a ON a.id = t.aircraft_id
+                WHERE t.aircraft_id IN ({placeholders})
+            """, chunk).fetchall()
+            cursor.executemany("""
+                INSERT INTO aircraft_translations (aircraft_id, lang, field, value)
+                SELECT id, ?, ?, ? FROM aircraft WHERE name = ?
+            """, [(lang, field, value, name) for name, lang, field, value in translations])
+        # Writing the translations marked the rows as edited here; restore the source's state
+        cursor.executemany(f"""
+            UPDATE aircraft SET content_hash = ?, updated_at = COALESCE(?, {CHANGE_TIME_SQL}) WHERE name = ?
+        """, [apply[row[0]] + (row[1],) for row in rows])
+
+
+def sync_file(db, path, prefer=None, peer=None, dry_run=False, batch_size=5000):
+    """Sync the aircraft of another database copy into db and return a SyncReport"""
+    if prefer not in (None,) + PREFER:
+        raise ValueError(f"prefer must be one of {PREFER}")
+    peer = peer or os.path.abspath(path)
+    report = SyncReport()
+    source = sqlite3.connect(read_only_uri(path), uri=True)
+    cursor = db.conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Taken before reading the source, so its edits made during the sync count as newer next time
+        cursor.execute(f"SELECT {CHANGE_TIME_SQL}")
+        started_at = cursor.fetchone()[0]
+        db.refresh_hashes()
+        has_translations = load_source_hashes(cursor, source, batch_size)
+        cursor.execute("SELECT synced_at FROM sync_peers WHERE peer = ?", (peer,))
+        row = cursor.fetchone()
+        cursor.execute("SELECT name FROM sync_conflicts WHERE peer = ?", (peer,))
+        pending = {name for name, in cursor.fetchall()}
+        apply = plan_sync(cursor, row[0] if row else None, prefer, report, pending)
+        apply_rows(db, source, apply, has_translations)
+
+        # The watermark moves on, so conflicts left open must be remembered until they are resolved
+        cursor.execute("DELETE FROM sync_conflicts WHERE peer = ?", (peer,))
+        cursor.executemany("INSERT INTO sync_conflicts (peer, name) VALUES (?, ?)",
+                           [(peer, conflict["name"]) for conflict in report.unresolved])
+
+        cursor.execute("""
+            INSERT INTO sync_peers (peer, synced_at) VALUES (?, ?)
+            ON CONFLICT(peer) DO UPDATE SET synced_at = excluded.synced_at
+        """, (peer, started_at))
+        db.refresh_facets()
+        cursor.execute("DROP TABLE temp.sync_source")
+        if dry_run:
+            db.conn.rollback()
+        else:
+            db.conn.commit()
+    except BaseException:
+        db.conn.rollback()
+        raise
+    finally:
+        source.close()
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+def main():
+    """Sync another database copy from the command line"""
+    parser = argparse.ArgumentParser(description="Sync the aircraft of another WingID database copy into this one")
+    parser.add_argument("source", help="the other database copy (only read)")
+    parser.add_argument("--db", help=f"database file to update (default: {AircraftDatabase.DEFAULT_DB_FILE})")
+    parser.add_argument("--prefer", choices=PREFER,
+                        help="resolve rows edited in both copies (default: report them and keep this copy's)")
+    parser.add_argument("--peer", help="name this source is remembered under (default: its absolute path)")
+    parser.add_argument("--dry-run", action="store_true", help="compare and apply, then roll back")
+    parser.add_argument("--conflicts", help="write the conflicts to this JSONL file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    target = args.db or AircraftDatabase.DEFAULT_DB_FILE
+    if not os.path.exists(args.source):
+        parser.error(f"database not found: {args.source}")
+    if os.path.abspath(args.source) == os.path.abspath(target):
+        parser.error("source and target are the same file")
+
+    with AircraftDatabase(db_file=target, seed=False) as db:
+        try:
+            report = sync_file(db, args.source, args.prefer, args.peer, args.dry_run)
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Sync failed: {e}")
+            return 1
+
+    for conflict in report.conflicts[:20]:
+        resolution = f"took {conflict['resolution']}" if conflict["resolution"] else "unresolved"
+        logger.warning(f"conflict on {conflict['name']}: edited {conflict['source_updated_at']} there and "
+                       f"{conflict['target_updated_at']} here ({resolution})")
+    if len(report.conflicts) > 20:
+        logger.warning(f"... and {len(report.conflicts) - 20} more conflicts")
+    if args.conflicts:
+        with open(args.conflicts, "w", encoding="utf-8") as f:
+            for conflict in report.conflicts:
+                f.write(json.dumps(conflict, ensure_ascii=False) + "\n")
+
+    logger.info(("Dry run: " if args.dry_run else "") + report.summary())
+    return 1 if report.unresolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Reproducible synthetic aircraft catalogs for benchmarking WingID at scale.
+
+Writes a fresh database with the requested number of made-up aircraft, plus
+a pool of generated silhouette PNGs that the rows point at (like real
+catalogs, where variants of one airframe share their silhouettes). The same
+--count and --seed always produce the same catalog, so benchmark runs on
+different machines or releases compare like with like.
+
+    python wingid_synth.py --count 100k --db synth_100k.db --images synth_images
+    python wingid_bench.py --db synth_100k.db --output bench.json
+
+Counts accept k/m suffixes (10k, 100k, 1m). Images are plain grayscale PNGs
+written with the standard library, so Pillow is not needed to generate them.
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+
+from wingid_db import RARITY_LEVELS, AircraftDatabase
+
+logger = logging.getLogger(__name__)
+
+PREFIXES = ("A", "AC", "AH", "AV", "B", "C", "CH", "E", "EA", "EC", "F", "HC", "HH", "KC",
+            "MC", "MQ", "OA", "P", "RC", "RQ", "S", "T", "U", "UH", "WC")
+ADJECTIVES = ("Silent", "Iron", "Night", "Storm", "Sea", "Sky", "Desert", "Arctic", "Thunder", "Shadow",
+              "Golden", "Swift", "Grey", "Red", "Black", "Royal", "Lone", "High", "Far", "Steel",
+              "Crimson", "Polar", "Wild", "Star", "Sun", "Moon", "Cloud", "Frost", "Ember", "Ghost")
+NOUNS = ("Hawk", "Falcon", "Eagle", "Osprey", "Raven", "Condor", "Kestrel", "Harrier", "Albatross", "Petrel",
+         "Sentinel", "Guardian", "Ranger", "Warden", "Lancer", "Archer", "Courier", "Nomad", "Voyager", "Pioneer",
+         "Trident", "Spear", "Hammer", "Anvil", "Beacon", "Lantern", "Compass", "Herald", "Tanker", "Lifter",
+         "Hercules", "Atlas", "Titan", "Orion", "Mercury", "Sentry", "Hunter", "Tracker", "Watcher", "Seeker")
+MANUFACTURERS = ("Boeing", "Lockheed", "Airbus", "Embraer", "Northrop", "Grumman", "Dassault", "Saab",
+                 "Antonov", "Ilyushin", "Tupolev", "Kawasaki", "Bombardier", "Gulfstream", "Beechcraft")
+ROLES = ("Strategic airlift", "Tactical transport", "Air-to-air refueling", "Airborne early warning and control",
+         "Maritime patrol", "Anti-submarine warfare", "Signals intelligence", "Electronic warfare",
+         "Airborne command post", "Aerial reconnaissance", "Search and rescue", "Medical evacuation",
+         "VIP transport", "Weather reconnaissance", "Training", "Close air support", "Strategic bomber")
+OPERATORS = ("USAF", "US Navy", "US Army", "USMC", "Royal Air Force", "Royal Navy", "Luftwaffe", "Armee de l'Air",
+             "NATO", "RAAF", "RCAF", "JASDF", "Indian Air Force", "Turkish Air Force", "Israeli Air Force",
+             "Brazilian Air Force", "Italian Air Force", "Spanish Air Force", "Saudi Arabia", "Egypt")
+STATUSES = ("Active", "Active", "Active", "Retired", "Reserve", "In development")
+DETAIL_OPENINGS = ("Derived from the {base} airframe.", "Purpose-built {role_lower} platform.",
+                   "Militarized variant of the {base}.", "Successor to earlier {nick} models.")
+DETAIL_FEATURES = ("Distinctive dorsal radar dome.", "Extended wingtip pods for sensors.",
+                   "Refueling boom under the tail.", "Twin tail booms and a high-mounted wing.",
+                   "Large side-looking antenna fairing.", "Four underwing turbofan engines.",
+                   "Chin-mounted sensor turret.", "Stretched fuselage with extra fuel tanks.")
+# Relative weights of the RARITY_LEVELS classes and the unit counts each class draws from
+RARITY_WEIGHTS = (1, 3, 6, 10, 5)
+RARITY_UNITS = ((1, 9), (10, 29), (30, 99), (100, 499), (500, 3000))
+
+
+def parse_count(text):
+    """Parse a catalog size such as "250", "10k" or "1m" """
+    text = text.strip().lower()
+    factor = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    try:
+        count = int(float(text[:-1] if factor > 1 else text) * factor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count: {text}")
+    if count <= 0:
+        raise argparse.ArgumentTypeError("count must be positive")
+    return count
+
+
+def png_bytes(width, height, rows):
+    """Encode 8-bit grayscale rows (bytes of length width) as a PNG file"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    raw = b"".join(b"\x00" + row for row in rows)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+def polygon_span(points, y):
+    """Return the (left, right) x extent of a convex polygon on scanline y, or None"""
+    xs = []
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        if y1 != y2 and min(y1, y2) <= y <= max(y1, y2):
+            xs.append(x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+    return (min(xs), max(xs)) if xs else None
+
+
+def ellipse_span(cx, cy, rx, ry, y):
+    """Return the (left, right) x extent of an ellipse on scanline y, or None"""
+    t = (y - cy) / ry
+    if abs(t) > 1:
+        return None
+    half = rx * math.sqrt(1 - t * t)
+    return cx - half, cx + half
+
+
+def silhouette(rng, width, height, view):
+    """Draw a random airframe outline ("side" or "top" view) and return its PNG bytes"""
+    cx, cy = width / 2, height / 2
+    length = width * rng.uniform(0.7, 0.9)
+    girth = height * rng.uniform(0.08, 0.14)
+    tail = cx + length / 2
+    shapes = [("ellipse", (cx, cy, length / 2, girth))]
+    if view == "top":
+        span = height * rng.uniform(0.40, 0.48)
+        sweep = width * rng.uniform(0.02, 0.12)
+        root = width * rng.uniform(0.08, 0.14)
+        wing_x = cx - width * rng.uniform(0.05, 0.12)
+        for side in (-1, 1):
+            shapes.append(("polygon", [(wing_x, cy), (wing_x + root, cy),
+                                       (wing_x + root + sweep, cy + side * span),
+                                       (wing_x + sweep + root * 0.3, cy + side * span)]))
+            shapes.append(("polygon", [(tail - width * 0.1, cy), (tail - width * 0.04, cy),
+                                       (tail - width * 0.01, cy + side * span * 0.35),
+                                       (tail - width * 0.05, cy + side * span * 0.35)]))
+    else:
+        fin = height * rng.uniform(0.25, 0.35)
+        shapes.append(("polygon", [(tail - width * 0.14, cy), (tail - width * 0.02, cy),
+                                   (tail, cy - fin), (tail - width * 0.06, cy - fin)]))
+        if rng.random() < 0.3:
+            # Dorsal radar dome
+            shapes.append(("ellipse", (cx + width * 0.08, cy - girth * 2.2, width * 0.12, girth * 0.45)))
+
+    background = b"\xff" * width
+    rows = []
+    for y in range(height):
+        row = bytearray(background)
+        for kind, shape in shapes:
+            span = ellipse_span(*shape, y + 0.5) if kind == "ellipse" else polygon_span(shape, y + 0.5)
+            if span:
+                left, right = max(int(span[0]), 0), min(int(math.ceil(span[1])), width)
+                if right > left:
+                    row[left:right] = b"\x30" * (right - left)
+        rows.append(bytes(row))
+    return png_bytes(width, height, rows)
+
+
+def write_silhouettes(directory, count, seed=1, size=(500, 240)):
+    """Write count side/top silhouette pairs into directory and return [(side_path, top_path)]"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    pairs = []
+    for i in range(count):
+        paths = []
+        for view in ("side", "top"):
+            path = os.path.abspath(os.path.join(directory, f"{view}_{i:05d}.png"))
+            with open(path, "wb") as f:
+                f.write(silhouette(rng, size[0], size[1], view))
+            paths.append(path)
+        pairs.append(tuple(paths))
+    return pairs
+
+
+def iter_synthetic_aircraft(count, seed=1, images=()):
+    """Yield count unique aircraft rows in AircraftDatabase.COLUMNS order"""
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < count:
+        nick = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}" if rng.random() < 0.4 else rng.choice(NOUNS)
+        designation = f"{rng.choice(PREFIXES)}-{rng.randint(1, 999)}{rng.choice(('', '', '', 'A', 'B', 'C', 'D', 'E', 'R'))}"
+        name = f"{designation} {nick}"
+        if name in seen:
+            continue
+        seen.add(name)
+
+        base = f"{rng.choice(MANUFACTURERS)} {rng.randint(100, 999)}-{rng.randint(1, 9)}00"
+        role = rng.choice(ROLES)
+        level = rng.choices(range(len(RARITY_LEVELS)), RARITY_WEIGHTS)[0]
+        units = rng.randint(*RARITY_UNITS[level])
+        quantity = rng.choice(("{} units", "~{} units", "{}+ units", "{} units (active)")).format(units)
+        operator = ", ".join(rng.sample(OPERATORS, rng.choice((1, 1, 1, 2, 2, 3))))
+        details = " ".join((rng.choice(DETAIL_OPENINGS).format(base=base, role_lower=role.lower(), nick=nick),
+                            rng.choice(DETAIL_FEATURES),
+                            f"Primarily flown by {operator.split(', ')[0]}."))
+        # Drawn even without images, so the text of a catalog doesn't depend on --images
+        with_images, pick = rng.random() < 0.9, rng.randrange(1 << 30)
+        side, top = images[pick % len(images)] if images and with_images else (None, None)
+        yield (name, base, role, RARITY_LEVELS[level], quantity, operator, details,
+               str(rng.randint(1945, 2024)), rng.choice(STATUSES), side, top)
+
+
+def generate_catalog(db_file, count, seed=1, image_dir=None, image_count=256, batch_size=10000):
+    """Create a new database file holding a synthetic catalog; returns the number of aircraft"""
+    images = write_silhouettes(image_dir, image_count, seed) if image_dir and image_count else []
+    columns = AircraftDatabase.COLUMNS
+    insert_sql = f"INSERT INTO aircraft ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+    with AircraftDatabase(db_file=db_file, seed=False) as db:
+        cursor = db.conn.cursor()
+        cursor.execute("PRAGMA synchronous = OFF")
+        defer_index = bool(db.fts_tokenizer)
+        if defer_index:
+            db.drop_search_triggers()
+        try:
+            cursor.execute("BEGIN")
+            batch = []
+            for row in iter_synthetic_aircraft(count, seed, images):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    cursor.executemany(insert_sql, batch)
+                    batch = []
+            cursor.executemany(insert_sql, batch)
+            db.refresh_facets()
+            db.refresh_hashes()
+            db.conn.commit()
+        except BaseException:
+            db.conn.rollback()
+            raise
+        finally:
+            if defer_index:
+                db.create_search_triggers()
+                db.rebuild_search_index()
+                db.conn.commit()
+            cursor.execute("PRAGMA synchronous = FULL")
+        return db.count_aircraft()
+
+
+def main():
+    """Generate a synthetic catalog from the command line"""
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic WingID catalog")
+    parser.add_argument("--count", type=parse_count, default="10k", help="number of aircraft, e.g. 10k, 100k, 1m")
+    parser.add_argument("--db", help="database file to create (default: synth_<count>.db)")
+    parser.add_argument("--images", help="directory for generated silhouette PNGs (default: no images)")
+    parser.add_argument("--image-count", type=int, default=256, help="distinct silhouette pairs to generate")
+    parser.add_argument("--seed", type=int, default=1, help="random seed; same seed and count give the same catalog")
+    parser.add_argument("--force", action="store_true", help="replace an existing database file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db_file = args.db or f"synth_{args.count}.db"
+    if os.path.exists(db_file):
+        if not args.force:
+            parser.error(f"{db_file} already exists (use --force to replace it)")
+        for path in (db_file, db_file + "-wal", db_file + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    start = time.perf_counter()
+    count = generate_catalog(db_file, args.count, args.seed, args.images, args.image_count)
+    logger.info(f"Wrote {count} synthetic aircraft to {db_file} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
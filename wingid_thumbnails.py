@@ -0,0 +1,432 @@
+"""Persistent thumbnail store for WingID silhouette images.
+
+Resized variants of the side/top view images are kept on disk so the GUI
+only ever has to read small, pre-scaled files. Thumbnails are content
+addressed (named after the SHA-256 of the source file), so aircraft that
+share a silhouette also share its thumbnails. A small SQLite index maps
+(source path, size) to the digest and remembers the source's mtime and file
+size, so an up-to-date thumbnail can be found with a single stat() call.
+
+Run this module directly to pre-generate all missing thumbnails in parallel:
+
+    python wingid_thumbnails.py --db airplane.db --size 250x120
+
+With --pack the resized silhouettes are instead packed as raw pixels into one
+append-only atlas file (atlas-NNNN.pack) whose offsets are kept in the same
+index. Packed images are sliced out of an mmap without copying, and without
+opening, or even stat()ing, their source files; run the pack step again after
+changing images.
+
+    python wingid_thumbnails.py --db airplane.db --size 250x120 --pack
+"""
+import argparse
+import hashlib
+import io
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image, ImageChops
+
+from wingid_metrics import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZE = (250, 120)
+# Pixel formats PIL can wrap around a buffer without copying
+PACKED_MODES = ("L", "RGBA")
+
+_pack_maps = {}
+_pack_maps_lock = threading.Lock()
+
+
+def thumbnail_path(root_dir, digest, size):
+    """Return the on-disk location of a thumbnail"""
+    return os.path.join(root_dir, digest[:2], f"{digest}_{size[0]}x{size[1]}.png")
+
+
+def render_image(data, size):
+    """Decode encoded image bytes and resize them to size"""
+    image = Image.open(io.BytesIO(data))
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA")
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def write_thumbnail(image, path):
+    """Write a thumbnail atomically so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
+
+
+def render_thumbnail(source_path, size, root_dir):
+    """Create the thumbnail for one source file (runs in worker processes).
+
+    Returns (source_path, size, mtime_ns, file_size, digest) for the index.
+    """
+    stat = os.stat(source_path)
+    with open(source_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    path = thumbnail_path(root_dir, digest, size)
+    if not os.path.exists(path):
+        write_thumbnail(render_image(data, size), path)
+    return source_path, size, stat.st_mtime_ns, stat.st_size, digest
+
+
+def packable(image):
+    """Convert an image to L if it has no colour or transparency, otherwise to RGBA"""
+    if image.mode == "L":
+        return image
+    image = image.convert("RGBA")
+    red, green, blue, alpha = image.split()
+    if (alpha.getextrema() == (255, 255) and ImageChops.difference(red, green).getbbox() is None
+            and ImageChops.difference(green, blue).getbbox() is None):
+        return red
+    return image
+
+
+def render_raw(source_path, size):
+    """Resize one source file for the atlas (runs in worker processes).
+
+    Returns (source_path, size, mtime_ns, file_size, source_size, mode, pixels).
+    """
+    stat = os.stat(source_path)
+    with open(source_path, "rb") as f:
+        data = f.read()
+    source_size = Image.open(io.BytesIO(data)).size
+    image = packable(render_image(data, size))
+    return source_path, size, stat.st_mtime_ns, stat.st_size, source_size, image.mode, image.tobytes()
+
+
+def packed_image(pack_path, offset, mode, size):
+    """Return a read-only image whose pixels are the mapped bytes of a pack file (no copy).
+
+    Maps are shared per process and remapped when the pack has grown past them.
+    """
+    # One byte per band in both packed modes
+    length = size[0] * size[1] * len(mode)
+    with _pack_maps_lock:
+        mapped = _pack_maps.get(pack_path)
+        if mapped is None or len(mapped) < offset + length:
+            with open(pack_path, "rb") as f:
+                # Images still using an older, shorter map keep it alive until they are released
+                mapped = _pack_maps[pack_path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Image.frombuffer(mode, size, memoryview(mapped)[offset:offset + length], "raw", mode, 0, 1)
+
+
+def referenced_sources(db_file):
+    """Return the image paths referenced by the aircraft table of db_file"""
+    conn = sqlite3.connect(db_file)
+    try:
+        rows = conn.execute("""
+            SELECT side_view_path FROM aircraft WHERE side_view_path IS NOT NULL AND side_view_path != ''
+            UNION
+            SELECT top_view_path FROM aircraft WHERE top_view_path IS NOT NULL AND top_view_path != ''
+        """).fetchall()
+    finally:
+        conn.close()
+    return [path for (path,) in rows]
+
+
+class ThumbnailStore:
+    """Directory of content-addressed thumbnails and packed atlases plus their SQLite index"""
+
+    def __init__(self, root_dir="thumbnails"):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root_dir, "index.db"), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                source_path TEXT NOT NULL,
+                size TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                file_size INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (source_path, size)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS atlas (
+                source_path TEXT NOT NULL,
+                size TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                file_size INTEGER NOT NULL,
+                source_width INTEGER NOT NULL,
+                source_height INTEGER NOT NULL,
+                mode TEXT NOT NULL,
+                pack TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (source_path, size)
+            )
+        """)
+        self.conn.commit()
+
+    def close(self):
+        """Close the index connection"""
+        with self._lock:
+            self.conn.close()
+
+    def lookup(self, source_path, size):
+        """Return the path of an up-to-date thumbnail for source_path, or None"""
+        source_path = os.path.abspath(source_path)
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT mtime_ns, file_size, digest FROM thumbnails WHERE source_path = ? AND size = ?",
+                (source_path, f"{size[0]}x{size[1]}")).fetchone()
+        if not row or row[0] != stat.st_mtime_ns or row[1] != stat.st_size:
+            return None
+        path = thumbnail_path(self.root_dir, row[2], size)
+        return path if os.path.exists(path) else None
+
+    def lookup_packed(self, source_path, size):
+        """Return (pack path, offset, mode, mtime_ns) of a packed image, or None; the source is not touched"""
+        with self._lock:
+            row = self.conn.execute("SELECT pack, offset, mode, mtime_ns FROM atlas WHERE source_path = ? AND size = ?",
+                                    (os.path.abspath(source_path), f"{size[0]}x{size[1]}")).fetchone()
+        if not row:
+            return None
+        return os.path.join(self.root_dir, row[0]), row[1], row[2], row[3]
+
+    def packed_sources(self):
+        """Return {source path: (mtime_ns, file_size, source size, pack path, offset, mode, size)} of the
+        largest packed variant of every source"""
+        with self._lock:
+            rows = self.conn.execute("SELECT source_path, mtime_ns, file_size, source_width, source_height, "
+                                     "pack, offset, mode, size FROM atlas").fetchall()
+        sources = {}
+        for path, mtime_ns, file_size, source_width, source_height, pack, offset, mode, size in rows:
+            width, height = (int(v) for v in size.split("x"))
+            current = sources.get(path)
+            if current is None or width * height > current[6][0] * current[6][1]:
+                sources[path] = (mtime_ns, file_size, (source_width, source_height),
+                                 os.path.join(self.root_dir, pack), offset, mode, (width, height))
+        return sources
+
+    @timed("thumbnails.get_image")
+    def get_image(self, source_path, size=DEFAULT_SIZE):
+        """Return the resized image: sliced from the atlas, read from a stored thumbnail or created on a miss"""
+        packed = self.lookup_packed(source_path, size)
+        if packed:
+            try:
+                return packed_image(packed[0], packed[1], packed[2], size)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read {source_path} from the atlas: {e}")
+
+        path = self.lookup(source_path, size)
+        if path:
+            image = Image.open(path)
+            image.load()
+            return image
+
+        source_path = os.path.abspath(source_path)
+        stat = os.stat(source_path)
+        with open(source_path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        image = render_image(data, size)
+        try:
+            write_thumbnail(image, thumbnail_path(self.root_dir, digest, size))
+            self.record([(source_path, size, stat.st_mtime_ns, stat.st_size, digest)])
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not store thumbnail for {source_path}: {e}")
+        return image
+
+    def record(self, entries):
+        """Store index rows of (source_path, size, mtime_ns, file_size, digest) in one transaction"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO thumbnails (source_path, size, mtime_ns, file_size, digest) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(path, f"{size[0]}x{size[1]}", mtime_ns, file_size, digest)
+                 for path, size, mtime_ns, file_size, digest in entries])
+
+    def generate_missing(self, db_file, sizes=(DEFAULT_SIZE,), workers=None):
+        """Create every missing or outdated thumbnail referenced by db_file in a process pool.
+
+        Returns a (created, failed) tuple.
+        """
+        jobs = []
+        for path in referenced_sources(db_file):
+            path = os.path.abspath(path)
+            if not os.path.exists(path):
+                logger.warning(f"Image not found: {path}")
+                continue
+            jobs.extend((path, size) for size in sizes if self.lookup(path, size) is None)
+        if not jobs:
+            return 0, 0
+
+        created, failed, batch = 0, 0, []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_thumbnail, path, size, self.root_dir): path for path, size in jobs}
+            for future in as_completed(futures):
+                try:
+                    batch.append(future.result())
+                    created += 1
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Failed to create thumbnail for {futures[future]}: {e}")
+                if len(batch) >= 500:
+                    self.record(batch)
+                    batch = []
+        if batch:
+            self.record(batch)
+        return created, failed
+
+    def pack(self, db_file, sizes=(DEFAULT_SIZE,), workers=None, batch_size=500):
+        """Append every missing or outdated silhouette referenced by db_file to the atlas.
+
+        Entries of images that are no longer referenced are dropped, and the
+        atlas is rewritten once less than half of it is still in use.
+        Returns a (packed, failed) tuple.
+        """
+        sources = {os.path.abspath(path) for path in referenced_sources(db_file)}
+        with self._lock:
+            stored = {(path, size): (mtime_ns, file_size) for path, size, mtime_ns, file_size
+                      in self.conn.execute("SELECT source_path, size, mtime_ns, file_size FROM atlas")}
+        jobs = []
+        for path in sorted(sources):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                logger.warning(f"Image not found: {path}")
+                continue
+            jobs.extend((path, size) for size in sizes
+                        if stored.get((path, f"{size[0]}x{size[1]}")) != (stat.st_mtime_ns, stat.st_size))
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM atlas WHERE source_path = ?",
+                                  [(path,) for path in {path for path, _ in stored} - sources])
+
+        packed, failed = 0, 0
+        if jobs:
+            pack_name = self._current_pack()
+            with open(os.path.join(self.root_dir, pack_name), "ab") as out, \
+                    ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(render_raw, path, size): path for path, size in jobs}
+                batch = []
+                for future in as_completed(futures):
+                    try:
+                        path, size, mtime_ns, file_size, source_size, mode, pixels = future.result()
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"Failed to pack {futures[future]}: {e}")
+                        continue
+                    batch.append((path, f"{size[0]}x{size[1]}", mtime_ns, file_size, source_size[0], source_size[1],
+                                  mode, pack_name, out.tell(), len(pixels)))
+                    out.write(pixels)
+                    packed += 1
+                    if len(batch) >= batch_size:
+                        self._record_packed(out, batch)
+                        batch = []
+                if batch:
+                    self._record_packed(out, batch)
+        self._compact()
+        return packed, failed
+
+    def _current_pack(self):
+        """Name of the pack file new entries are appended to"""
+        with self._lock:
+            row = self.conn.execute("SELECT MAX(pack) FROM atlas").fetchone()
+        return row[0] or "atlas-0001.pack"
+
+    def _record_packed(self, out, rows):
+        """Make the written pixels durable, then index them (readers never see rows without data)"""
+        out.flush()
+        os.fsync(out.fileno())
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO atlas (source_path, size, mtime_ns, file_size, "
+                                  "source_width, source_height, mode, pack, offset, length) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _compact(self):
+        """Rewrite the atlas into a new pack file once less than half of the existing ones is in use.
+
+        The new file gets a new name, so a reader that still maps an old pack
+        keeps reading valid offsets; old packs are deleted where the platform allows.
+        """
+        with self._lock:
+            rows = self.conn.execute("SELECT rowid, pack, offset, length FROM atlas ORDER BY source_path, size").fetchall()
+        packs = sorted(name for name in os.listdir(self.root_dir) if name.startswith("atlas-") and name.endswith(".pack"))
+        total = sum(os.path.getsize(os.path.join(self.root_dir, name)) for name in packs)
+        live = sum(row[3] for row in rows)
+        if not packs or live * 2 >= total:
+            return
+
+        number = max(int(name[6:-5]) for name in packs) + 1
+        new_name = f"atlas-{number:04d}.pack"
+        updates, sources = [], {}
+        try:
+            with open(os.path.join(self.root_dir, new_name), "wb") as out:
+                # Rewritten in name order, so browsing the list reads the pack front to back
+                for rowid, pack, offset, length in rows:
+                    source = sources.get(pack)
+                    if source is None:
+                        source = sources[pack] = open(os.path.join(self.root_dir, pack), "rb")
+                    source.seek(offset)
+                    updates.append((new_name, out.tell(), rowid))
+                    out.write(source.read(length))
+                out.flush()
+                os.fsync(out.fileno())
+        finally:
+            for source in sources.values():
+                source.close()
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE atlas SET pack = ?, offset = ? WHERE rowid = ?", updates)
+        for name in packs:
+            try:
+                os.remove(os.path.join(self.root_dir, name))
+            except OSError as e:
+                # Windows refuses while a running application still maps it; the next compaction retries
+                logger.info(f"Could not remove old atlas {name}: {e}")
+        logger.info(f"Compacted the atlas into {new_name} ({live} of {total} bytes in use)")
+
+
+def parse_size(value):
+    """Parse a WIDTHxHEIGHT argument"""
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{value}', expected WIDTHxHEIGHT")
+    return width, height
+
+
+def main():
+    """Pre-generate thumbnails, or pack the atlas, for every image referenced by an aircraft database"""
+    parser = argparse.ArgumentParser(description="Pre-generate WingID silhouette thumbnails")
+    parser.add_argument("--db", default="airplane.db", help="aircraft database file (default: airplane.db)")
+    parser.add_argument("--store", default="thumbnails", help="thumbnail directory (default: thumbnails)")
+    parser.add_argument("--size", type=parse_size, action="append",
+                        help="thumbnail size as WIDTHxHEIGHT, may be repeated (default: 250x120)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--pack", action="store_true", help="pack raw pixels into the memory-mapped atlas "
+                                                           "instead of writing PNG thumbnails")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    store = ThumbnailStore(args.store)
+    try:
+        if args.pack:
+            created, failed = store.pack(args.db, args.size or [DEFAULT_SIZE], args.workers)
+        else:
+            created, failed = store.generate_missing(args.db, args.size or [DEFAULT_SIZE], args.workers)
+    finally:
+        store.close()
+    kind = "atlas entries" if args.pack else "thumbnails"
+    logger.info(f"Created {created} {kind} ({failed} failed) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()